@@ -0,0 +1,226 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+DEFAULT_BASELINE = BASELINE_DIR / "default.json"
+WINDOWS = ["1Y", "3Y", "5Y", "10Y", "20Y", "30Y"]
+
+
+def _measure(fn: Callable[[], Any], repeat: int, memory: bool) -> Dict[str, Any]:
+    # Timing runs and the (slower) tracemalloc run are kept separate so the
+    # allocation tracing does not inflate the reported times.
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    result: Dict[str, Any] = {
+        "seconds": min(times),
+        "median_seconds": statistics.median(times),
+    }
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def _setup(workdir: Path, sizes: List[int], kinds: List[str], seed: int) -> Dict[str, Dict[str, str]]:
+    # Points the pipeline at a scratch directory. src must not be imported
+    # before this runs, since config reads the directories at import time.
+    os.environ["MTM_DATA_RAW_DIR"] = str(workdir / "data_raw")
+    os.environ["MTM_DATA_PROCESSED_DIR"] = str(workdir / "data_processed")
+
+    from benchmarks.synthetic import write_raw_csv
+    from src.config import INDICATOR_CONFIG
+
+    INDICATOR_CONFIG.clear()
+    for kind in kinds:
+        for rows in sizes:
+            indicator_id = f"synth_{kind}_{rows}"
+            write_raw_csv(workdir / "data_raw" / f"{indicator_id}.csv", kind, rows, seed=seed)
+            INDICATOR_CONFIG[indicator_id] = {
+                "file": f"{indicator_id}.csv",
+                "country": "Synthetic",
+                "category": kind,
+                "display": f"Synthetic {kind} ({rows:,} rows)",
+            }
+    return INDICATOR_CONFIG
+
+
+def run(sizes: List[int], kinds: List[str], repeat: int, memory: bool, seed: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="mtm-bench-") as tmp:
+        workdir = Path(tmp)
+        print(f"Generating synthetic raw CSVs in {workdir} ...")
+        config = _setup(workdir, sizes, kinds, seed)
+
+        from src import build_processed
+        from src.cleaner import build_pyramid, clean_and_save_indicator
+        from src.loader import load_raw_indicator
+        from src.metadata import build_metadata
+        from src.slicer import clear_series_cache, slice_indicator
+
+        def record(name: str, fn: Callable[[], Any], n: int = repeat) -> None:
+            results[name] = _measure(fn, n, memory)
+            r = results[name]
+            peak = f"{r['peak_mb']:9.1f} MB" if "peak_mb" in r else ""
+            print(f"  {name:<48} {r['seconds'] * 1000:10.2f} ms {peak}")
+
+        for indicator_id in config:
+            print(f"\n{indicator_id}")
+            record(f"{indicator_id}/load_raw_indicator", lambda: load_raw_indicator(indicator_id))
+            raw = load_raw_indicator(indicator_id)
+            record(f"{indicator_id}/build_pyramid", lambda raw=raw: build_pyramid([raw]))
+            del raw
+            record(
+                f"{indicator_id}/clean_and_save_streaming",
+                lambda: clean_and_save_indicator(indicator_id, streaming=True),
+                n=1,
+            )
+            record(
+                f"{indicator_id}/clean_and_save",
+                lambda: clean_and_save_indicator(indicator_id, streaming=False),
+                n=1,
+            )
+
+            def cold_slice() -> None:
+                clear_series_cache()
+                slice_indicator(indicator_id, window="10Y")
+
+            record(f"{indicator_id}/slice_indicator_cold", cold_slice)
+            for window in WINDOWS:
+                record(
+                    f"{indicator_id}/slice_indicator_{window}",
+                    lambda: slice_indicator(indicator_id, window=window),
+                )
+                record(
+                    f"{indicator_id}/slice_indicator_{window}_budget",
+                    lambda: slice_indicator(indicator_id, window=window, max_rows=400),
+                )
+
+        def quiet_build(**kwargs) -> None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_processed.main(**kwargs)
+
+        print("\npipeline")
+        record("build_metadata", build_metadata)
+        record("build_processed_full", lambda: quiet_build(force=True), n=1)
+        record("build_processed_noop", lambda: quiet_build(), n=1)
+
+    return results
+
+
+def _environment() -> Dict[str, Any]:
+    import numpy
+    import pandas
+
+    return {
+        "python": platform.python_version(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    if baseline.get("environment") != _environment():
+        print(
+            "\n⚠ The baseline was recorded in a different environment "
+            f"({baseline.get('environment')}); re-save it on this machine for meaningful ratios."
+        )
+    print(f"\nComparison with baseline (threshold x{threshold:.2f}):")
+    for name, r in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = r["seconds"] / base["seconds"] if base["seconds"] else float("inf")
+        flag = ""
+        if ratio > threshold:
+            flag = "  <-- REGRESSION"
+            regressions.append(name)
+        if "peak_mb" in r and "peak_mb" in base and base["peak_mb"]:
+            mem_ratio = r["peak_mb"] / base["peak_mb"]
+            if mem_ratio > threshold:
+                flag += "  <-- MEMORY"
+                regressions.append(f"{name} (memory)")
+            print(f"  {name:<48} time x{ratio:5.2f}  mem x{mem_ratio:5.2f}{flag}")
+        else:
+            print(f"  {name:<48} time x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark loader, cleaner, metadata, slicer and build on synthetic data."
+    )
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000],
+        help="Raw row counts to generate (e.g. 10000 1000000 50000000).",
+    )
+    parser.add_argument("--kinds", nargs="+", default=["daily", "irregular"], choices=["daily", "irregular"])
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (best is reported).")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory runs.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--save", type=Path, nargs="?", const=DEFAULT_BASELINE,
+        help=f"Write results as a baseline JSON file (default: baselines/{DEFAULT_BASELINE.name}).",
+    )
+    parser.add_argument(
+        "--compare", type=Path, metavar="BASELINE",
+        help="Baseline JSON saved on this machine to compare against (needs --repeat >= 2).",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=1.5,
+        help="Slowdown ratio above which a case counts as a regression.",
+    )
+    args = parser.parse_args(argv)
+    if args.compare and args.repeat < 2:
+        parser.error("--compare needs --repeat of at least 2 so single noisy runs don't count.")
+    if args.compare and not args.compare.exists():
+        parser.error(f"No baseline at {args.compare}; record one with --save first.")
+
+    results = run(args.rows, args.kinds, args.repeat, not args.no_memory, args.seed)
+    payload = {"environment": _environment(), "args": {"rows": args.rows, "kinds": args.kinds}, "results": results}
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(payload, indent=2))
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.compare}")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import argparse
+import ast
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+APP_PATH = ROOT_DIR / "streamlit_app.py"
+
+# Cold-start checks for the app, each measured in a fresh interpreter (best
+# of --repeat runs): the time to import everything streamlit_app.py imports
+# at module level, and the time for its first render plus the first "Load
+# Data" click under streamlit's AppTest harness. Exits 1 when either goes
+# over its budget.
+
+_IMPORT_SCRIPT = """
+import sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+print(time.perf_counter() - t0)
+"""
+
+_RENDER_SCRIPT = """
+import json, time
+from streamlit.testing.v1 import AppTest
+t0 = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=60)
+at.run()
+first = time.perf_counter() - t0
+at.sidebar.button[0].click().run()
+load = time.perf_counter() - t0 - first
+errors = [str(e.value) for e in at.exception]
+print(json.dumps({{"first_render": first, "first_load": load, "errors": errors}}))
+"""
+
+
+def app_imports() -> List[str]:
+    # Modules imported at the top level of the app script.
+    tree = ast.parse(APP_PATH.read_text(encoding="utf-8"))
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def _run(script: str) -> str:
+    # The stub's answers go to a scratch cache, not the checkout's .cache/ai.
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ, MTM_AI_BACKEND="stub", MTM_AI_CACHE_DIR=cache_dir)
+        out = subprocess.run(
+            [sys.executable, "-c", script], cwd=ROOT_DIR, env=env, capture_output=True, text=True,
+        )
+    if out.returncode != 0:
+        lines = out.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"exit status {out.returncode}")
+    return out.stdout.strip().splitlines()[-1]
+
+
+def import_seconds(repeat: int) -> float:
+    modules = [m for m in app_imports() if m != "streamlit" or importlib.util.find_spec(m)]
+    script = _IMPORT_SCRIPT.format(root=str(ROOT_DIR), modules=modules)
+    return min(float(_run(script)) for _ in range(repeat))
+
+
+def render_seconds(repeat: int) -> Optional[dict]:
+    if importlib.util.find_spec("streamlit") is None:
+        return None
+    runs = [json.loads(_run(_RENDER_SCRIPT.format(app=str(APP_PATH)))) for _ in range(repeat)]
+    return min(runs, key=lambda r: r["first_render"] + r["first_load"])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the app's cold-start time against budgets.")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh-interpreter runs (best is used).")
+    parser.add_argument("--import-budget", type=float, default=2.0, help="Seconds allowed for imports.")
+    parser.add_argument(
+        "--render-budget", type=float, default=5.0,
+        help="Seconds allowed for the first render plus the first Load Data click.",
+    )
+    args = parser.parse_args(argv)
+
+    failures = []
+    seconds = import_seconds(args.repeat)
+    print(f"  {'import':<24} {seconds * 1000:10.1f} ms   (budget {args.import_budget * 1000:.0f} ms)")
+    if seconds > args.import_budget:
+        failures.append("import")
+
+    try:
+        render = render_seconds(args.repeat)
+    except RuntimeError as e:
+        print(f"  {'first render':<24}     failed   ({e})")
+        return 1
+    if render is None:
+        print(f"  {'first render':<24}    skipped   (streamlit is not installed)")
+    else:
+        total = render["first_render"] + render["first_load"]
+        print(f"  {'first render':<24} {render['first_render'] * 1000:10.1f} ms")
+        print(f"  {'first load':<24} {render['first_load'] * 1000:10.1f} ms")
+        print(f"  {'render total':<24} {total * 1000:10.1f} ms   (budget {args.render_budget * 1000:.0f} ms)")
+        if render["errors"]:
+            print("  app raised: " + "; ".join(render["errors"]))
+            failures.append("render errors")
+        if total > args.render_budget:
+            failures.append("render")
+
+    if failures:
+        print(f"\nOver budget: {', '.join(failures)}")
+        return 1
+    print("\nWithin budget.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
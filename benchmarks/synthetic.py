@@ -0,0 +1,57 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Synthetic raw CSVs shaped like the FRED downloads in data_raw/
+# (observation_date,<SERIES_ID>), written in blocks so even 50M-row files
+# are generated with bounded memory.
+KINDS = ("daily", "irregular")
+
+_START = pd.Timestamp("1950-01-01").value
+_END = pd.Timestamp("2025-12-31").value
+_DAY_NS = 86_400 * 10**9
+_BLOCK_ROWS = 1_000_000
+
+
+def _timestamps(kind: str, rows: int, rng: np.random.Generator) -> np.ndarray:
+    if kind == "daily":
+        # One row per day when the span allows it, evenly spaced intraday
+        # ticks beyond that (datetime64[ns] cannot go past 2262).
+        step = min(_DAY_NS, (_END - _START) // rows)
+        return _START + step * np.arange(rows, dtype=np.int64)
+    if kind == "irregular":
+        # Random gaps with duplicate timestamps and ~2% of rows swapped out of
+        # order, like a concatenation of vendor dumps.
+        ts = np.sort(rng.integers(_START, _END, size=rows, dtype=np.int64))
+        swap = rng.choice(rows, size=max(rows // 50, 1), replace=False)
+        ts[swap] = ts[swap[::-1]]
+        return ts
+    raise ValueError(f"Unknown kind {kind!r}; expected one of {KINDS}")
+
+
+def _fmt_dates(ts: np.ndarray, intraday: bool) -> np.ndarray:
+    unit = "s" if intraday else "D"
+    return np.datetime_as_string(ts.astype("datetime64[ns]"), unit=unit)
+
+
+def write_raw_csv(path: Path, kind: str, rows: int, seed: int = 0) -> Path:
+    rng = np.random.default_rng(seed)
+    ts = _timestamps(kind, rows, rng)
+    intraday = bool(np.any(ts % _DAY_NS))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    level = 100.0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("observation_date,SYNTH\n")
+        for lo in range(0, rows, _BLOCK_ROWS):
+            hi = min(lo + _BLOCK_ROWS, rows)
+            steps = rng.normal(0.0, 0.5, size=hi - lo)
+            values = level + np.cumsum(steps)
+            level = float(values[-1])
+            text = np.char.mod("%.4f", values).astype(object)
+            # ~1% blanks, as in the FRED files' missing observations.
+            text[rng.random(hi - lo) < 0.01] = ""
+            dates = _fmt_dates(ts[lo:hi], intraday)
+            f.write("\n".join(d + "," + v for d, v in zip(dates, text)))
+            f.write("\n")
+    return path
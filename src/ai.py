@@ -0,0 +1,357 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Protocol
+from .config import (
+    AI_CACHE_DIR,
+    AI_CACHE_MAX_ENTRIES,
+    AI_CACHE_TTL_SECONDS,
+    AI_MAX_WORKERS,
+    AI_TIMEOUT_SECONDS,
+    GEMINI_MODEL,
+)
+
+
+class AIBackend(Protocol):
+    # Anything that turns a prompt into text. `model` is part of the cache
+    # key, so two backends only share cached answers if they share a model.
+    # Backends may also define stream(prompt) -> Iterator[str] to yield the
+    # answer in pieces as it is produced.
+    model: str
+
+    def generate(self, prompt: str) -> str:
+        ...
+
+
+class GeminiBackend:
+    # `timeout` bounds each upstream request, so a hung call frees its
+    # worker slot instead of holding it forever.
+    def __init__(
+        self, api_key: str, model: str = GEMINI_MODEL, timeout: float = AI_TIMEOUT_SECONDS
+    ) -> None:
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            import google.generativeai as genai
+
+            genai.configure(api_key=self.api_key)
+            self._client = genai.GenerativeModel(self.model)
+        return self._client
+
+    def generate(self, prompt: str) -> str:
+        resp = self._get_client().generate_content(
+            prompt, request_options={"timeout": self.timeout}
+        )
+        return (resp.text or "").strip()
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        chunks = self._get_client().generate_content(
+            prompt, stream=True, request_options={"timeout": self.timeout}
+        )
+        for chunk in chunks:
+            text = chunk.text or ""
+            if text:
+                yield text
+
+
+class StubBackend:
+    # Deterministic local stand-in for tests and benchmarks: the answer only
+    # depends on the prompt. `latency` delays the first token (a slow
+    # upstream) and `token_delay` spaces out streamed words.
+    def __init__(self, model: str = "stub", latency: float = 0.0, token_delay: float = 0.0) -> None:
+        self.model = model
+        self.latency = latency
+        self.token_delay = token_delay
+        self.calls = 0
+
+    def _answer(self, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        return (
+            f"[stub interpretation {digest}] This is a deterministic placeholder "
+            f"generated locally for a {len(prompt)}-character prompt."
+        )
+
+    def generate(self, prompt: str) -> str:
+        return "".join(self.stream(prompt))
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        words = self._answer(prompt).split(" ")
+        for i, word in enumerate(words):
+            if i and self.token_delay:
+                time.sleep(self.token_delay)
+            yield word if i == len(words) - 1 else word + " "
+
+
+def make_backend(name: str, api_key: Optional[str] = None) -> Optional[AIBackend]:
+    # None when the requested backend cannot be used (e.g. no Gemini key).
+    if name == "stub":
+        return StubBackend()
+    if name == "gemini":
+        return GeminiBackend(api_key) if api_key else None
+    raise ValueError(f"Unknown AI backend: {name!r}")
+
+
+def cache_key(model: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class InterpretationCache:
+    # One JSON file per (model, prompt) under `directory`, so the cache is
+    # shared by every app process on the host and survives restarts. A file's
+    # mtime is its last access time (bumped on every hit) and drives LRU
+    # eviction; `ttl_seconds` bounds the age of an answer since creation.
+    def __init__(
+        self,
+        directory: Path = AI_CACHE_DIR,
+        max_entries: int = AI_CACHE_MAX_ENTRIES,
+        ttl_seconds: Optional[float] = AI_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        path = self._path(cache_key(model, prompt))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._count("misses")
+            return None
+
+        if self.ttl_seconds is not None and time.time() - entry["created"] > self.ttl_seconds:
+            self._unlink(path)
+            self._count("misses")
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count("hits")
+        return entry["text"]
+
+    def put(self, model: str, prompt: str, text: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(cache_key(model, prompt))
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"model": model, "created": time.time(), "text": text}, f)
+        os.replace(tmp, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return
+        entries.sort()
+        for _, path in entries[:excess]:
+            if self._unlink(path):
+                self._count("evictions")
+
+    def _unlink(self, path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.json"):
+            self._unlink(path)
+
+    def stats(self) -> Dict[str, Any]:
+        entries = len(list(self.directory.glob("*.json"))) if self.directory.exists() else 0
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+            }
+
+
+def interpret(
+    prompt: str, backend: AIBackend, cache: Optional[InterpretationCache] = None
+) -> str:
+    # Backend errors propagate and are never cached.
+    if cache is not None:
+        cached = cache.get(backend.model, prompt)
+        if cached is not None:
+            return cached
+
+    text = backend.generate(prompt)
+    if cache is not None and text:
+        cache.put(backend.model, prompt, text)
+    return text
+
+
+class InterpretationJob:
+    # One upstream call, shared by every caller that asks for the same
+    # (model, prompt) while it is in flight. Chunks are appended by the
+    # worker thread and read by any number of iter_chunks() consumers.
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.chunks: List[str] = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+        self._cond = threading.Condition()
+
+    def _append(self, chunk: str) -> None:
+        with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    def _finish(self, error: Optional[BaseException] = None) -> None:
+        with self._cond:
+            self.error = error
+            self.done = True
+            self._cond.notify_all()
+
+    def text(self) -> str:
+        with self._cond:
+            return "".join(self.chunks)
+
+    def iter_chunks(self, timeout: Optional[float] = None) -> Iterator[str]:
+        # Yields chunks as they arrive, from the first one. Raises
+        # TimeoutError once `timeout` seconds pass without completion; the
+        # upstream call keeps running and its answer is still cached, but the
+        # job stops being shared, so a retry starts a fresh upstream call.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        seen = 0
+        while True:
+            with self._cond:
+                while seen >= len(self.chunks) and not self.done:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        _forget(self)
+                        raise TimeoutError(f"AI interpretation did not finish within {timeout}s")
+                    self._cond.wait(remaining)
+                new = self.chunks[seen:]
+                seen = len(self.chunks)
+                finished = self.done and not new
+                error = self.error
+
+            if finished:
+                if error is not None:
+                    raise error
+                return
+            yield from new
+
+    def result(self, timeout: Optional[float] = None) -> str:
+        for _ in self.iter_chunks(timeout):
+            pass
+        return self.text()
+
+
+_INFLIGHT: Dict[str, InterpretationJob] = {}
+_INFLIGHT_LOCK = threading.Lock()
+# Upstream calls run on daemon threads (a hung call never blocks interpreter
+# exit), at most AI_MAX_WORKERS at a time.
+_SLOTS = threading.BoundedSemaphore(AI_MAX_WORKERS)
+
+
+def _forget(job: InterpretationJob) -> None:
+    with _INFLIGHT_LOCK:
+        if _INFLIGHT.get(job.key) is job:
+            del _INFLIGHT[job.key]
+
+
+def _run_job(
+    job: InterpretationJob, prompt: str, backend: AIBackend, cache: Optional[InterpretationCache]
+) -> None:
+    # When every slot stays busy for AI_TIMEOUT_SECONDS the job fails rather
+    # than queueing behind calls that may never return.
+    slots = _SLOTS
+    if not slots.acquire(timeout=AI_TIMEOUT_SECONDS):
+        job._finish(RuntimeError("Too many AI requests in flight; try again shortly."))
+        _forget(job)
+        return
+    try:
+        stream = getattr(backend, "stream", None)
+        if stream is not None:
+            for chunk in stream(prompt):
+                job._append(chunk)
+        else:
+            job._append(backend.generate(prompt))
+
+        text = job.text().strip()
+        if cache is not None and text:
+            cache.put(backend.model, prompt, text)
+        job._finish()
+    except BaseException as e:
+        job._finish(e)
+    finally:
+        slots.release()
+        _forget(job)
+
+
+def start_interpretation(
+    prompt: str, backend: AIBackend, cache: Optional[InterpretationCache] = None
+) -> InterpretationJob:
+    # Non-blocking: returns at once with a job running on its own worker
+    # thread. Cached answers come back as an already finished job, and an
+    # identical prompt already in flight is joined instead of re-sent.
+    key = cache_key(backend.model, prompt)
+    if cache is not None:
+        cached = cache.get(backend.model, prompt)
+        if cached is not None:
+            job = InterpretationJob(key)
+            job._append(cached)
+            job._finish()
+            return job
+
+    with _INFLIGHT_LOCK:
+        job = _INFLIGHT.get(key)
+        if job is not None:
+            return job
+        job = InterpretationJob(key)
+        _INFLIGHT[key] = job
+
+    threading.Thread(
+        target=_run_job, args=(job, prompt, backend, cache), name="ai", daemon=True
+    ).start()
+    return job
+
+
+def stream_interpretation(
+    prompt: str,
+    backend: AIBackend,
+    cache: Optional[InterpretationCache] = None,
+    timeout: Optional[float] = None,
+) -> Iterator[str]:
+    # The answer accumulated so far, yielded as chunks arrive. Raises
+    # TimeoutError once `timeout` (default AI_TIMEOUT_SECONDS) passes
+    # without the answer being complete.
+    text = ""
+    job = start_interpretation(prompt, backend, cache)
+    for chunk in job.iter_chunks(timeout=AI_TIMEOUT_SECONDS if timeout is None else timeout):
+        text += chunk
+        yield text
@@ -0,0 +1,119 @@
+from typing import List
+import numpy as np
+import pandas as pd
+from .config import (
+    ANALYTICS_MA_YEARS,
+    ANALYTICS_VOL_YEARS,
+    ANALYTICS_ZSCORE_YEARS,
+    PERIODS_PER_YEAR,
+)
+
+# Rolling analytics computed once per series at build time and stored as
+# extra columns next to Date/Value, so a slice only has to cut rows:
+#   Vol <n>Y     annualised rolling std of the period-over-period Change %
+#   Z <n>Y       (Value - rolling mean) / rolling std
+#   Drawdown %   distance below the running peak, relative to the peak
+#   YoY %        change against the latest observation a year or more earlier
+#   MA <n>Y      rolling mean of Value
+# Rolling windows only produce a value once they are full.
+
+
+def analytics_columns() -> List[str]:
+    return [
+        f"Vol {ANALYTICS_VOL_YEARS}Y",
+        f"Z {ANALYTICS_ZSCORE_YEARS}Y",
+        "Drawdown %",
+        "YoY %",
+        *[f"MA {years}Y" for years in ANALYTICS_MA_YEARS],
+    ]
+
+
+def _window_rows(years: float, resolution: str, minimum: int = 1) -> int:
+    return max(int(round(years * PERIODS_PER_YEAR[resolution])), minimum)
+
+
+def yoy_change(
+    dates: pd.Series,
+    values: np.ndarray,
+    source_ordinals: np.ndarray,
+    source_values: np.ndarray,
+) -> np.ndarray:
+    # The base for each date is looked up in the sorted source series (int64
+    # ns ordinals), which may reach further back than `dates`. Month-end
+    # dates compare with the month end a year earlier, so 2001-02-28 finds
+    # 2000-02-29 rather than the row before 2000-02-28.
+    shifted = dates - pd.DateOffset(years=1)
+    shifted = shifted.where(~dates.dt.is_month_end, shifted + pd.offsets.MonthEnd(0))
+    year_ago = shifted.to_numpy(dtype="datetime64[ns]").view("i8")
+    pos = np.searchsorted(source_ordinals, year_ago, side="right") - 1
+    base = np.where(pos >= 0, source_values[np.maximum(pos, 0)], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (values / base - 1.0) * 100
+    change[~np.isfinite(change)] = np.nan
+    return change
+
+
+def context_start(dates: np.ndarray, first_date: int, resolution: str) -> int:
+    # First row of `dates` (int64 ns history) that the analytics of new rows
+    # from first_date on depend on, apart from the drawdown's running peak:
+    # recomputing from there with prior_peak set reproduces a full recompute.
+    rows = max(
+        _window_rows(ANALYTICS_VOL_YEARS, resolution, minimum=2) + 1,
+        _window_rows(ANALYTICS_ZSCORE_YEARS, resolution, minimum=2),
+        *[_window_rows(years, resolution) for years in ANALYTICS_MA_YEARS],
+    )
+    year_ago = (pd.Timestamp(first_date) - pd.DateOffset(years=1)).value
+    start = min(len(dates) - rows, int(np.searchsorted(dates, year_ago, side="right")) - 1)
+    return max(start, 0)
+
+
+def compute_analytics(
+    df: pd.DataFrame, resolution: str = "M", prior_peak: float = np.nan
+) -> pd.DataFrame:
+    # `df` is a sorted Date/Value series at `resolution`; returns the
+    # analytics columns on the same row positions. prior_peak is the peak of
+    # any history before `df` (see context_start).
+    values = df["Value"].to_numpy(dtype="float64")
+    dates = df["Date"].to_numpy(dtype="datetime64[ns]").view("i8")
+    level = pd.Series(values)
+    cols = analytics_columns()
+    out = {}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prev = np.empty_like(values)
+        prev[:1] = np.nan
+        prev[1:] = values[:-1]
+        change = (values / prev - 1.0) * 100
+        change[~np.isfinite(change)] = np.nan
+
+        n = _window_rows(ANALYTICS_VOL_YEARS, resolution, minimum=2)
+        vol = pd.Series(change).rolling(n, min_periods=n).std().to_numpy()
+        out[cols[0]] = vol * np.sqrt(PERIODS_PER_YEAR[resolution])
+
+        n = _window_rows(ANALYTICS_ZSCORE_YEARS, resolution, minimum=2)
+        rolling = level.rolling(n, min_periods=n)
+        mean = rolling.mean().to_numpy()
+        std = rolling.std().to_numpy()
+        z = (values - mean) / std
+        z[~np.isfinite(z)] = np.nan
+        out[cols[1]] = z
+
+        # fmax skips NaN, so gaps do not reset the peak.
+        peak = np.fmax.accumulate(np.fmax(values, prior_peak)) if len(values) else values
+        drawdown = (values - peak) / np.abs(peak) * 100
+        drawdown[~np.isfinite(drawdown)] = np.nan
+        out["Drawdown %"] = drawdown
+
+    out["YoY %"] = yoy_change(df["Date"], values, dates, values)
+
+    for years in ANALYTICS_MA_YEARS:
+        n = _window_rows(years, resolution)
+        out[f"MA {years}Y"] = level.rolling(n, min_periods=n).mean().to_numpy()
+
+    return pd.DataFrame(out, columns=cols)
+
+
+def with_analytics(df: pd.DataFrame, resolution: str = "M") -> pd.DataFrame:
+    return pd.concat(
+        [df[["Date", "Value"]].reset_index(drop=True), compute_analytics(df, resolution)], axis=1
+    )
@@ -0,0 +1,284 @@
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, get_args
+from urllib.parse import parse_qs, urlsplit
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import pandas as pd
+
+from src.config import (
+    API_GZIP_MIN_BYTES,
+    API_HOST,
+    API_PORT,
+    API_WORKERS,
+    INDICATOR_CONFIG,
+    METADATA_CSV_PATH,
+)
+from src.slicer import SliceResult, WindowType, data_version, slice_indicator
+
+# Read-only JSON/CSV API over the processed data, served by the same slicer
+# (and series cache) as the app:
+#   GET /health
+#   GET /metadata                          indicators_meta.csv
+#   GET /indicators/<id>/slice?window=10Y  rows + summary
+#   GET /indicators/<id>/summary?start=2000-01&end=2010-12
+# Slice parameters: window | start/end, resolution | max_rows, and the flags
+# yoy, log_change, analytics. format=csv (or Accept: text/csv) returns CSV.
+# ETags are derived from the processed-data version, so a client sending
+# If-None-Match gets a 304 until the indicator is rebuilt.
+
+_BOOL_PARAMS = ("yoy", "log_change", "analytics")
+_TRUE = ("1", "true", "yes", "on")
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _clean(value: Any) -> Any:
+    # NaN/inf are not valid JSON.
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _clean(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_clean(v) for v in value]
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d")
+    return value
+
+
+def _etag(*parts: Any) -> str:
+    return '"' + hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def _file_version(path: Path) -> Tuple[int, int]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise ApiError(404, f"Not found: {path.name}") from None
+    return stat.st_mtime_ns, stat.st_size
+
+
+_METADATA: Dict[str, Any] = {}
+_METADATA_LOCK = threading.Lock()
+
+
+def _metadata() -> Tuple[Tuple[int, int], pd.DataFrame]:
+    version = _file_version(METADATA_CSV_PATH)
+    with _METADATA_LOCK:
+        if _METADATA.get("version") != version:
+            _METADATA["frame"] = pd.read_csv(METADATA_CSV_PATH)
+            _METADATA["version"] = version
+        return version, _METADATA["frame"]
+
+
+def _slice_kwargs(params: Dict[str, str]) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {}
+    for key in ("window", "start", "end", "resolution"):
+        if params.get(key):
+            kwargs[key] = params[key]
+    if params.get("max_rows"):
+        try:
+            kwargs["max_rows"] = int(params["max_rows"])
+        except ValueError:
+            raise ApiError(400, "max_rows must be an integer.") from None
+    for key in _BOOL_PARAMS:
+        if key in params:
+            kwargs[key] = params[key].lower() in _TRUE
+    if "window" in kwargs and kwargs["window"] not in get_args(WindowType):
+        raise ApiError(400, f"Unknown window {kwargs['window']!r}.")
+    return kwargs
+
+
+def _slice_payload(result: SliceResult, include_data: bool) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "indicator_id": result.indicator_id,
+        "resolution": result.resolution,
+        "start_date": result.start_date,
+        "end_date": result.end_date,
+        "summary": result.summary,
+    }
+    if include_data:
+        data = result.data.copy()
+        data["Date"] = data["Date"].dt.strftime("%Y-%m-%d")
+        payload["columns"] = list(data.columns)
+        payload["rows"] = data.to_numpy(dtype=object).tolist()
+    return _clean(payload)
+
+
+def _slice_csv(result: SliceResult) -> str:
+    data = result.data.copy()
+    data["Date"] = data["Date"].dt.strftime("%Y-%m-%d")
+    return data.to_csv(index=False)
+
+
+def handle(path: str, params: Dict[str, str], want_csv: bool) -> Tuple[str, Any, str]:
+    # Returns (etag, body, content type) or raises ApiError. The etag is
+    # computed before any slicing so 304s cost one stat per series.
+    parts = [p for p in path.split("/") if p]
+    if parts == ["health"]:
+        return "", {"status": "ok"}, "application/json"
+
+    if parts == ["metadata"]:
+        version, meta = _metadata()
+        etag = _etag("metadata", version, want_csv)
+        if want_csv:
+            return etag, lambda: meta.to_csv(index=False), "text/csv"
+        return etag, lambda: _clean(meta.to_dict(orient="records")), "application/json"
+
+    if len(parts) == 3 and parts[0] == "indicators" and parts[2] in ("slice", "summary"):
+        indicator_id, view = parts[1], parts[2]
+        if indicator_id not in INDICATOR_CONFIG:
+            raise ApiError(404, f"Unknown indicator {indicator_id!r}.")
+        kwargs = _slice_kwargs(params)
+        try:
+            version = data_version([indicator_id])
+        except FileNotFoundError as e:
+            raise ApiError(404, str(e)) from None
+        etag = _etag(view, indicator_id, version, sorted(kwargs.items()), want_csv)
+
+        def body():
+            try:
+                result = slice_indicator(indicator_id, **kwargs)
+            except ValueError as e:
+                raise ApiError(400, str(e)) from None
+            if view == "slice" and want_csv:
+                return _slice_csv(result)
+            return _slice_payload(result, include_data=view == "slice")
+
+        content_type = "text/csv" if view == "slice" and want_csv else "application/json"
+        return etag, body, content_type
+
+    raise ApiError(404, f"Unknown path {path!r}.")
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "MacroTimeMachineAPI/1.0"
+    protocol_version = "HTTP/1.1"
+    # Idle keep-alive connections give their worker thread back after this.
+    timeout = 10
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        want_csv = params.pop("format", "") == "csv" or (
+            "text/csv" in self.headers.get("Accept", "")
+        )
+        try:
+            etag, body, content_type = handle(url.path, params, want_csv)
+            if etag and etag in self._if_none_match():
+                self._send(304, b"", content_type, etag)
+                return
+            if callable(body):
+                body = body()
+        except ApiError as e:
+            self._send_json(e.status, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+
+        if content_type == "application/json":
+            data = json.dumps(body, allow_nan=False).encode("utf-8")
+        else:
+            data = body.encode("utf-8")
+        self._send(200, data, content_type, etag)
+
+    def _if_none_match(self):
+        header = self.headers.get("If-None-Match", "")
+        return {tag.strip() for tag in header.split(",") if tag.strip()}
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"), "application/json", "")
+
+    def _send(self, status: int, data: bytes, content_type: str, etag: str) -> None:
+        gzipped = (
+            len(data) >= API_GZIP_MIN_BYTES
+            and "gzip" in self.headers.get("Accept-Encoding", "")
+        )
+        if gzipped:
+            data = gzip.compress(data, compresslevel=5)
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Vary", "Accept, Accept-Encoding")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class PooledHTTPServer(HTTPServer):
+    # Like ThreadingHTTPServer, but connections are handled on a fixed pool
+    # of worker threads instead of one new thread each.
+    daemon_threads = True
+
+    def __init__(self, address, handler, workers: int = API_WORKERS, quiet: bool = False) -> None:
+        super().__init__(address, handler)
+        self.quiet = quiet
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+
+    def process_request(self, request, client_address) -> None:
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._pool.shutdown(wait=False)
+
+
+def make_server(
+    host: str = API_HOST, port: int = API_PORT, workers: int = API_WORKERS, quiet: bool = False
+) -> PooledHTTPServer:
+    return PooledHTTPServer((host, port), ApiHandler, workers=workers, quiet=quiet)
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve processed indicators over HTTP.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="Request worker threads.")
+    parser.add_argument("--quiet", action="store_true", help="Do not log each request.")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.workers, args.quiet)
+    print(f"📡 Serving on http://{args.host}:{server.server_address[1]} ({args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,243 @@
+import argparse
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict, List, Optional
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
-from src.config import INDICATOR_CONFIG, DATA_PROCESSED_DIR
-from src.cleaner import clean_and_save_indicator
-from src.metadata import build_metadata
+import pandas as pd
 
+from src.config import (
+    INDICATOR_CONFIG,
+    DATA_PROCESSED_DIR,
+    METADATA_CSV_PATH,
+    PROCESSED_STORE_DIR,
+    SNAPSHOT_PATH,
+)
+from src.cleaner import append_indicator, clean_and_save_indicator, remove_indicator_outputs
+from src.derived import dependents, dependency_order, raw_indicator_ids
+from src.metadata import build_metadata, derived_coverage, update_metadata
+from src.snapshot import build_snapshot, update_snapshot, write_snapshot
+from src.data_signal import publish_data_version
+from src.manifest import (
+    append_fingerprint,
+    code_version,
+    config_hash,
+    fingerprint,
+    is_up_to_date,
+    load_manifest,
+    save_manifest,
+)
 
-def main() -> None:
+
+@dataclass
+class CleanResult:
+    indicator_id: str
+    df: Optional[pd.DataFrame]
+    error: Optional[str]
+    seconds: float
+    appended: bool = False
+
+
+def _clean_one(indicator_id: str) -> CleanResult:
+    # Runs in a worker process when --workers > 1, so it must stay top-level
+    # and return only picklable values.
+    t0 = time.perf_counter()
+    try:
+        df = clean_and_save_indicator(indicator_id)
+        return CleanResult(indicator_id, df, None, time.perf_counter() - t0)
+    except Exception as e:
+        return CleanResult(indicator_id, None, str(e), time.perf_counter() - t0)
+
+
+def _append_one(indicator_id: str, raw_offset: int) -> Optional[CleanResult]:
+    # None when the indicator needs a full clean after all.
+    t0 = time.perf_counter()
+    try:
+        df = append_indicator(indicator_id, raw_offset)
+    except Exception as e:
+        return CleanResult(indicator_id, None, str(e), time.perf_counter() - t0)
+    if df is None:
+        return None
+    return CleanResult(indicator_id, df, None, time.perf_counter() - t0, appended=True)
+
+
+def _clean_all(indicator_ids: List[str], workers: int) -> Dict[str, CleanResult]:
+    if workers <= 1 or len(indicator_ids) <= 1:
+        return {i: _clean_one(i) for i in indicator_ids}
+
+    results: Dict[str, CleanResult] = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(indicator_ids))) as pool:
+        futures = {pool.submit(_clean_one, i): i for i in indicator_ids}
+        for future in as_completed(futures):
+            indicator_id = futures[future]
+            try:
+                results[indicator_id] = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. out of memory).
+                results[indicator_id] = CleanResult(indicator_id, None, str(e), 0.0)
+    return results
+
+
+def _stale_indicator_ids(entries: Dict[str, dict]) -> List[str]:
+    # Indicators with built outputs that are no longer raw indicators in the
+    # config: listed in the manifest, or with store headers left behind.
+    raw = set(raw_indicator_ids())
+    ids = set(entries)
+    ids.update(p.stem.partition("@")[0] for p in PROCESSED_STORE_DIR.glob("*.json"))
+    return sorted(ids - raw)
+
+
+def main(force: bool = False, workers: int = 1, append: bool = True) -> List[str]:
+    # Returns the indicators that were rebuilt or removed.
     print("🧹 Cleaning and standardizing indicators to monthly...\n")
+    t0 = time.perf_counter()
 
     DATA_PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
-    for indicator_id in INDICATOR_CONFIG.keys():
+    manifest = load_manifest()
+    entries = manifest["indicators"]
+    code = code_version()
+    # Outputs of indicators dropped from the config (or turned into derived
+    # ones) would otherwise stay readable by the slicer.
+    removed = _stale_indicator_ids(entries)
+    for indicator_id in removed:
+        entries.pop(indicator_id, None)
+        remove_indicator_outputs(indicator_id)
+        print(f" 🗑 {indicator_id}: no longer a raw indicator, outputs removed")
+
+    dirty = []
+    fingerprints = {}
+    results: Dict[str, CleanResult] = {}
+    for indicator_id in raw_indicator_ids():
         try:
-            df = clean_and_save_indicator(indicator_id)
-            if df.empty:
-                print(f" ⚠ {indicator_id}: EMPTY after cleaning — check raw data.")
-            else:
-                start = df["Date"].min().strftime("%Y-%m")
-                end = df["Date"].max().strftime("%Y-%m")
-                print(f" ✔ {indicator_id}: {len(df)} rows [{start} → {end}]")
+            previous = entries.get(indicator_id)
+            # Raw files that only grew are updated from their tail.
+            appended = None
+            if append and not force:
+                appended = append_fingerprint(indicator_id, code, previous)
+            if appended is not None:
+                result = _append_one(indicator_id, appended[1])
+                if result is not None:
+                    dirty.append(indicator_id)
+                    fingerprints[indicator_id] = appended[0]
+                    results[indicator_id] = result
+                    continue
+            current = fingerprint(indicator_id, code, previous)
         except Exception as e:
+            entries.pop(indicator_id, None)
             print(f" ❌ ERROR processing {indicator_id}: {e}")
+            continue
+
+        if not force and is_up_to_date(indicator_id, previous, current):
+            # Refresh the cached stat so the next run skips re-hashing.
+            previous.update(current)
+            print(f" · {indicator_id}: unchanged, skipped")
+            continue
+        dirty.append(indicator_id)
+        fingerprints[indicator_id] = current
+
+    results.update(_clean_all([i for i in dirty if i not in results], workers))
+
+    frames = {}
+    for indicator_id in dirty:
+        res = results[indicator_id]
+        if res.error is not None:
+            entries.pop(indicator_id, None)
+            print(f" ❌ ERROR processing {indicator_id}: {res.error}")
+            continue
+
+        df = res.df
+        frames[indicator_id] = df
+        entries[indicator_id] = fingerprints[indicator_id]
+        if df.empty:
+            print(f" ⚠ {indicator_id}: EMPTY after cleaning — check raw data.")
+        else:
+            start = df["Date"].min().strftime("%Y-%m")
+            end = df["Date"].max().strftime("%Y-%m")
+            how = f"{res.seconds:.2f}s, appended" if res.appended else f"{res.seconds:.2f}s"
+            print(f" ✔ {indicator_id}: {len(df)} rows [{start} → {end}] ({how})")
+
+    # Derived indicators are not built, only listed in the metadata: refresh
+    # the rows of those whose spec changed or whose inputs were rebuilt, and
+    # record their coverage in the manifest (the metadata reads it there).
+    rebuilt = list(frames)
+    derived_hashes = manifest.setdefault("derived", {})
+    derived_stats = manifest.setdefault("derived_stats", {})
+    removed += [i for i in derived_hashes if i not in INDICATOR_CONFIG]
+    refreshed = set(dependents(rebuilt + removed))
+    for indicator_id in dependency_order():
+        current = config_hash(indicator_id)
+        if derived_hashes.get(indicator_id) != current or indicator_id not in derived_stats:
+            refreshed.add(indicator_id)
+            derived_hashes[indicator_id] = current
+        if indicator_id in refreshed:
+            derived_stats[indicator_id] = derived_coverage(indicator_id)
+    for indicator_id in removed:
+        if indicator_id not in INDICATOR_CONFIG:
+            derived_hashes.pop(indicator_id, None)
+            derived_stats.pop(indicator_id, None)
+    rebuilt += sorted(refreshed)
+
+    save_manifest(manifest)
+
+    if force or not METADATA_CSV_PATH.exists():
+        print("\n📌 Building metadata...")
+        meta_df = build_metadata(frames)
+        print(meta_df)
+    elif rebuilt or removed:
+        print(f"\n📌 Updating metadata for {len(rebuilt) + len(removed)} indicator(s)...")
+        meta_df = update_metadata(rebuilt + removed, frames)
+        print(meta_df)
+    else:
+        print("\n📌 Metadata unchanged.")
+
+    if force or not SNAPSHOT_PATH.exists():
+        snapshot = build_snapshot()
+    elif rebuilt or removed:
+        snapshot = update_snapshot(rebuilt + removed)
+    else:
+        snapshot = None
+    if snapshot is not None:
+        write_snapshot(snapshot)
+        count = sum(len(e["results"]) for e in snapshot["indicators"].values())
+        print(f"📸 Quick-window snapshot: {count} slices for {len(snapshot['indicators'])} indicators.")
 
-    print("\n📌 Building metadata...")
-    meta_df = build_metadata()
-    print(meta_df)
-    print("\n🎯 Done! All indicators ready.\n")
+    changed = list(dict.fromkeys(rebuilt + removed))
+    if changed:
+        # Tells running app workers to drop their cached series and metadata.
+        signal = publish_data_version(changed)
+        print(f"📣 Data version {signal['version']} published.")
+    print(f"\n🎯 Done! All indicators ready in {time.perf_counter() - t0:.2f}s.\n")
+    return changed
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Build data_processed/ from data_raw/.")
+    parser.add_argument(
+        "--force", action="store_true", help="Rebuild every indicator, ignoring the manifest."
+    )
+    parser.add_argument(
+        "--no-append",
+        action="store_true",
+        help="Fully rebuild raw files that only had rows appended instead of updating their tail.",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for cleaning (0 = one per CPU, default 1 = sequential).",
+    )
+    args = parser.parse_args()
+    main(
+        force=args.force,
+        workers=args.workers if args.workers > 0 else (os.cpu_count() or 1),
+        append=not args.no_append,
+    )
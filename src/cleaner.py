@@ -1,7 +1,33 @@
-from typing import Literal
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Literal, Optional, Tuple
+import numpy as np
 import pandas as pd
-from .config import DATA_PROCESSED_DIR, INDICATOR_CONFIG
-from .loader import load_raw_indicator
+from .config import (
+    AGGREGATORS,
+    DATA_PROCESSED_DIR,
+    DEFAULT_AGGREGATOR,
+    INDICATOR_CONFIG,
+    RESOLUTIONS,
+    STREAMING_MIN_BYTES,
+)
+from .analytics import compute_analytics, context_start, with_analytics
+from .episodes import build_episodes, delete_episodes, write_episodes
+from .loader import (
+    iter_raw_indicator_chunks,
+    load_raw_indicator,
+    raw_csv_path,
+    read_raw_range,
+    read_raw_tail,
+)
+from .metadata import coverage_stats, raw_last_updated
+from .store import (
+    delete_series,
+    open_columns,
+    read_header,
+    series_name,
+    splice_series,
+    write_series,
+)
 
 
 def _infer_frequency(df: pd.DataFrame) -> Literal["daily", "monthly", "other"]:
@@ -19,31 +45,325 @@ def _infer_frequency(df: pd.DataFrame) -> Literal["daily", "monthly", "other"]:
         return "other"
 
 
-def standardize_to_monthly(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.set_index("Date", inplace=True)
+def _period_partials(df: pd.DataFrame, freq: str) -> pd.DataFrame:
+    # Mergeable per-period aggregates of one chunk: latest observation (what
+    # resample(...).last() keeps) plus min/max/sum/count, so any aggregator
+    # can be finalised once every chunk has been folded in.
+    df = df.dropna(subset=["Value"]).sort_values("Date", kind="stable")
+    grouped = df.groupby(df["Date"].dt.to_period(freq).rename("Period"), sort=False)
+    return grouped.agg(
+        Date=("Date", "last"),
+        Last=("Value", "last"),
+        Min=("Value", "min"),
+        Max=("Value", "max"),
+        Sum=("Value", "sum"),
+        Count=("Value", "count"),
+    ).reset_index()
 
-    freq_type = _infer_frequency(df.reset_index())
 
-    if freq_type == "daily":
-        monthly = df.resample("M").last()
-    elif freq_type == "monthly":
-        monthly = df.resample("M").last()
+def _merge_partials(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    both = pd.concat([a, b], ignore_index=True).sort_values("Date", kind="stable")
+    return both.groupby("Period", sort=False).agg(
+        Date=("Date", "last"),
+        Last=("Last", "last"),
+        Min=("Min", "min"),
+        Max=("Max", "max"),
+        Sum=("Sum", "sum"),
+        Count=("Count", "sum"),
+    ).reset_index()
+
+
+def _finalize_partials(partial: Optional[pd.DataFrame], aggregator: str) -> pd.DataFrame:
+    if partial is None or partial.empty:
+        return pd.DataFrame({"Date": pd.Series(dtype="datetime64[ns]"), "Value": pd.Series(dtype="float64")})
+
+    if aggregator == "mean":
+        values = partial["Sum"] / partial["Count"]
     else:
-        monthly = df.resample("M").last()
+        values = partial[{"last": "Last", "min": "Min", "max": "Max"}[aggregator]]
+
+    # Periods are labelled by their last day, matching resample("M") etc.
+    out = pd.DataFrame(
+        {
+            "Date": partial["Period"].dt.to_timestamp(how="end").dt.normalize(),
+            "Value": values.to_numpy(dtype="float64"),
+        }
+    )
+    return out.sort_values("Date").reset_index(drop=True)
+
+
+def build_pyramid(
+    chunks: Iterable[pd.DataFrame],
+    aggregator: str = DEFAULT_AGGREGATOR,
+    resolutions: Optional[Iterable[str]] = None,
+) -> Dict[str, pd.DataFrame]:
+    # Each chunk is reduced to at most one row per period before being merged
+    # into the running result, so peak memory is one chunk plus one row per
+    # period regardless of how large (or how unsorted) the raw data is.
+    if aggregator not in AGGREGATORS:
+        raise ValueError(f"Unknown aggregator {aggregator!r}; expected one of {AGGREGATORS}")
+    resolutions = list(resolutions) if resolutions is not None else list(RESOLUTIONS)
+
+    partials: Dict[str, Optional[pd.DataFrame]] = {res: None for res in resolutions}
+    for chunk in chunks:
+        for res in resolutions:
+            reduced = _period_partials(chunk, RESOLUTIONS[res])
+            if partials[res] is not None:
+                reduced = _merge_partials(partials[res], reduced)
+            partials[res] = reduced
+
+    return {res: _finalize_partials(partials[res], aggregator) for res in resolutions}
+
 
-    monthly = monthly.dropna(subset=["Value"])
-    monthly = monthly.reset_index()
-    monthly = monthly.sort_values("Date").reset_index(drop=True)
-    return monthly
+def _prune_pyramid(pyramid: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    # Levels finer than monthly are only worth storing when they add rows
+    # over the next coarser level (a monthly source has no daily detail).
+    order = list(RESOLUTIONS)
+    finer = [r for r in order[: order.index("M")] if r in pyramid]
+    kept = {r: df for r, df in pyramid.items() if r not in finer}
+    coarser_rows = len(pyramid["M"])
+    for res in reversed(finer):
+        if len(pyramid[res]) > coarser_rows:
+            kept[res] = pyramid[res]
+            coarser_rows = len(pyramid[res])
+    return {r: kept[r] for r in order if r in kept}
 
-def clean_and_save_indicator(indicator_id: str) -> pd.DataFrame:
-    df_raw = load_raw_indicator(indicator_id)
-    df_monthly = standardize_to_monthly(df_raw)
+
+def _tally_chunks(chunks: Iterable[pd.DataFrame], tally: Dict[str, Any]) -> Iterator[pd.DataFrame]:
+    # Collects raw row/null counts and the source frequency while the chunks
+    # stream through; the frequency is inferred from the first usable chunk.
+    for chunk in chunks:
+        tally["raw_rows"] += len(chunk)
+        tally["null_count"] += int(chunk["Value"].isna().sum())
+        if tally["frequency"] is None and len(chunk) >= 3:
+            tally["frequency"] = _infer_frequency(chunk.sort_values("Date"))
+        yield chunk
+
+
+def clean_and_save_indicator(
+    indicator_id: str, streaming: Optional[bool] = None
+) -> pd.DataFrame:
+    # streaming=None picks the chunked loader for raw files of at least
+    # STREAMING_MIN_BYTES.
+    if streaming is None:
+        streaming = raw_csv_path(indicator_id).stat().st_size >= STREAMING_MIN_BYTES
+    aggregator = INDICATOR_CONFIG[indicator_id].get("aggregator", DEFAULT_AGGREGATOR)
+
+    if streaming:
+        tally: Dict[str, Any] = {"raw_rows": 0, "null_count": 0, "frequency": None}
+        pyramid = build_pyramid(
+            _tally_chunks(iter_raw_indicator_chunks(indicator_id), tally), aggregator
+        )
+    else:
+        df_raw = load_raw_indicator(indicator_id)
+        pyramid = build_pyramid([df_raw], aggregator)
+        tally = {
+            "raw_rows": len(df_raw),
+            "null_count": int(df_raw["Value"].isna().sum()),
+            "frequency": _infer_frequency(df_raw),
+        }
+
+    pyramid = _prune_pyramid(pyramid)
+    df_monthly = pyramid["M"]
 
     DATA_PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
     out_path = DATA_PROCESSED_DIR / f"{indicator_id}.csv"
     df_monthly.to_csv(out_path, index=False)
+    # The coverage stats ride along in the store header so metadata can be
+    # rebuilt without reading any series back.
+    stats = coverage_stats(
+        df_monthly,
+        frequency=tally["frequency"] or "other",
+        raw_rows=tally["raw_rows"],
+        null_count=tally["null_count"],
+        last_updated=raw_last_updated(indicator_id),
+    )
+    for res in RESOLUTIONS:
+        if res == "M":
+            continue
+        if res in pyramid:
+            write_series(series_name(indicator_id, res), with_analytics(pyramid[res], res))
+        else:
+            delete_series(series_name(indicator_id, res))
+    # Episodes are detected on the finest level that was kept.
+    rules = INDICATOR_CONFIG[indicator_id].get("episodes")
+    if rules:
+        finest = next(iter(pyramid))
+        write_episodes(indicator_id, build_episodes(pyramid[finest], rules, finest))
+    else:
+        delete_episodes(indicator_id)
+    # The monthly header is written last and lists the available levels.
+    # Store levels carry the rolling analytics columns; the CSV export keeps
+    # only Date/Value.
+    write_series(
+        indicator_id,
+        with_analytics(df_monthly, "M"),
+        extra={
+            "stats": stats,
+            "aggregator": aggregator,
+            "resolutions": {res: int(len(df)) for res, df in pyramid.items()},
+        },
+    )
 
     return df_monthly
+
+
+def remove_indicator_outputs(indicator_id: str) -> None:
+    # Everything a clean writes for an indicator: its CSV export, every
+    # pyramid level in the store and its episodes.
+    try:
+        (DATA_PROCESSED_DIR / f"{indicator_id}.csv").unlink()
+    except FileNotFoundError:
+        pass
+    for res in RESOLUTIONS:
+        delete_series(series_name(indicator_id, res))
+    delete_episodes(indicator_id)
+
+
+def _period(ts, res: str) -> pd.Period:
+    return pd.Timestamp(ts).to_period(RESOLUTIONS[res])
+
+
+def _level_tail(
+    stored: Dict[str, np.ndarray], agg: pd.DataFrame, res: str
+) -> Tuple[int, pd.DataFrame]:
+    # Splice point of re-aggregated periods `agg` into a stored level, and
+    # the rows to write there with their analytics. Only the history the
+    # rolling windows need is read back (plus the running peak).
+    dates, values = stored["Date"], stored["Value"]
+    tail_start = int(np.searchsorted(dates, agg["Date"].iloc[0].value)) if len(agg) else len(dates)
+    first_date = agg["Date"].iloc[0].value if len(agg) else int(dates[-1])
+    ctx = context_start(dates[:tail_start], first_date, res)
+    history = pd.DataFrame(
+        {"Date": dates[ctx:tail_start].view("datetime64[ns]"), "Value": values[ctx:tail_start]}
+    )
+    frame = pd.concat([history, agg], ignore_index=True)
+    prior_peak = float(np.fmax.reduce(values[:ctx])) if ctx else np.nan
+    tail = pd.concat([frame, compute_analytics(frame, res, prior_peak)], axis=1)
+    return tail_start, tail.iloc[len(history):].reset_index(drop=True)
+
+
+def _csv_line_offset(path: Path, lines: int, block_size: int = 1 << 16) -> int:
+    # Byte offset of the last `lines` lines of a newline-terminated file,
+    # found by reading backwards.
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        if lines == 0:
+            return size
+        need, pos = lines + 1, size
+        while pos > 0:
+            start = max(0, pos - block_size)
+            f.seek(start)
+            data = f.read(pos - start)
+            count = data.count(b"\n")
+            if count >= need:
+                idx = len(data)
+                for _ in range(need):
+                    idx = data.rindex(b"\n", 0, idx)
+                return start + idx + 1
+            need -= count
+            pos = start
+    raise ValueError(f"{path} has fewer than {lines} rows")
+
+
+def append_indicator(indicator_id: str, raw_offset: int) -> Optional[pd.DataFrame]:
+    # Append-only update for a raw CSV that grew past `raw_offset` bytes (its
+    # size at the last build). Every level re-aggregates only its periods
+    # from `since` on -- the start of the last stored annual period -- from
+    # the raw rows read back from there plus the new ones, and is spliced
+    # into the store as its next version; the CSV export is cut and re-written from
+    # the same row. Returns the monthly series, or None when the update
+    # cannot be done this way (no store to extend, raw rows not sorted by
+    # date, new rows dated in an older period); the caller then cleans the
+    # indicator in full. Levels kept or pruned by the last full build stay
+    # so.
+    header = read_header(indicator_id)
+    out_path = DATA_PROCESSED_DIR / f"{indicator_id}.csv"
+    if header is None or "resolutions" not in header or not out_path.exists():
+        return None
+    levels = list(header["resolutions"])
+    stored = {res: open_columns(series_name(indicator_id, res)) for res in levels}
+    if any(len(cols["Date"]) == 0 for cols in stored.values()):
+        return None
+
+    last_start = min(_period(int(cols["Date"][-1]), res).start_time for res, cols in stored.items())
+    since = min(_period(last_start, res).start_time for res in levels)
+    # Periods that start before `since` are kept as stored, so no new row
+    # may fall into one of them.
+    straddling = [_period(since, res) for res in levels]
+    earliest = max([since] + [(p + 1).start_time for p in straddling if p.start_time < since])
+    new_rows = read_raw_range(indicator_id, raw_offset)
+    if len(new_rows) and new_rows["Date"].min() < earliest:
+        return None
+    old_rows = read_raw_tail(indicator_id, since, raw_offset)
+    if old_rows is None:
+        return None
+
+    raw_tail = pd.concat([old_rows, new_rows], ignore_index=True)
+    if not raw_tail["Date"].is_monotonic_increasing:
+        return None
+    aggregator = header.get("aggregator", DEFAULT_AGGREGATOR)
+    pyramid = build_pyramid([raw_tail], aggregator, levels)
+
+    tails = {}
+    for res in levels:
+        agg = pyramid[res]
+        starts = agg["Date"].dt.to_period(RESOLUTIONS[res]).dt.start_time
+        tails[res] = _level_tail(stored[res], agg[starts >= since].reset_index(drop=True), res)
+    rows = {res: tail_start + len(tail) for res, (tail_start, tail) in tails.items()}
+
+    # Episodes are re-detected on the finest level, as in a full clean.
+    rules = INDICATOR_CONFIG[indicator_id].get("episodes")
+    if rules:
+        finest = levels[0]
+        tail_start, tail = tails[finest]
+        cols = stored[finest]
+        df_finest = pd.DataFrame(
+            {
+                "Date": np.concatenate(
+                    (cols["Date"][:tail_start].view("datetime64[ns]"), tail["Date"].to_numpy())
+                ),
+                "Value": np.concatenate((cols["Value"][:tail_start], tail["Value"].to_numpy())),
+            }
+        )
+        write_episodes(indicator_id, build_episodes(df_finest, rules, finest))
+
+    for res in levels:
+        if res != "M":
+            tail_start, tail = tails[res]
+            splice_series(series_name(indicator_id, res), tail, tail_start)
+
+    m_start, m_tail = tails["M"]
+    offset = _csv_line_offset(out_path, len(stored["M"]["Date"]) - m_start)
+    with open(out_path, "r+b") as f:
+        f.seek(offset)
+        f.truncate()
+        f.write(m_tail[["Date", "Value"]].to_csv(index=False, header=False).encode("utf-8"))
+
+    previous = header.get("stats") or {}
+    stats = coverage_stats(
+        m_tail,
+        frequency=previous.get("frequency") or "other",
+        raw_rows=(previous.get("raw_rows") or 0) + len(new_rows),
+        null_count=(previous.get("null_count") or 0) + int(new_rows["Value"].isna().sum()),
+        last_updated=raw_last_updated(indicator_id),
+    )
+    stats.update(start=previous.get("start", stats["start"]), rows=rows["M"])
+    # The monthly header is written last, as in a full clean.
+    splice_series(
+        indicator_id, m_tail, m_start, extra={"stats": stats, "resolutions": rows}
+    )
+
+    return pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "Date": stored["M"]["Date"][:m_start].view("datetime64[ns]"),
+                    "Value": stored["M"]["Value"][:m_start],
+                }
+            ),
+            m_tail[["Date", "Value"]],
+        ],
+        ignore_index=True,
+    )
@@ -1,10 +1,89 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-DATA_RAW_DIR = BASE_DIR / "data_raw"
-DATA_PROCESSED_DIR = BASE_DIR / "data_processed"
+# Overridable so benchmarks and scratch builds can point the whole pipeline
+# at other directories (must be set before src is imported).
+DATA_RAW_DIR = Path(os.environ.get("MTM_DATA_RAW_DIR", BASE_DIR / "data_raw"))
+DATA_PROCESSED_DIR = Path(os.environ.get("MTM_DATA_PROCESSED_DIR", BASE_DIR / "data_processed"))
 METADATA_CSV_PATH = DATA_PROCESSED_DIR / "indicators_meta.csv"
+# Memory-mapped binary copies of the processed series (see src/store.py).
+PROCESSED_STORE_DIR = DATA_PROCESSED_DIR / "store"
+# Build fingerprints used by incremental builds (see src/manifest.py).
+MANIFEST_PATH = DATA_PROCESSED_DIR / "manifest.json"
+
+# Raw files at least this large are cleaned with the chunked streaming
+# loader, which reads STREAM_CHUNK_ROWS rows at a time.
+STREAMING_MIN_BYTES = 256 * 1024 * 1024
+STREAM_CHUNK_ROWS = 1_000_000
+
+# Resolutions built for every indicator (finest first), mapped to the pandas
+# period frequency used to bucket observations. "M" is the canonical monthly
+# series that is also exported as CSV; finer levels are only kept when they
+# add detail over the monthly one.
+RESOLUTIONS = {"D": "D", "W": "W", "M": "M", "Q": "Q", "A": "Y"}
+RESOLUTION_LABELS = {"D": "Daily", "W": "Weekly", "M": "Monthly", "Q": "Quarterly", "A": "Annual"}
+# How observations within a period are combined; override per indicator with
+# an "aggregator" key in INDICATOR_CONFIG.
+AGGREGATORS = ("last", "mean", "min", "max")
+DEFAULT_AGGREGATOR = "last"
+# Max rows a slice may return when the caller lets the slicer pick the
+# resolution (the app does).
+SLICE_ROW_BUDGET = 400
+
+# Rolling analytics stored next to every processed series (see
+# src/analytics.py). Windows are given in years and converted to rows with
+# PERIODS_PER_YEAR for each resolution.
+PERIODS_PER_YEAR = {"D": 252, "W": 52, "M": 12, "Q": 4, "A": 1}
+ANALYTICS_VOL_YEARS = 1
+ANALYTICS_ZSCORE_YEARS = 5
+ANALYTICS_MA_YEARS = (1, 3)
+
+# Precomputed quick-window slices (see src/snapshot.py), rebuilt by
+# build_processed.py and loaded once by the app.
+SNAPSHOT_PATH = DATA_PROCESSED_DIR / "quick_windows.pkl"
+
+# Data-version signal published by build_processed.py after every build
+# that changed something; running app workers poll it (every
+# DATA_VERSION_POLL_SECONDS) to drop their cached series and metadata.
+# watch.py polls data_raw/ every WATCH_INTERVAL_SECONDS and rebuilds once a
+# changed file has stayed unchanged for one more poll.
+DATA_VERSION_PATH = DATA_PROCESSED_DIR / "data_version.json"
+DATA_VERSION_POLL_SECONDS = 15
+WATCH_INTERVAL_SECONDS = 20
+
+# Threshold episodes (runs of observations above/below a level), built for
+# indicators with an "episodes" list in INDICATOR_CONFIG.
+EPISODES_DIR = DATA_PROCESSED_DIR / "episodes"
+
+# Max number of parsed series the slicer keeps in memory (LRU eviction).
+SERIES_CACHE_MAX_ENTRIES = 64
+
+# Correlation matrices kept in memory, one per (indicators, window, lag)
+# (see src/correlation.py); rows needed for a pairwise correlation.
+CORRELATION_CACHE_MAX_ENTRIES = 256
+CORRELATION_MIN_PERIODS = 12
+
+# Local HTTP API (see src/api.py): requests are served by a pool of
+# API_WORKERS threads; responses of at least API_GZIP_MIN_BYTES are gzipped
+# for clients that accept it.
+API_HOST = "127.0.0.1"
+API_PORT = 8502
+API_WORKERS = 8
+API_GZIP_MIN_BYTES = 1024
+
+# AI interpretation: model name and the on-disk answer cache (see src/ai.py).
+# The cache directory is overridable like the data directories, so tests and
+# stub-backend runs can keep their answers out of the checkout.
+GEMINI_MODEL = "gemini-2.5-flash-lite"
+AI_CACHE_DIR = Path(os.environ.get("MTM_AI_CACHE_DIR", BASE_DIR / ".cache" / "ai"))
+AI_CACHE_MAX_ENTRIES = 500
+AI_CACHE_TTL_SECONDS = 7 * 24 * 3600
+# At most AI_MAX_WORKERS upstream calls run at once. AI_TIMEOUT_SECONDS bounds
+# both each Gemini request and how long the app waits for an answer.
+AI_MAX_WORKERS = 8
+AI_TIMEOUT_SECONDS = 30
 
 INDICATOR_CONFIG = {
     "fed_funds": {
@@ -30,6 +109,8 @@ INDICATOR_CONFIG = {
         "country": "US",
         "category": "Stress Indicator",
         "display": "US: 10Y–2Y Yield Curve",
+        # Threshold episodes indexed at build time (see src/episodes.py).
+        "episodes": [{"name": "inversion", "below": 0.0}],
     },
     "us_hy_spread": {
         "file": "BAMLH0A0HYM2.csv",
@@ -42,6 +123,10 @@ INDICATOR_CONFIG = {
         "country": "US",
         "category": "Market Volatility",
         "display": "US: VIX Index",
+        "episodes": [
+            {"name": "elevated", "above": 30.0},
+            {"name": "fear_spike", "above": 40.0},
+        ],
     },
     "crude_oil": {
         "file": "crude_oil.csv",
@@ -85,4 +170,30 @@ INDICATOR_CONFIG = {
         "category": "Growth",
         "display": "India: Industrial Production",
     },
+    # Derived indicators, computed from the ones above on first request
+    # (see src/derived.py).
+    "us_cpi_yoy": {
+        "country": "US",
+        "category": "Inflation",
+        "display": "US: CPI Inflation (YoY %)",
+        "derived": {"op": "yoy", "inputs": ["us_cpi"]},
+    },
+    "us_real_fed_funds": {
+        "country": "US",
+        "category": "Interest Rates",
+        "display": "US: Real Fed Funds Rate (vs CPI YoY)",
+        "derived": {"op": "sub", "inputs": ["fed_funds", "us_cpi_yoy"]},
+    },
+    "crude_oil_inr": {
+        "country": "India",
+        "category": "Commodities",
+        "display": "Crude Oil Price in INR",
+        "derived": {"op": "mul", "inputs": ["crude_oil", "in_fx_spot"]},
+    },
+    "us_hy_spread_vix_ratio": {
+        "country": "US",
+        "category": "Stress Indicator",
+        "display": "US: High Yield Spread / VIX",
+        "derived": {"op": "div", "inputs": ["us_hy_spread", "vix"]},
+    },
 }
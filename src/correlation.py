@@ -0,0 +1,178 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, List, Literal, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .config import CORRELATION_CACHE_MAX_ENTRIES, CORRELATION_MIN_PERIODS, INDICATOR_CONFIG
+from .slicer import WindowType, data_version, slice_many
+
+
+@dataclass
+class CorrelationResult:
+    indicator_ids: List[str]
+    start_date: pd.Timestamp
+    end_date: pd.Timestamp
+    lags: List[int]
+    # corr[k, i, j] is the correlation of indicator i at month t with
+    # indicator j at month t + lags[k], i.e. i leading j by lags[k] months.
+    corr: np.ndarray
+    # Overlapping observations behind each coefficient.
+    counts: np.ndarray
+    # Monthly rows in the correlated span (after differencing for "change").
+    observations: int = 0
+    # Indicators left out for having fewer than min_periods observations in
+    # the span (e.g. a series that stops before the window starts).
+    dropped: List[str] = field(default_factory=list)
+
+    def matrix(self, lag: int = 0) -> pd.DataFrame:
+        k = self.lags.index(lag)
+        return pd.DataFrame(self.corr[k], index=self.indicator_ids, columns=self.indicator_ids)
+
+    def lead_lag(self, indicator_id: str) -> pd.DataFrame:
+        # For every other indicator, the lag in [-max, max] with the strongest
+        # correlation; positive lags mean indicator_id leads.
+        i = self.indicator_ids.index(indicator_id)
+        lags = np.array(self.lags)
+        # Leading by k is corr[k, i, :]; lagging by k is corr[k, :, i].
+        both = np.concatenate([self.corr[:0:-1, :, i], self.corr[:, i, :]])
+        signed = np.concatenate([-lags[:0:-1], lags])
+        with np.errstate(invalid="ignore"):
+            filled = np.where(np.isnan(both), -1.0, np.abs(both))
+        best = np.argmax(filled, axis=0)
+        cols = np.arange(len(self.indicator_ids))
+        out = pd.DataFrame(
+            {
+                "indicator_id": self.indicator_ids,
+                "best_lag": signed[best],
+                "corr": both[best, cols],
+                "corr_lag0": self.corr[0, i, :],
+            }
+        )
+        return out[out["indicator_id"] != indicator_id].reset_index(drop=True)
+
+
+# Per-lag matrices keyed by (indicators, window spec, transform, lag, data
+# version), so a longer lag range reuses the lags already computed and a
+# rebuild of any input series misses the cache.
+_CorrEntry = Tuple[np.ndarray, np.ndarray, pd.Timestamp, pd.Timestamp, int]
+_CORR_CACHE: "OrderedDict[Tuple, _CorrEntry]" = OrderedDict()
+_CORR_CACHE_LOCK = threading.Lock()
+
+
+def clear_correlation_cache() -> None:
+    with _CORR_CACHE_LOCK:
+        _CORR_CACHE.clear()
+
+
+def max_lag_for(
+    start: str,
+    end: str,
+    on: Literal["change", "level"] = "change",
+    min_periods: int = CORRELATION_MIN_PERIODS,
+) -> int:
+    # Longest lag with at least min_periods monthly pairs between two
+    # "YYYY-MM" months (inclusive), for sizing a lag control up front.
+    months = len(pd.period_range(start, end, freq="M"))
+    return _lag_limit(months - (on == "change"), min_periods)
+
+
+def _lag_limit(rows: int, min_periods: int) -> int:
+    # Lag k pairs rows - k observations; past this every coefficient is NaN.
+    return max(rows - min_periods, 0)
+
+
+def _lagged_corr(panel: np.ndarray, lag: int, min_periods: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Pairwise-complete Pearson correlation of panel[:-lag] against
+    # panel[lag:] for every column pair at once, as a handful of matrix
+    # products over NaN-masked columns.
+    n, width = panel.shape
+    if lag >= n:
+        return np.full((width, width), np.nan), np.zeros((width, width), dtype=np.int64)
+    a = panel[: n - lag]
+    b = panel[lag:]
+    ma = (~np.isnan(a)).astype("float64")
+    mb = (~np.isnan(b)).astype("float64")
+    a0 = np.where(ma > 0, a, 0.0)
+    b0 = np.where(mb > 0, b, 0.0)
+
+    count = ma.T @ mb
+    sum_a = a0.T @ mb
+    sum_b = ma.T @ b0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = a0.T @ b0 - sum_a * sum_b / count
+        var_a = (a0 * a0).T @ mb - sum_a * sum_a / count
+        var_b = ma.T @ (b0 * b0) - sum_b * sum_b / count
+        corr = cov / np.sqrt(var_a * var_b)
+    corr[(count < min_periods) | ~np.isfinite(corr)] = np.nan
+    return np.clip(corr, -1.0, 1.0), count.astype(np.int64)
+
+
+def correlation_matrix(
+    indicator_ids: Optional[Iterable[str]] = None,
+    *,
+    window: Optional[WindowType] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    max_lag: int = 0,
+    on: Literal["change", "level"] = "change",
+    min_periods: int = CORRELATION_MIN_PERIODS,
+) -> CorrelationResult:
+    # Correlations over the monthly panel aligned by slice_many, for lags
+    # 0..max_lag months. on="change" correlates month-over-month differences
+    # (levels of trending series are mostly spuriously correlated). A quick
+    # window is anchored at the latest month any indicator has data for; pass
+    # start/end to correlate a specific span (e.g. the one being viewed).
+    # Lags are capped where fewer than min_periods pairs would remain, and
+    # indicators without min_periods observations in the span are dropped.
+    if max_lag < 0:
+        raise ValueError("max_lag must be >= 0.")
+    if on not in ("change", "level"):
+        raise ValueError(f"Unknown transform {on!r}; expected 'change' or 'level'.")
+    ids = list(dict.fromkeys(indicator_ids if indicator_ids is not None else INDICATOR_CONFIG))
+
+    base_key = (tuple(ids), window, start, end, on, min_periods, data_version(ids))
+    lags = list(range(max_lag + 1))
+    with _CORR_CACHE_LOCK:
+        cached = {lag: _CORR_CACHE.get(base_key + (lag,)) for lag in lags}
+        for lag, entry in cached.items():
+            if entry is not None:
+                _CORR_CACHE.move_to_end(base_key + (lag,))
+
+    missing = [lag for lag, entry in cached.items() if entry is None]
+    if missing:
+        # One calendar range for every column.
+        panel_result = slice_many(ids, window=window, start=start, end=end, anchor="latest")
+        panel = panel_result.data[ids].to_numpy(dtype="float64")
+        if on == "change":
+            panel = np.diff(panel, axis=0)
+        # Centring first keeps the one-pass sums well conditioned.
+        observed = ~np.isnan(panel)
+        means = np.nansum(panel, axis=0) / np.maximum(observed.sum(axis=0), 1)
+        panel = panel - means
+        for lag in missing:
+            corr, count = _lagged_corr(panel, lag, min_periods)
+            cached[lag] = (
+                corr, count, panel_result.start_date, panel_result.end_date, len(panel)
+            )
+        with _CORR_CACHE_LOCK:
+            for lag in missing:
+                _CORR_CACHE[base_key + (lag,)] = cached[lag]
+            while len(_CORR_CACHE) > CORRELATION_CACHE_MAX_ENTRIES:
+                _CORR_CACHE.popitem(last=False)
+
+    first = cached[0]
+    rows = first[4]
+    lags = lags[: _lag_limit(rows, min_periods) + 1]
+    keep = np.diag(first[1]) >= min_periods
+    cols = np.flatnonzero(keep)
+    return CorrelationResult(
+        indicator_ids=[ids[i] for i in cols],
+        start_date=first[2],
+        end_date=first[3],
+        lags=lags,
+        corr=np.stack([cached[lag][0][np.ix_(cols, cols)] for lag in lags]),
+        counts=np.stack([cached[lag][1][np.ix_(cols, cols)] for lag in lags]),
+        observations=rows,
+        dropped=[ids[i] for i in np.flatnonzero(~keep)],
+    )
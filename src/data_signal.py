@@ -0,0 +1,46 @@
+import json
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Tuple
+from .config import DATA_VERSION_PATH
+from .store import write_json_atomic
+
+# The data-version signal: a small JSON file whose "version" counter is
+# bumped by build_processed.py whenever a build rebuilt or removed any
+# indicator (listed in "indicators"). Long-running readers (app workers)
+# call check_data_version() on each rerun and drop their process-wide
+# caches when it moved, instead of holding on to replaced series until the
+# next per-file stat check or restart.
+_SEEN: Dict[str, Any] = {"version": None}
+_SEEN_LOCK = threading.Lock()
+
+
+def read_data_version() -> Dict[str, Any]:
+    try:
+        with open(DATA_VERSION_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        # Never published, or caught mid-replace on a platform without
+        # atomic renames.
+        return {"version": 0, "updated": None, "indicators": []}
+
+
+def publish_data_version(indicator_ids: Iterable[str]) -> Dict[str, Any]:
+    signal = {
+        "version": int(read_data_version().get("version") or 0) + 1,
+        "updated": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "indicators": sorted(indicator_ids),
+    }
+    DATA_VERSION_PATH.parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(DATA_VERSION_PATH, signal)
+    return signal
+
+
+def check_data_version() -> Tuple[int, bool]:
+    # (current version, whether it changed since the previous call in this
+    # process). The first call only records the version.
+    version = int(read_data_version().get("version") or 0)
+    with _SEEN_LOCK:
+        moved = _SEEN["version"] is not None and _SEEN["version"] != version
+        _SEEN["version"] = version
+    return version, moved
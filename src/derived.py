@@ -0,0 +1,112 @@
+from functools import reduce
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from .analytics import yoy_change
+from .config import INDICATOR_CONFIG
+from .series import ArraySeries, to_datetimes
+
+# Derived indicators: INDICATOR_CONFIG entries with a "derived" spec
+#   {"op": <op>, "inputs": [<indicator_id>, ...]}
+# instead of a raw file. Inputs may be raw or derived themselves, so the
+# specs form a dependency graph. Nothing is built for them: the slicer
+# computes a derived series on first request, at every resolution all of
+# its inputs have, and caches it under a stamp made of the inputs' stamps
+# (see slicer._derived_source), so it is recomputed once any input is
+# rebuilt. Binary ops align their inputs on the dates they share; rows
+# without a finite result are dropped.
+_BINARY_OPS = {
+    "add": np.add,
+    "sub": np.subtract,
+    "mul": np.multiply,
+    "div": np.divide,
+}
+_UNARY_OPS = ("yoy",)
+
+
+def derived_spec(indicator_id: str) -> Optional[Dict[str, Any]]:
+    return INDICATOR_CONFIG[indicator_id].get("derived")
+
+
+def is_derived(indicator_id: str) -> bool:
+    return indicator_id in INDICATOR_CONFIG and "derived" in INDICATOR_CONFIG[indicator_id]
+
+
+def raw_indicator_ids() -> List[str]:
+    # Indicators built from a file in data_raw/.
+    return [i for i in INDICATOR_CONFIG if not is_derived(i)]
+
+
+def derived_inputs(indicator_id: str) -> List[str]:
+    spec = derived_spec(indicator_id)
+    op, inputs = spec["op"], list(spec["inputs"])
+    arity = 1 if op in _UNARY_OPS else 2 if op in _BINARY_OPS else None
+    if arity is None:
+        raise ValueError(
+            f"Unknown op {op!r} for derived indicator {indicator_id}; "
+            f"expected one of {sorted(_BINARY_OPS) + list(_UNARY_OPS)}"
+        )
+    if len(inputs) != arity:
+        raise ValueError(f"Derived indicator {indicator_id}: {op!r} takes {arity} input(s).")
+    for input_id in inputs:
+        if input_id not in INDICATOR_CONFIG:
+            raise ValueError(f"Derived indicator {indicator_id}: unknown input {input_id!r}.")
+    return inputs
+
+
+def dependency_order(indicator_ids: Optional[Iterable[str]] = None) -> List[str]:
+    # The given derived indicators (default: all) and every derived
+    # indicator they depend on, inputs before dependents.
+    ids = list(indicator_ids if indicator_ids is not None else INDICATOR_CONFIG)
+    order: List[str] = []
+    state: Dict[str, str] = {}
+
+    def visit(indicator_id: str, path: List[str]) -> None:
+        if not is_derived(indicator_id) or state.get(indicator_id) == "done":
+            return
+        if state.get(indicator_id) == "visiting":
+            cycle = " -> ".join(path[path.index(indicator_id):] + [indicator_id])
+            raise ValueError(f"Derived indicators form a cycle: {cycle}")
+        state[indicator_id] = "visiting"
+        for input_id in derived_inputs(indicator_id):
+            visit(input_id, path + [indicator_id])
+        state[indicator_id] = "done"
+        order.append(indicator_id)
+
+    for indicator_id in ids:
+        visit(indicator_id, [])
+    return order
+
+
+def dependents(indicator_ids: Iterable[str]) -> List[str]:
+    # Derived indicators that read any of the given ones, directly or
+    # through other derived indicators, in dependency order.
+    changed = set(indicator_ids)
+    out = []
+    for indicator_id in dependency_order():
+        if changed.intersection(derived_inputs(indicator_id)):
+            changed.add(indicator_id)
+            out.append(indicator_id)
+    return out
+
+
+def compute_derived(indicator_id: str, inputs: List[ArraySeries]) -> ArraySeries:
+    # `inputs` are the series of derived_inputs(indicator_id), in order and
+    # at one resolution.
+    op = derived_spec(indicator_id)["op"]
+    if op == "yoy":
+        (source,) = inputs
+        days = source.days
+        dates = pd.Series(to_datetimes(days))
+        values = yoy_change(dates, source.values, source.ordinals(), source.values)
+    else:
+        days = reduce(np.intersect1d, [s.days for s in inputs])
+        aligned = [s.values[np.searchsorted(s.days, days)] for s in inputs]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = _BINARY_OPS[op](*aligned)
+
+    keep = np.isfinite(values)
+    return ArraySeries(
+        np.ascontiguousarray(days[keep], dtype=np.int32),
+        np.ascontiguousarray(values[keep], dtype="float64"),
+    )
@@ -0,0 +1,205 @@
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .config import EPISODES_DIR, INDICATOR_CONFIG, RESOLUTIONS
+from .slicer import available_resolutions, data_version, slice_indicator
+from .store import write_json_atomic
+
+# Threshold episodes: maximal runs of consecutive observations above (or
+# below) a level, detected once at build time on the finest stored
+# resolution and saved per indicator as <EPISODES_DIR>/<indicator_id>.json.
+# Each observation stands for the period ending at its date, so an episode
+# spans from the start of its first period to the end of its last one.
+# Episodes of one rule never overlap, so both their starts and their ends
+# are sorted and overlap queries are two binary searches.
+EPISODES_FORMAT = 1
+
+_NS_PER_DAY = 86_400 * 10**9
+_COLUMNS = ("start", "end", "observations", "extreme", "extreme_date", "mean")
+_FLOAT_COLUMNS = ("extreme", "mean")
+
+
+def _column_dtype(col: str):
+    return "float64" if col in _FLOAT_COLUMNS else np.int64
+
+
+def _rule_level(rule: Dict[str, Any]) -> Tuple[str, float]:
+    if ("above" in rule) == ("below" in rule):
+        raise ValueError(f"Episode rule {rule.get('name')!r} needs exactly one of 'above'/'below'.")
+    direction = "above" if "above" in rule else "below"
+    return direction, float(rule[direction])
+
+
+def detect_episodes(
+    df: pd.DataFrame, direction: str, level: float, resolution: str = "M"
+) -> Dict[str, np.ndarray]:
+    # Run-length encodes Value > level (or < level); NaN ends a run.
+    values = df["Value"].to_numpy(dtype="float64")
+    dates = df["Date"].to_numpy(dtype="datetime64[ns]").view("i8")
+    with np.errstate(invalid="ignore"):
+        inside = values > level if direction == "above" else values < level
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], inside.astype(np.int8), [0]))))
+    starts, ends = edges[::2], edges[1::2]  # [start, end) row ranges
+    if len(starts) == 0:
+        return {col: np.empty(0, dtype=_column_dtype(col)) for col in _COLUMNS}
+
+    padded = np.concatenate((values, [0.0]))
+    bounds = np.column_stack((starts, ends)).ravel()
+    sums = np.add.reduceat(padded, bounds)[::2]
+
+    # Row of the extreme in each run: sort the in-run rows by (run, value)
+    # and take the first row of every run.
+    rows = np.flatnonzero(inside)
+    run = np.searchsorted(starts, rows, side="right") - 1
+    key = values[rows] if direction == "below" else -values[rows]
+    order = np.lexsort((key, run))
+    first = np.concatenate(([0], np.flatnonzero(np.diff(run[order])) + 1))
+    extreme_rows = rows[order[first]]
+
+    first_dates = pd.DatetimeIndex(dates[starts].view("datetime64[ns]"))
+    period_starts = first_dates.to_period(RESOLUTIONS[resolution]).start_time
+
+    return {
+        "start": period_starts.to_numpy(dtype="datetime64[ns]").view("i8"),
+        "end": dates[ends - 1],
+        "observations": (ends - starts).astype(np.int64),
+        "extreme": values[extreme_rows],
+        "extreme_date": dates[extreme_rows],
+        "mean": sums / (ends - starts),
+    }
+
+
+def build_episodes(
+    df: pd.DataFrame, rules: List[Dict[str, Any]], resolution: str
+) -> Dict[str, Any]:
+    last = int(df["Date"].to_numpy(dtype="datetime64[ns]").view("i8")[-1]) if len(df) else None
+    out: Dict[str, Any] = {"format": EPISODES_FORMAT, "resolution": resolution, "last_date": last}
+    out["rules"] = {}
+    for rule in rules:
+        direction, level = _rule_level(rule)
+        episodes = detect_episodes(df, direction, level, resolution)
+        out["rules"][rule["name"]] = {
+            "direction": direction,
+            "level": level,
+            "episodes": {col: arr.tolist() for col, arr in episodes.items()},
+        }
+    return out
+
+
+def episodes_path(indicator_id: str):
+    return EPISODES_DIR / f"{indicator_id}.json"
+
+
+def write_episodes(indicator_id: str, payload: Dict[str, Any]) -> None:
+    EPISODES_DIR.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(episodes_path(indicator_id), payload)
+
+
+def delete_episodes(indicator_id: str) -> None:
+    try:
+        episodes_path(indicator_id).unlink()
+    except FileNotFoundError:
+        pass
+
+
+class EpisodeIndex:
+    def __init__(self, payload: Dict[str, Any]) -> None:
+        self.resolution = payload["resolution"]
+        last = payload.get("last_date")
+        self.last_date = pd.Timestamp(last) if last is not None else None
+        self.rules: Dict[str, Dict[str, Any]] = {}
+        for name, rule in payload["rules"].items():
+            arrays = {
+                col: np.asarray(vals, dtype=_column_dtype(col))
+                for col, vals in rule["episodes"].items()
+            }
+            self.rules[name] = {"direction": rule["direction"], "level": rule["level"], **arrays}
+
+    def bounds(
+        self, rule: str, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None
+    ) -> Tuple[int, int]:
+        # Half-open range of the episodes overlapping [start, end].
+        r = self.rules[rule]
+        lo = 0 if start is None else int(np.searchsorted(r["end"], start.value, side="left"))
+        hi = len(r["start"]) if end is None else int(np.searchsorted(r["start"], end.value, side="right"))
+        return lo, max(lo, hi)
+
+    def table(
+        self, rule: str, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        r = self.rules[rule]
+        lo, hi = self.bounds(rule, start, end)
+        starts, ends = r["start"][lo:hi], r["end"][lo:hi]
+        last = self.last_date.value if self.last_date is not None else None
+        return pd.DataFrame(
+            {
+                "Start": starts.view("datetime64[ns]"),
+                "End": ends.view("datetime64[ns]"),
+                "Days": (ends - starts) // _NS_PER_DAY + 1,
+                "Observations": r["observations"][lo:hi],
+                "Extreme": r["extreme"][lo:hi],
+                "Extreme Date": r["extreme_date"][lo:hi].view("datetime64[ns]"),
+                "Mean": r["mean"][lo:hi],
+                "Ongoing": ends == last,
+            }
+        )
+
+    def days_in_episodes(
+        self, rule: str, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None
+    ) -> int:
+        # Calendar days of [start, end] covered by the rule's episodes.
+        r = self.rules[rule]
+        lo, hi = self.bounds(rule, start, end)
+        starts, ends = r["start"][lo:hi], r["end"][lo:hi]
+        if start is not None:
+            starts = np.maximum(starts, start.value)
+        if end is not None:
+            ends = np.minimum(ends, end.value)
+        return int(((ends - starts) // _NS_PER_DAY + 1).sum())
+
+
+def window_span(
+    start_date: pd.Timestamp, end_date: pd.Timestamp, resolution: str
+) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    # Calendar span covered by a slice whose rows are period-end dates.
+    return start_date.to_period(RESOLUTIONS[resolution]).start_time, end_date
+
+
+_INDEX_CACHE: Dict[str, Tuple[Any, EpisodeIndex]] = {}
+_INDEX_CACHE_LOCK = threading.Lock()
+
+
+def load_episodes(indicator_id: str) -> Optional[EpisodeIndex]:
+    # None for indicators without episode rules. Falls back to detecting the
+    # episodes from the processed series when the build output is missing.
+    rules = INDICATOR_CONFIG[indicator_id].get("episodes")
+    if not rules:
+        return None
+
+    path = episodes_path(indicator_id)
+    try:
+        stat = path.stat()
+        stamp: Any = ("file", stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        stamp = ("series", data_version([indicator_id]), repr(rules))
+
+    with _INDEX_CACHE_LOCK:
+        cached = _INDEX_CACHE.get(indicator_id)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    if stamp[0] == "file":
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    else:
+        resolution = available_resolutions(indicator_id)[0]
+        df = slice_indicator(indicator_id, resolution=resolution).data
+        payload = build_episodes(df, rules, resolution)
+    index = EpisodeIndex(payload)
+
+    with _INDEX_CACHE_LOCK:
+        _INDEX_CACHE[indicator_id] = (stamp, index)
+    return index
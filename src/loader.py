@@ -1,7 +1,8 @@
+import io
 from pathlib import Path
-from typing import Tuple
+from typing import Iterator, List, Optional, Tuple
 import pandas as pd
-from .config import DATA_RAW_DIR, INDICATOR_CONFIG
+from .config import DATA_RAW_DIR, INDICATOR_CONFIG, STREAM_CHUNK_ROWS
 
 
 def _detect_date_and_value_columns(df: pd.DataFrame) -> Tuple[str, str]:
@@ -24,7 +25,7 @@ def _detect_date_and_value_columns(df: pd.DataFrame) -> Tuple[str, str]:
     return date_col, value_cols[0]
 
 
-def load_raw_indicator(indicator_id: str) -> pd.DataFrame:
+def raw_csv_path(indicator_id: str) -> Path:
     if indicator_id not in INDICATOR_CONFIG:
         raise KeyError(f"Unknown indicator_id: {indicator_id}")
 
@@ -33,6 +34,11 @@ def load_raw_indicator(indicator_id: str) -> pd.DataFrame:
 
     if not csv_path.exists():
         raise FileNotFoundError(f"Raw CSV not found for {indicator_id}: {csv_path}")
+    return csv_path
+
+
+def load_raw_indicator(indicator_id: str) -> pd.DataFrame:
+    csv_path = raw_csv_path(indicator_id)
 
     df = pd.read_csv(csv_path)
 
@@ -45,3 +51,90 @@ def load_raw_indicator(indicator_id: str) -> pd.DataFrame:
     df["Value"] = pd.to_numeric(df["Value"], errors="coerce")
     df = df.sort_values("Date").reset_index(drop=True)
     return df
+
+
+def iter_raw_indicator_chunks(
+    indicator_id: str, chunksize: Optional[int] = None
+) -> Iterator[pd.DataFrame]:
+    # Streaming counterpart of load_raw_indicator for files too large to hold
+    # in memory: columns are detected from the header only and each chunk is
+    # yielded as Date/Value with bad rows coerced, but chunks are NOT sorted
+    # relative to each other.
+    csv_path = raw_csv_path(indicator_id)
+
+    header = pd.read_csv(csv_path, nrows=0)
+    date_col, value_col = _detect_date_and_value_columns(header)
+
+    reader = pd.read_csv(
+        csv_path,
+        usecols=[date_col, value_col],
+        dtype={date_col: str, value_col: str},
+        chunksize=chunksize or STREAM_CHUNK_ROWS,
+    )
+    with reader:
+        for chunk in reader:
+            yield _coerce_chunk(chunk, date_col, value_col)
+
+
+def _coerce_chunk(chunk: pd.DataFrame, date_col: str, value_col: str) -> pd.DataFrame:
+    out = pd.DataFrame(
+        {
+            "Date": pd.to_datetime(chunk[date_col], errors="coerce"),
+            "Value": pd.to_numeric(chunk[value_col], errors="coerce"),
+        }
+    )
+    return out.dropna(subset=["Date"])
+
+
+def _raw_columns(csv_path: Path) -> Tuple[List[str], str, str]:
+    header = pd.read_csv(csv_path, nrows=0)
+    date_col, value_col = _detect_date_and_value_columns(header)
+    return list(header.columns), date_col, value_col
+
+
+def _parse_lines(data: bytes, columns: Tuple[List[str], str, str]) -> pd.DataFrame:
+    names, date_col, value_col = columns
+    if not data.strip():
+        return pd.DataFrame(
+            {"Date": pd.Series(dtype="datetime64[ns]"), "Value": pd.Series(dtype="float64")}
+        )
+    chunk = pd.read_csv(
+        io.BytesIO(data), header=None, names=names, usecols=[date_col, value_col], dtype=str
+    )
+    return _coerce_chunk(chunk, date_col, value_col)
+
+
+def read_raw_range(indicator_id: str, start: int, end: Optional[int] = None) -> pd.DataFrame:
+    # Rows whose lines lie in bytes [start, end) of the raw CSV; `start`
+    # must be a line start past the header (e.g. the old size of a file
+    # that has since been appended to).
+    csv_path = raw_csv_path(indicator_id)
+    columns = _raw_columns(csv_path)
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        data = f.read() if end is None else f.read(end - start)
+    return _parse_lines(data, columns)
+
+
+def read_raw_tail(
+    indicator_id: str, since: pd.Timestamp, end: int, block_size: int = 1 << 20
+) -> Optional[pd.DataFrame]:
+    # Rows dated on or after `since` among the first `end` bytes, found by
+    # reading backwards from `end` in doubling blocks until a row before
+    # `since` turns up. Only valid for files sorted by date: returns None
+    # when the rows read are not.
+    csv_path = raw_csv_path(indicator_id)
+    columns = _raw_columns(csv_path)
+    with open(csv_path, "rb") as f:
+        while True:
+            start = max(0, end - block_size)
+            f.seek(start)
+            data = f.read(end - start)
+            # Drop the first line: the header, or a line cut by the block.
+            rows = _parse_lines(data[data.find(b"\n") + 1:] if b"\n" in data else b"", columns)
+            dates = rows["Date"]
+            if not dates.is_monotonic_increasing:
+                return None
+            if start == 0 or (len(rows) and dates.iloc[0] < since):
+                return rows[dates >= since].reset_index(drop=True)
+            block_size *= 2
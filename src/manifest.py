@@ -0,0 +1,174 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from .config import (
+    DATA_PROCESSED_DIR,
+    DATA_RAW_DIR,
+    ANALYTICS_MA_YEARS,
+    ANALYTICS_VOL_YEARS,
+    ANALYTICS_ZSCORE_YEARS,
+    DEFAULT_AGGREGATOR,
+    INDICATOR_CONFIG,
+    MANIFEST_PATH,
+    PERIODS_PER_YEAR,
+    RESOLUTIONS,
+)
+from .store import header_path, write_json_atomic
+
+# The manifest records, per indicator, what its processed outputs were built
+# from: the raw file's content hash, the config entry's hash and the version
+# of the cleaning code. An indicator whose fingerprint still matches is
+# skipped by build_processed.py.
+#
+# It also keeps a hash of the raw file's last _TAIL_BYTES bytes: a file that
+# has only grown since (same config and code, those bytes unchanged) is
+# updated by appending instead of a full rebuild. The raw hash of such a
+# file chains the previous hash with the hash of the appended bytes, so the
+# whole file is never re-read; a later non-append change re-hashes it in
+# full, which just no longer matches and rebuilds it.
+MANIFEST_FORMAT = 1
+_TAIL_BYTES = 64 * 1024
+
+_SRC_DIR = Path(__file__).resolve().parent
+# Modules whose behaviour determines the processed output.
+_CODE_FILES = ("loader.py", "cleaner.py", "metadata.py", "store.py", "analytics.py", "episodes.py")
+
+
+def _sha256_file(path: Path, start: int = 0, end: Optional[int] = None) -> str:
+    # Hash of bytes [start, end) of the file (default: all of it).
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start if end is not None else None
+        while remaining is None or remaining > 0:
+            block = f.read(1 << 20 if remaining is None else min(1 << 20, remaining))
+            if not block:
+                break
+            h.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return h.hexdigest()
+
+
+def _tail_hash(path: Path, size: int) -> str:
+    return _sha256_file(path, max(0, size - _TAIL_BYTES), size)
+
+
+def code_version() -> str:
+    h = hashlib.sha256()
+    for name in _CODE_FILES:
+        h.update(name.encode())
+        h.update((_SRC_DIR / name).read_bytes())
+    # Build-wide settings from config.py that change every output.
+    settings = [
+        RESOLUTIONS,
+        DEFAULT_AGGREGATOR,
+        PERIODS_PER_YEAR,
+        [ANALYTICS_VOL_YEARS, ANALYTICS_ZSCORE_YEARS, list(ANALYTICS_MA_YEARS)],
+    ]
+    h.update(json.dumps(settings, sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+
+def config_hash(indicator_id: str) -> str:
+    payload = json.dumps(INDICATOR_CONFIG[indicator_id], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def raw_path(indicator_id: str) -> Path:
+    return DATA_RAW_DIR / INDICATOR_CONFIG[indicator_id]["file"]
+
+
+def load_manifest() -> Dict[str, Any]:
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"format": MANIFEST_FORMAT, "indicators": {}}
+    if manifest.get("format") != MANIFEST_FORMAT:
+        return {"format": MANIFEST_FORMAT, "indicators": {}}
+    return manifest
+
+
+def save_manifest(manifest: Dict[str, Any]) -> None:
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(MANIFEST_PATH, manifest)
+
+
+def fingerprint(
+    indicator_id: str, code: str, previous: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    path = raw_path(indicator_id)
+    stat = path.stat()
+
+    # Re-hashing a multi-GB raw file is only needed when its stat changed.
+    if (
+        previous is not None
+        and previous.get("raw_size") == stat.st_size
+        and previous.get("raw_mtime_ns") == stat.st_mtime_ns
+    ):
+        raw_hash = previous["raw_sha256"]
+    else:
+        raw_hash = _sha256_file(path)
+
+    return {
+        "raw_sha256": raw_hash,
+        "raw_size": stat.st_size,
+        "raw_mtime_ns": stat.st_mtime_ns,
+        "raw_tail_sha256": _tail_hash(path, stat.st_size),
+        "config_sha256": config_hash(indicator_id),
+        "code_version": code,
+    }
+
+
+def append_fingerprint(
+    indicator_id: str, code: str, previous: Optional[Dict[str, Any]]
+) -> Optional[Tuple[Dict[str, Any], int]]:
+    # (fingerprint, previous raw size) when the raw file has only had bytes
+    # appended since `previous` was recorded, else None.
+    if previous is None or "raw_tail_sha256" not in previous:
+        return None
+    if (
+        previous.get("config_sha256") != config_hash(indicator_id)
+        or previous.get("code_version") != code
+    ):
+        return None
+    path = raw_path(indicator_id)
+    stat = path.stat()
+    old_size = previous["raw_size"]
+    if stat.st_size <= old_size or _tail_hash(path, old_size) != previous["raw_tail_sha256"]:
+        return None
+    # The old bytes must end a line, or the appended ones start a new one.
+    with open(path, "rb") as f:
+        f.seek(max(0, old_size - 1))
+        boundary = f.read(2)
+    if b"\n" not in boundary:
+        return None
+
+    appended = _sha256_file(path, old_size, stat.st_size)
+    chained = hashlib.sha256((previous["raw_sha256"] + appended).encode()).hexdigest()
+    current = {
+        "raw_sha256": chained,
+        "raw_size": stat.st_size,
+        "raw_mtime_ns": stat.st_mtime_ns,
+        "raw_tail_sha256": _tail_hash(path, stat.st_size),
+        "config_sha256": config_hash(indicator_id),
+        "code_version": code,
+    }
+    return current, old_size
+
+
+_FINGERPRINT_KEYS = ("raw_sha256", "config_sha256", "code_version")
+
+
+def is_up_to_date(
+    indicator_id: str, entry: Optional[Dict[str, Any]], current: Dict[str, Any]
+) -> bool:
+    if entry is None:
+        return False
+    if any(entry.get(k) != current[k] for k in _FINGERPRINT_KEYS):
+        return False
+    # Outputs deleted by hand must be rebuilt even if the inputs match.
+    processed_csv = DATA_PROCESSED_DIR / f"{indicator_id}.csv"
+    return processed_csv.exists() and header_path(indicator_id).exists()
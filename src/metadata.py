@@ -1,37 +1,156 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Mapping, Optional
 import pandas as pd
-from .config import DATA_PROCESSED_DIR, METADATA_CSV_PATH, INDICATOR_CONFIG
+from .config import DATA_PROCESSED_DIR, DATA_RAW_DIR, METADATA_CSV_PATH, INDICATOR_CONFIG
+from .derived import derived_inputs, is_derived
+from .manifest import load_manifest
+from .slicer import slice_indicator
+from .store import read_header
+
+
+def raw_last_updated(indicator_id: str) -> Optional[str]:
+    # When an indicator's data last changed: its raw file's mtime (UTC), so
+    # rebuilding unchanged data leaves the index as it was. Derived
+    # indicators take the latest of their inputs.
+    if is_derived(indicator_id):
+        times = [raw_last_updated(i) for i in derived_inputs(indicator_id)]
+        return max((t for t in times if t is not None), default=None)
+    try:
+        mtime = (DATA_RAW_DIR / INDICATOR_CONFIG[indicator_id]["file"]).stat().st_mtime
+    except FileNotFoundError:
+        return None
+    return datetime.fromtimestamp(mtime, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def coverage_stats(
+    df: pd.DataFrame,
+    *,
+    frequency: Optional[str] = None,
+    raw_rows: Optional[int] = None,
+    null_count: Optional[int] = None,
+    last_updated: Optional[str] = None,
+) -> Dict[str, Any]:
+    # Coverage of a cleaned (monthly) series. The raw-side fields are only
+    # known while cleaning and stay None when computed from a processed file.
+    has_rows = not df.empty
+    return {
+        "start": df["Date"].min().strftime("%Y-%m") if has_rows else None,
+        "end": df["Date"].max().strftime("%Y-%m") if has_rows else None,
+        "rows": int(len(df)),
+        "frequency": frequency,
+        "raw_rows": raw_rows,
+        "null_count": null_count,
+        "last_updated": last_updated,
+    }
+
+
+def derived_coverage(indicator_id: str) -> Optional[Dict[str, Any]]:
+    # Computes a derived indicator through the slicer. Only the build calls
+    # this, when its inputs or spec change, and records the result in the
+    # manifest for the metadata index to read.
+    try:
+        df = slice_indicator(indicator_id).data
+    except (FileNotFoundError, ValueError):
+        return None
+    return coverage_stats(df, frequency="derived", last_updated=raw_last_updated(indicator_id))
 
-def build_metadata() -> pd.DataFrame:
-    rows = []
 
-    for indicator_id, info in INDICATOR_CONFIG.items():
+def _derived_stats() -> Dict[str, Any]:
+    return load_manifest().get("derived_stats", {})
+
+
+def _coverage(
+    indicator_id: str, df: Optional[pd.DataFrame], derived_stats: Mapping[str, Any]
+) -> Optional[Dict[str, Any]]:
+    # Cheapest source first: the store header written while cleaning, then an
+    # in-memory frame, and only then the processed CSV. Derived indicators
+    # use the coverage the build recorded, so no series data is read here.
+    if is_derived(indicator_id):
+        return derived_stats.get(indicator_id)
+
+    header = read_header(indicator_id)
+    if header is not None and "stats" in header:
+        return header["stats"]
+
+    if df is None:
         processed_path = DATA_PROCESSED_DIR / f"{indicator_id}.csv"
         if not processed_path.exists():
-            continue
-
+            return None
         df = pd.read_csv(processed_path, parse_dates=["Date"])
-        if df.empty:
-            continue
+    return coverage_stats(df, last_updated=raw_last_updated(indicator_id))
 
-        start_date = df["Date"].min()
-        end_date = df["Date"].max()
-        n_rows = len(df)
-
-        rows.append(
-            {
-                "indicator_id": indicator_id,
-                "display": info["display"],
-                "country": info["country"],
-                "category": info["category"],
-                "start": start_date.strftime("%Y-%m"),
-                "end": end_date.strftime("%Y-%m"),
-                "rows": n_rows,
-            }
-        )
 
+def _metadata_row(
+    indicator_id: str, df: Optional[pd.DataFrame], derived_stats: Mapping[str, Any]
+) -> Optional[Dict[str, Any]]:
+    info = INDICATOR_CONFIG[indicator_id]
+    stats = _coverage(indicator_id, df, derived_stats)
+    if stats is None or not stats["rows"]:
+        return None
+
+    return {
+        "indicator_id": indicator_id,
+        "display": info["display"],
+        "country": info["country"],
+        "category": info["category"],
+        "start": stats["start"],
+        "end": stats["end"],
+        "rows": stats["rows"],
+        "frequency": stats.get("frequency"),
+        "null_count": stats.get("null_count"),
+        "last_updated": stats.get("last_updated"),
+    }
+
+
+def _save_metadata(rows) -> pd.DataFrame:
     meta_df = pd.DataFrame(rows).sort_values(["country", "category", "indicator_id"])
+    # Derived indicators have no raw null count; keep the column integral.
+    meta_df["null_count"] = meta_df["null_count"].astype("Int64")
 
     DATA_PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
     meta_df.to_csv(METADATA_CSV_PATH, index=False)
     return meta_df
+
+
+def build_metadata(frames: Optional[Mapping[str, pd.DataFrame]] = None) -> pd.DataFrame:
+    # O(number of indicators) when the binary store is present: coverage is
+    # read from the store headers and the manifest. `frames` holds
+    # already-cleaned series to use instead of parsing processed CSVs when a
+    # header is missing.
+    frames = frames or {}
+    derived_stats = _derived_stats()
+    rows = []
+
+    for indicator_id in INDICATOR_CONFIG.keys():
+        row = _metadata_row(indicator_id, frames.get(indicator_id), derived_stats)
+        if row is not None:
+            rows.append(row)
+
+    return _save_metadata(rows)
+
+
+def update_metadata(
+    indicator_ids: Iterable[str], frames: Optional[Mapping[str, pd.DataFrame]] = None
+) -> pd.DataFrame:
+    # Patch only the given indicators' rows in the existing index; rows for
+    # indicators no longer in INDICATOR_CONFIG are dropped.
+    if not METADATA_CSV_PATH.exists():
+        return build_metadata(frames)
+
+    frames = frames or {}
+    indicator_ids = set(indicator_ids)
+    existing = pd.read_csv(METADATA_CSV_PATH)
+    keep = existing["indicator_id"].isin(INDICATOR_CONFIG.keys()) & ~existing[
+        "indicator_id"
+    ].isin(indicator_ids)
+    rows = existing.loc[keep].to_dict("records")
+
+    derived_stats = _derived_stats()
+    for indicator_id in indicator_ids:
+        if indicator_id not in INDICATOR_CONFIG:
+            continue
+        row = _metadata_row(indicator_id, frames.get(indicator_id), derived_stats)
+        if row is not None:
+            rows.append(row)
+
+    return _save_metadata(rows)
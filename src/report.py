@@ -0,0 +1,110 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple, get_args
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import pandas as pd
+
+from src.config import DATA_PROCESSED_DIR, INDICATOR_CONFIG
+from src.slicer import WindowType, window_summaries
+
+# Summary pack for every indicator x every quick window (plus any custom
+# ranges): each series is loaded once and all of its windows are answered
+# in one vectorized pass by slicer.window_summaries.
+FORMATS = ("csv", "json", "parquet")
+Range = Tuple[Optional[str], Optional[str]]
+
+
+def _indicator_report(args: Tuple[str, List[str], List[Range]]) -> pd.DataFrame:
+    # Top-level so it can run in a worker process.
+    indicator_id, windows, ranges = args
+    df = window_summaries(indicator_id, windows, ranges)
+    df.insert(1, "display", INDICATOR_CONFIG[indicator_id]["display"])
+    return df
+
+
+def build_report(
+    indicator_ids: Optional[List[str]] = None,
+    windows: Optional[List[str]] = None,
+    ranges: Optional[List[Range]] = None,
+    workers: int = 1,
+) -> pd.DataFrame:
+    ids = list(indicator_ids or INDICATOR_CONFIG)
+    windows = list(get_args(WindowType)) if windows is None else list(windows)
+    jobs = [(i, windows, list(ranges or [])) for i in ids]
+
+    if workers <= 1 or len(jobs) <= 1:
+        frames = [_indicator_report(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            frames = list(pool.map(_indicator_report, jobs))
+    return pd.concat(frames, ignore_index=True)
+
+
+def write_report(df: pd.DataFrame, path: Path, fmt: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "csv":
+        df.to_csv(path, index=False, date_format="%Y-%m-%d")
+    elif fmt == "json":
+        df.to_json(path, orient="records", date_format="iso", double_precision=15, indent=2)
+    elif fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError(
+                "Parquet output needs the optional 'pyarrow' package: pip install pyarrow"
+            ) from None
+        df.to_parquet(path, index=False)
+    else:
+        raise ValueError(f"Unknown report format {fmt!r}; expected one of {FORMATS}")
+
+
+def _parse_range(text: str) -> Range:
+    start, sep, end = text.partition(":")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Range must look like YYYY-MM:YYYY-MM, got {text!r}")
+    return start or None, end or None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Write summaries for every indicator and window to one report file."
+    )
+    parser.add_argument("--indicators", nargs="+", choices=list(INDICATOR_CONFIG), help="Default: all.")
+    parser.add_argument(
+        "--windows", nargs="*", choices=list(get_args(WindowType)), help="Default: all quick windows."
+    )
+    parser.add_argument(
+        "--range", dest="ranges", type=_parse_range, action="append", default=[],
+        help="Custom range YYYY-MM:YYYY-MM (either side may be empty); repeatable.",
+    )
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("-o", "--output", type=Path, help="Default: data_processed/report.<format>.")
+    parser.add_argument(
+        "-j", "--workers", type=int, default=1,
+        help="Worker processes (0 = one per CPU, default 1 = in-process).",
+    )
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    report = build_report(args.indicators, args.windows, args.ranges, workers)
+    output = args.output or DATA_PROCESSED_DIR / f"report.{args.format}"
+    try:
+        write_report(report, output, args.format)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"📄 {len(report)} summaries written to {output} in {time.perf_counter() - t0:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Compact in-memory form of a processed series: int32 day ordinals (days
+# since 1970-01-01) and float64 values in contiguous arrays, plus optional
+# extra float64 columns (the stored analytics). Every pyramid level has
+# whole-day dates, so day ordinals are exact from daily to annual data and
+# take half the space of datetime64[ns]. Store columns stay memory-mapped;
+# window() returns views and a DataFrame is only built by to_frame(), at
+# the edge (SliceResult.data, the app, the API).
+NS_PER_DAY = 86_400 * 10**9
+
+_INT32 = np.iinfo(np.int32)
+
+
+def to_days(ns: np.ndarray) -> np.ndarray:
+    # int64 ns timestamps -> int32 day ordinals (floor).
+    return (np.asarray(ns, dtype=np.int64) // NS_PER_DAY).astype(np.int32)
+
+
+def to_datetimes(days: np.ndarray) -> np.ndarray:
+    return np.asarray(days).astype("datetime64[D]").astype("datetime64[ns]")
+
+
+def to_timestamp(day: int) -> pd.Timestamp:
+    return pd.Timestamp(int(day) * NS_PER_DAY)
+
+
+def day_bounds(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Inclusive int64 ns spans -> inclusive int32 day spans: the first day at
+    # or after each start and the last day at or before each end, clipped so
+    # searchsorted never has to upcast the int32 ordinals.
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    first = starts // NS_PER_DAY + (starts % NS_PER_DAY != 0)
+    last = ends // NS_PER_DAY
+    return (
+        np.clip(first, _INT32.min, _INT32.max).astype(np.int32),
+        np.clip(last, _INT32.min, _INT32.max).astype(np.int32),
+    )
+
+
+class ArraySeries:
+    __slots__ = ("days", "values", "columns")
+
+    def __init__(
+        self,
+        days: np.ndarray,
+        values: np.ndarray,
+        columns: Optional[Dict[str, np.ndarray]] = None,
+    ) -> None:
+        self.days = days
+        self.values = values
+        self.columns = columns or {}
+
+    @classmethod
+    def from_columns(cls, data: Dict[str, np.ndarray]) -> "ArraySeries":
+        # Store columns: "Date" as int64 ns, everything else float64. Only
+        # the dates are converted; the other arrays are kept as given.
+        extra = {col: arr for col, arr in data.items() if col not in ("Date", "Value")}
+        return cls(to_days(data["Date"]), np.asarray(data["Value"], dtype="float64"), extra)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ArraySeries":
+        data = {"Date": df["Date"].to_numpy(dtype="datetime64[ns]").view("i8")}
+        for col in df.columns:
+            if col != "Date":
+                data[col] = df[col].to_numpy(dtype="float64")
+        return cls.from_columns(data)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def nbytes(self) -> int:
+        return self.days.nbytes + self.values.nbytes + sum(a.nbytes for a in self.columns.values())
+
+    def has_columns(self, names: Iterable[str]) -> bool:
+        return all(name in self.columns for name in names)
+
+    def ordinals(self) -> np.ndarray:
+        # int64 ns timestamps, for code that works in pandas' units.
+        return self.days.astype(np.int64) * NS_PER_DAY
+
+    def window(self, lo: int, hi: int) -> "ArraySeries":
+        return ArraySeries(
+            self.days[lo:hi],
+            self.values[lo:hi],
+            {col: arr[lo:hi] for col, arr in self.columns.items()},
+        )
+
+    def to_frame(self, columns: Iterable[str] = ()) -> pd.DataFrame:
+        data = {"Date": to_datetimes(self.days), "Value": np.array(self.values)}
+        for col in columns:
+            data[col] = np.array(self.columns[col])
+        # The arrays above are fresh copies, so the frame can take them as is.
+        return pd.DataFrame(data, copy=False)
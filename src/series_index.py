@@ -0,0 +1,247 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .series import day_bounds, to_days, to_timestamp
+
+# Rows per block of the min/max tables. Range min/max queries combine at most
+# two partial blocks (< 2 * _BLOCK rows) with an O(1) sparse-table lookup over
+# whole blocks, which keeps the tables small for long daily histories.
+_BLOCK = 32
+
+
+def _reduce(ufunc, arr: np.ndarray) -> float:
+    if len(arr) == 0:
+        return np.nan
+    return float(ufunc.reduce(arr))
+
+
+class _SparseTable:
+    def __init__(
+        self, values: np.ndarray, ufunc, known_blocks: Optional[np.ndarray] = None
+    ) -> None:
+        # known_blocks: block reductions already computed for a prefix of
+        # `values` (whole blocks only); only the blocks after it are reduced.
+        self.values = values
+        self.ufunc = ufunc
+        n = len(values)
+        if n == 0:
+            self.levels: List[np.ndarray] = [np.empty(0, dtype="float64")]
+            return
+
+        if known_blocks is None:
+            known_blocks = np.empty(0, dtype="float64")
+        start = len(known_blocks) * _BLOCK
+        if start < n:
+            blocks = np.concatenate(
+                (known_blocks, ufunc.reduceat(values[start:], np.arange(0, n - start, _BLOCK)))
+            )
+        else:
+            blocks = known_blocks
+        levels = [blocks]
+        span = 1
+        while 2 * span <= len(blocks):
+            prev = levels[-1]
+            levels.append(ufunc(prev[:-span], prev[span:]))
+            span *= 2
+        self.levels = levels
+
+    def _blocks(self, lo: int, hi: int) -> float:
+        # Whole blocks [lo, hi) answered from two overlapping power-of-two spans.
+        k = int(hi - lo).bit_length() - 1
+        level = self.levels[k]
+        return float(self.ufunc(level[lo], level[hi - (1 << k)]))
+
+    def query(self, lo: int, hi: int) -> float:
+        first_block = -(-lo // _BLOCK)
+        last_block = hi // _BLOCK
+        if first_block >= last_block:
+            return _reduce(self.ufunc, self.values[lo:hi])
+
+        parts = [self._blocks(first_block, last_block)]
+        if lo < first_block * _BLOCK:
+            parts.append(_reduce(self.ufunc, self.values[lo:first_block * _BLOCK]))
+        if last_block * _BLOCK < hi:
+            parts.append(_reduce(self.ufunc, self.values[last_block * _BLOCK:hi]))
+        return _reduce(self.ufunc, np.asarray(parts))
+
+    def _gather(self, start: np.ndarray, stop: np.ndarray, width: int) -> np.ndarray:
+        # ufunc over values[start:stop] for ranges shorter than `width` rows,
+        # as one padded (queries x width) gather.
+        idx = start[:, None] + np.arange(width)
+        inside = idx < stop[:, None]
+        rows = self.values[np.minimum(idx, len(self.values) - 1)]
+        return self.ufunc.reduce(np.where(inside, rows, np.nan), axis=1)
+
+    def query_many(self, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        # Vectorized query() over arrays of [lo, hi) ranges; NaN when empty.
+        lo = np.asarray(lo, dtype=np.int64)
+        hi = np.asarray(hi, dtype=np.int64)
+        if len(self.values) == 0:
+            return np.full(len(lo), np.nan)
+        first_block = -(-lo // _BLOCK)
+        last_block = hi // _BLOCK
+        has_blocks = first_block < last_block
+
+        # Without a whole block inside, a range spans < 2 * _BLOCK rows.
+        head_end = np.where(has_blocks, first_block * _BLOCK, hi)
+        out = self._gather(lo, head_end, 2 * _BLOCK)
+        if not has_blocks.any():
+            return out
+
+        tail = self._gather(np.where(has_blocks, last_block * _BLOCK, hi), hi, _BLOCK)
+        out = self.ufunc(out, tail)
+        spans = np.where(has_blocks, last_block - first_block, 1)
+        k = np.floor(np.log2(spans)).astype(np.int64)
+        for level_no in np.unique(k[has_blocks]):
+            rows = np.flatnonzero(has_blocks & (k == level_no))
+            level = self.levels[level_no]
+            blocks = self.ufunc(level[first_block[rows]], level[last_block[rows] - (1 << level_no)])
+            out[rows] = self.ufunc(out[rows], blocks)
+        return out
+
+
+def window_summary(
+    start_val: float,
+    end_val: float,
+    min_val: float,
+    max_val: float,
+    avg_val: float,
+    rows: int,
+) -> Dict[str, Any]:
+    change = end_val - start_val
+    pct_change = (change / start_val * 100) if start_val != 0 else None
+
+    return {
+        "start_value": float(start_val),
+        "end_value": float(end_val),
+        "abs_change": float(change),
+        "pct_change": float(pct_change) if pct_change is not None else None,
+        "min_value": float(min_val),
+        "max_value": float(max_val),
+        "avg_value": float(avg_val),
+        "rows": int(rows),
+    }
+
+
+# Built once per loaded series: int32 day ordinals (shared with the
+# ArraySeries) for searchsorted bounds, prefix sums/counts for averages and
+# block sparse tables for min/max, so a window summary costs O(log n)
+# instead of a pass over every row.
+class SeriesIndex:
+    def __init__(self, days: np.ndarray, values: np.ndarray) -> None:
+        self.days = np.asarray(days, dtype=np.int32)
+        self.values = np.asarray(values, dtype="float64")
+
+        valid = ~np.isnan(self.values)
+        self._prefix_sum = np.concatenate(([0.0], np.cumsum(np.where(valid, self.values, 0.0))))
+        self._prefix_count = np.concatenate(
+            (np.zeros(1, np.int32), np.cumsum(valid, dtype=np.int32))
+        )
+        self._min = _SparseTable(self.values, np.fmin)
+        self._max = _SparseTable(self.values, np.fmax)
+
+    @classmethod
+    def spliced(
+        cls, previous: "SeriesIndex", days: np.ndarray, values: np.ndarray, tail_start: int
+    ) -> "SeriesIndex":
+        # Index of a series whose rows before tail_start are those `previous`
+        # was built on (an append-only update, see store.splice_series): the
+        # prefix sums and min/max blocks of that part are reused, so the cost
+        # follows the size of the tail.
+        index = cls.__new__(cls)
+        index.days = np.asarray(days, dtype=np.int32)
+        index.values = np.asarray(values, dtype="float64")
+
+        tail = index.values[tail_start:]
+        valid = ~np.isnan(tail)
+        # Summed on from the kept prefix so every entry matches a full cumsum.
+        sums = np.cumsum(
+            np.concatenate(([previous._prefix_sum[tail_start]], np.where(valid, tail, 0.0)))
+        )
+        index._prefix_sum = np.concatenate((previous._prefix_sum[:tail_start], sums))
+        index._prefix_count = np.concatenate((
+            previous._prefix_count[:tail_start + 1],
+            previous._prefix_count[tail_start] + np.cumsum(valid, dtype=np.int32),
+        ))
+        whole = tail_start // _BLOCK
+        index._min = _SparseTable(index.values, np.fmin, previous._min.levels[0][:whole])
+        index._max = _SparseTable(index.values, np.fmax, previous._max.levels[0][:whole])
+        return index
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "SeriesIndex":
+        dates = df["Date"].to_numpy(dtype="datetime64[ns]").view("i8")
+        return cls(to_days(dates), df["Value"].to_numpy())
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def bounds(
+        self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None
+    ) -> Tuple[int, int]:
+        # Half-open row range [lo, hi) of dates within [start, end].
+        lowest, highest = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+        lo, hi = self.bounds_many(
+            np.array([lowest if start is None else start.value]),
+            np.array([highest if end is None else end.value]),
+        )
+        return int(lo[0]), int(hi[0])
+
+    def date_at(self, i: int) -> pd.Timestamp:
+        return to_timestamp(self.days[i])
+
+    def range_min(self, lo: int, hi: int) -> float:
+        return self._min.query(lo, hi)
+
+    def range_max(self, lo: int, hi: int) -> float:
+        return self._max.query(lo, hi)
+
+    def range_mean(self, lo: int, hi: int) -> float:
+        count = self._prefix_count[hi] - self._prefix_count[lo]
+        if count == 0:
+            return np.nan
+        return float((self._prefix_sum[hi] - self._prefix_sum[lo]) / count)
+
+    def bounds_many(self, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # bounds() for arrays of int64 ns timestamps (inclusive).
+        first, last = day_bounds(starts, ends)
+        lo = np.searchsorted(self.days, first, side="left")
+        hi = np.searchsorted(self.days, last, side="right")
+        return lo, np.maximum(lo, hi)
+
+    def summaries(self, lo: np.ndarray, hi: np.ndarray) -> Dict[str, np.ndarray]:
+        # summary() for many windows at once, as columns; empty windows are NaN.
+        lo = np.asarray(lo, dtype=np.int64)
+        hi = np.asarray(hi, dtype=np.int64)
+        rows = hi - lo
+        nonempty = rows > 0
+        if len(self) == 0:
+            start_val = end_val = np.full(len(lo), np.nan)
+        else:
+            start_val = np.where(nonempty, self.values[np.minimum(lo, len(self) - 1)], np.nan)
+            end_val = np.where(nonempty, self.values[np.maximum(hi - 1, 0)], np.nan)
+        count = self._prefix_count[hi] - self._prefix_count[lo]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg = (self._prefix_sum[hi] - self._prefix_sum[lo]) / count
+            change = end_val - start_val
+            pct_change = np.where(start_val != 0, change / start_val * 100, np.nan)
+        return {
+            "start_value": start_val,
+            "end_value": end_val,
+            "abs_change": change,
+            "pct_change": pct_change,
+            "min_value": self._min.query_many(lo, hi),
+            "max_value": self._max.query_many(lo, hi),
+            "avg_value": np.where(count > 0, avg, np.nan),
+            "rows": rows,
+        }
+
+    def summary(self, lo: int, hi: int) -> Dict[str, Any]:
+        return window_summary(
+            self.values[lo],
+            self.values[hi - 1],
+            self.range_min(lo, hi),
+            self.range_max(lo, hi),
+            self.range_mean(lo, hi),
+            hi - lo,
+        )
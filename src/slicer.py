@@ -1,8 +1,17 @@
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import date
-from typing import Optional, Literal, Dict, Any
+from typing import Optional, Literal, Dict, Any, Tuple, Callable, Iterable, List
+import numpy as np
 import pandas as pd
-from .config import DATA_PROCESSED_DIR
+from .config import DATA_PROCESSED_DIR, RESOLUTIONS, SERIES_CACHE_MAX_ENTRIES
+from . import store
+from .analytics import analytics_columns, with_analytics, yoy_change
+from .derived import compute_derived, dependency_order, derived_inputs, derived_spec, is_derived
+from .series import ArraySeries, day_bounds, to_datetimes, to_timestamp
+from .series_index import SeriesIndex, window_summary
+from .timing import span
 
 WindowType = Literal["1Y", "3Y", "5Y", "10Y", "20Y", "30Y"]
 
@@ -13,26 +22,295 @@ class SliceResult:
     end_date: pd.Timestamp
     data: pd.DataFrame
     summary: Dict[str, Any]
+    # Pyramid level the rows come from ("D", "W", "M", "Q" or "A").
+    resolution: str = "M"
 
 
-def _load_processed(indicator_id: str) -> pd.DataFrame:
-    path = DATA_PROCESSED_DIR / f"{indicator_id}.csv"
-    if not path.exists():
-        raise FileNotFoundError(f"Processed CSV not found: {path}")
+@dataclass
+class PanelSliceResult:
+    start_date: pd.Timestamp
+    end_date: pd.Timestamp
+    # Wide frame: "Date" plus one column per indicator, aligned on the union
+    # of monthly dates; values outside an indicator's own window are NaN.
+    data: pd.DataFrame
+    results: Dict[str, SliceResult]
+    # Requested indicators with no rows in the window (no SliceResult).
+    empty: List[str]
+
+
+@dataclass
+class _LoadedSeries:
+    data: ArraySeries
+    index: SeriesIndex
+    header: Optional[Dict[str, Any]] = None
+    # Series with the rolling analytics columns, computed on first use when
+    # the source does not store them (CSV fallback).
+    analytics: Optional[ArraySeries] = None
+
+
+# Parsed, sorted series shared by every session in the process, keyed by
+# store series name (indicator_id, or "<indicator_id>@<resolution>" for the
+# other pyramid levels) and validated against the source file's (kind, mtime_ns, size)
+# stamp so a rebuild by build_processed.py is picked up on the next call.
+# Derived indicators are stamped with their spec and their inputs' stamps.
+# After an append-only update the index of the replaced entry is extended
+# from its first changed row instead of being rebuilt.
+Stamp = Tuple[Any, ...]
+_SERIES_CACHE: "OrderedDict[str, Tuple[Stamp, _LoadedSeries]]" = OrderedDict()
+_SERIES_CACHE_LOCK = threading.Lock()
+
+
+def clear_series_cache() -> None:
+    with _SERIES_CACHE_LOCK:
+        _SERIES_CACHE.clear()
 
+
+def _read_processed_csv(path) -> pd.DataFrame:
     df = pd.read_csv(path, parse_dates=["Date"])
     df = df.sort_values("Date").reset_index(drop=True)
     return df
 
 
+def _read_store(name: str) -> Tuple[ArraySeries, Optional[Dict[str, Any]]]:
+    header = store.read_header(name)
+    return ArraySeries.from_columns(store.open_columns(name, header)), header
+
+
+Reader = Callable[[], Tuple[ArraySeries, Optional[Dict[str, Any]]]]
+
+
+def _derived_source(indicator_id: str, resolution: str) -> Tuple[Stamp, Reader]:
+    # Stamping a derived series with its inputs' stamps (recursively for
+    # derived inputs) means a rebuild anywhere up the graph invalidates it.
+    dependency_order([indicator_id])  # rejects cycles and unknown inputs
+    names = [store.series_name(i, resolution) for i in derived_inputs(indicator_id)]
+    stamps = tuple(_processed_source(n)[0] for n in names)
+
+    def read() -> Tuple[ArraySeries, Optional[Dict[str, Any]]]:
+        return compute_derived(indicator_id, [_load_series(n).data for n in names]), None
+
+    return ("derived", repr(derived_spec(indicator_id))) + stamps, read
+
+
+def _processed_source(name: str) -> Tuple[Stamp, Reader]:
+    # Prefer the binary store written by build_processed.py and fall back to
+    # the CSV export when it is missing (e.g. data_processed/ from git only).
+    # The store is written already sorted and its value columns stay backed
+    # by their memory maps.
+    indicator_id, _, resolution = name.partition("@")
+    if is_derived(indicator_id):
+        return _derived_source(indicator_id, resolution or "M")
+
+    try:
+        stat = store.header_path(name).stat()
+        return ("store", stat.st_mtime_ns, stat.st_size), lambda: _read_store(name)
+    except FileNotFoundError:
+        pass
+
+    if "@" in name:
+        # Non-monthly pyramid levels only exist in the store.
+        raise FileNotFoundError(f"Processed store not found: {store.header_path(name)}")
+
+    path = DATA_PROCESSED_DIR / f"{name}.csv"
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Processed CSV not found: {path}") from None
+    return (
+        ("csv", stat.st_mtime_ns, stat.st_size),
+        lambda: (ArraySeries.from_frame(_read_processed_csv(path)), None),
+    )
+
+
+def _spliced_from(
+    previous: Optional[_LoadedSeries], header: Optional[Dict[str, Any]]
+) -> Optional[int]:
+    # First changed row when `header` is an append-only update of the
+    # version `previous` was loaded from (store.splice_series), else None.
+    if previous is None or previous.header is None or header is None:
+        return None
+    if header.get("base_version") != previous.header["version"]:
+        return None
+    tail_start = header["tail_start"]
+    return tail_start if tail_start <= min(previous.header["rows"], header["rows"]) else None
+
+
+def _load_series(name: str) -> _LoadedSeries:
+    stamp, reader = _processed_source(name)
+
+    with _SERIES_CACHE_LOCK:
+        cached = _SERIES_CACHE.get(name)
+        if cached is not None and cached[0] == stamp:
+            _SERIES_CACHE.move_to_end(name)
+            return cached[1]
+
+    # Read and index outside the lock so a slow read does not block other
+    # indicators.
+    with span("slicer.load"):
+        data, header = reader()
+    with span("slicer.index"):
+        tail_start = _spliced_from(cached[1] if cached else None, header)
+        if tail_start is None:
+            index = SeriesIndex(data.days, data.values)
+        else:
+            index = SeriesIndex.spliced(cached[1].index, data.days, data.values, tail_start)
+        loaded = _LoadedSeries(data=data, index=index, header=header)
+
+    with _SERIES_CACHE_LOCK:
+        _SERIES_CACHE[name] = (stamp, loaded)
+        _SERIES_CACHE.move_to_end(name)
+        while len(_SERIES_CACHE) > SERIES_CACHE_MAX_ENTRIES:
+            _SERIES_CACHE.popitem(last=False)
+    return loaded
+
+
+def data_version(indicator_ids: Iterable[str]) -> Tuple[Stamp, ...]:
+    # Source stamps of the monthly series; changes whenever one is rebuilt
+    # (for a derived indicator: whenever one of its inputs is).
+    return tuple(_processed_source(i)[0] for i in indicator_ids)
+
+
+def _load_processed(indicator_id: str) -> pd.DataFrame:
+    return _load_series(indicator_id).data.to_frame()
+
+
+def available_resolutions(indicator_id: str) -> List[str]:
+    # Finest first; only "M" when the store (and so the pyramid) is missing.
+    # Derived indicators have the levels all of their inputs have.
+    if is_derived(indicator_id):
+        levels = [available_resolutions(i) for i in derived_inputs(indicator_id)]
+        return [res for res in RESOLUTIONS if all(res in level for level in levels)]
+    header = _load_series(indicator_id).header
+    levels = (header or {}).get("resolutions") or {"M": None}
+    return [res for res in RESOLUTIONS if res in levels]
+
+
+def _fixed_window_bounds(index: SeriesIndex, window: WindowType) -> Tuple[int, int]:
+    return _span_bounds(index, _window_span(index, window=window))
+
+
 def _apply_fixed_window(df: pd.DataFrame, window: WindowType) -> pd.DataFrame:
-    last_date = df["Date"].max()
+    lo, hi = _fixed_window_bounds(SeriesIndex.from_frame(df), window)
+    return df.iloc[lo:hi].copy()
+
+
+def _custom_range_bounds(
+    index: SeriesIndex, start: Optional[str], end: Optional[str]
+) -> Tuple[int, int]:
+    return _span_bounds(index, _window_span(index, start=start, end=end))
+
+
+def _span_bounds(index: SeriesIndex, span: Tuple[int, int]) -> Tuple[int, int]:
+    lo, hi = index.bounds_many(np.array([span[0]]), np.array([span[1]]))
+    return int(lo[0]), int(hi[0])
+
+
+def _window_span(
+    index: SeriesIndex,
+    window: Optional[WindowType] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> Tuple[int, int]:
+    # Inclusive (start, end) date span of a fixed window (anchored at the
+    # series' last date) or a "YYYY-MM" range, as int64 ns.
+    lowest, highest = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+    if window is not None:
+        if len(index) == 0:
+            return highest, lowest
+        return _anchored_span(index.date_at(len(index) - 1), window)
+    start_ts = pd.to_datetime(start + "-01") if start else None
+    end_ts = pd.to_datetime(end + "-01") + pd.offsets.MonthEnd(0) if end else None
+    return (
+        lowest if start_ts is None else start_ts.value,
+        highest if end_ts is None else end_ts.value,
+    )
+
+
+def _anchored_span(last_date: pd.Timestamp, window: WindowType) -> Tuple[int, int]:
+    # A fixed window ending at last_date: from the first of the same month
+    # `years` earlier, as int64 ns.
     years = int(window.replace("Y", ""))
-    start_year = last_date.year - years
-    start_candidate = pd.Timestamp(year=start_year, month=last_date.month, day=1)
+    first = pd.Timestamp(year=last_date.year - years, month=last_date.month, day=1)
+    return first.value, last_date.value
+
 
-    mask = (df["Date"] >= start_candidate) & (df["Date"] <= last_date)
-    return df.loc[mask].copy()
+def window_summaries(
+    indicator_id: str,
+    windows: Iterable[WindowType] = (),
+    ranges: Iterable[Tuple[Optional[str], Optional[str]]] = (),
+    resolution: str = "M",
+) -> pd.DataFrame:
+    # Summaries of many windows of one series in a single vectorized pass:
+    # one row per fixed window, then one per (start, end) "YYYY-MM" range,
+    # with the same values as slice_indicator(...).summary. Empty windows
+    # get rows == 0 and NaN values.
+    series = _load_series(store.series_name(indicator_id, resolution))
+    index = series.index
+    windows, ranges = list(windows), list(ranges)
+    labels = windows + [f"{start or ''}:{end or ''}" for start, end in ranges]
+    spans = [_window_span(index, window=w) for w in windows]
+    spans += [_window_span(index, start=start, end=end) for start, end in ranges]
+
+    starts = np.array([span[0] for span in spans], dtype=np.int64)
+    ends = np.array([span[1] for span in spans], dtype=np.int64)
+    lo, hi = index.bounds_many(starts, ends)
+    out = pd.DataFrame({"indicator_id": indicator_id, "window": labels, "resolution": resolution})
+    nonempty = hi > lo
+    start_dates = np.full(len(lo), np.datetime64("NaT"), dtype="datetime64[ns]")
+    end_dates = start_dates.copy()
+    start_dates[nonempty] = to_datetimes(index.days[lo[nonempty]])
+    end_dates[nonempty] = to_datetimes(index.days[hi[nonempty] - 1])
+    out["start_date"] = start_dates
+    out["end_date"] = end_dates
+    for key, values in index.summaries(lo, hi).items():
+        out[key] = values
+    return out
+
+
+def _analytics_series(series: _LoadedSeries, resolution: str) -> ArraySeries:
+    if series.data.has_columns(analytics_columns()):
+        return series.data
+    if series.analytics is None:
+        series.analytics = ArraySeries.from_frame(
+            with_analytics(series.data.to_frame(), resolution)
+        )
+    return series.analytics
+
+
+def _with_change(
+    sliced: pd.DataFrame,
+    *,
+    source: Optional[ArraySeries] = None,
+    yoy: bool = False,
+    log_change: bool = False,
+) -> pd.DataFrame:
+    # All change columns stay numeric; formatting belongs to the display layer.
+    values = sliced["Value"].to_numpy(dtype="float64")
+    prev = np.empty_like(values)
+    prev[:1] = np.nan
+    prev[1:] = values[:-1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (values / prev - 1.0) * 100
+        change[~np.isfinite(change)] = 0.0
+        sliced["Change %"] = change
+
+        if yoy and "YoY %" not in sliced.columns:
+            # Compared with the latest observation at least a year earlier,
+            # looked up in the full series so the first year of the window
+            # has a value too.
+            if source is None:
+                source = ArraySeries.from_frame(sliced[["Date", "Value"]])
+            sliced["YoY %"] = yoy_change(sliced["Date"], values, source.ordinals(), source.values)
+
+        if log_change:
+            log_diff = np.log(values / prev)
+            log_diff[~np.isfinite(log_diff)] = np.nan
+            sliced["Log Change"] = log_diff
+
+    # Change columns first, then any precomputed analytics.
+    front = [c for c in ("Date", "Value", "Change %", "YoY %", "Log Change") if c in sliced.columns]
+    return sliced[front + [c for c in sliced.columns if c not in front]]
 
 
 def slice_indicator(
@@ -41,50 +319,177 @@ def slice_indicator(
     window: Optional[WindowType] = None,
     start: Optional[str] = None,
     end: Optional[str] = None,
+    resolution: Optional[str] = None,
+    max_rows: Optional[int] = None,
+    yoy: bool = False,
+    log_change: bool = False,
+    analytics: bool = False,
 ) -> SliceResult:
-
-    df = _load_processed(indicator_id)
+    # resolution picks a pyramid level explicitly; max_rows instead picks the
+    # finest level whose window fits in that many rows (coarsest otherwise).
+    # With neither, the monthly series is used. yoy/log_change add numeric
+    # "YoY %" and "Log Change" columns next to "Change %"; analytics adds the
+    # rolling columns precomputed by build_processed.py (see analytics.py).
 
     if window is not None and (start is not None or end is not None):
         raise ValueError("Use either 'window' OR ('start'/'end'), not both.")
+    if resolution is not None and max_rows is not None:
+        raise ValueError("Use either 'resolution' OR 'max_rows', not both.")
 
-    if window is not None:
-        sliced = _apply_fixed_window(df, window)
-    else:
-        start_ts = pd.to_datetime(start + "-01") if start else df["Date"].min()
-        end_ts = pd.to_datetime(end + "-01") + pd.offsets.MonthEnd(0) if end else df["Date"].max()
-        mask = (df["Date"] >= start_ts) & (df["Date"] <= end_ts)
-        sliced = df.loc[mask].copy()
-
-    if sliced.empty:
+    def bounds(index: SeriesIndex) -> Tuple[int, int]:
+        if window is not None:
+            return _fixed_window_bounds(index, window)
+        return _custom_range_bounds(index, start, end)
+
+    with span("slicer.bounds"):
+        if max_rows is None:
+            resolution = resolution or "M"
+            if resolution != "M" and resolution not in available_resolutions(indicator_id):
+                raise ValueError(
+                    f"Resolution {resolution!r} not available for {indicator_id}; "
+                    f"available: {available_resolutions(indicator_id)}"
+                )
+            series = _load_series(store.series_name(indicator_id, resolution))
+            lo, hi = bounds(series.index)
+        else:
+            for resolution in available_resolutions(indicator_id):
+                series = _load_series(store.series_name(indicator_id, resolution))
+                lo, hi = bounds(series.index)
+                if hi - lo <= max_rows:
+                    break
+
+    data, index = series.data, series.index
+    if hi <= lo:
         raise ValueError("Sliced data is empty for given parameters.")
 
-    sliced = sliced.sort_values("Date").reset_index(drop=True)
-    sliced["Change %"] = sliced["Value"].pct_change() * 100
-    sliced["Change %"] = sliced["Change %"].fillna(0.0)
-    sliced["Change %"] = sliced["Change %"].replace([float("inf"), float("-inf")], 0.0)
-    sliced["Change %"] = sliced["Change %"].apply(lambda x: f"{x:.2f}%")
-
-    start_val = sliced["Value"].iloc[0]
-    end_val = sliced["Value"].iloc[-1]
-    change = end_val - start_val
-    pct_change = (change / start_val * 100) if start_val != 0 else None
-
-    summary = {
-        "start_value": float(start_val),
-        "end_value": float(end_val),
-        "abs_change": float(change),
-        "pct_change": float(pct_change) if pct_change is not None else None,
-        "min_value": float(sliced["Value"].min()),
-        "max_value": float(sliced["Value"].max()),
-        "avg_value": float(sliced["Value"].mean()),
-        "rows": int(len(sliced)),
-    }
+    columns: List[str] = []
+    if analytics:
+        data = _analytics_series(series, resolution)
+        columns = analytics_columns()
+    elif yoy and "YoY %" in data.columns:
+        columns = ["YoY %"]
+
+    # Rows are already sorted, so the window is a contiguous positional range
+    # (views of the arrays); only the requested columns become a DataFrame.
+    with span("slicer.slice"):
+        sliced = _with_change(
+            data.window(lo, hi).to_frame(columns),
+            source=series.data,
+            yoy=yoy,
+            log_change=log_change,
+        )
+    with span("slicer.summary"):
+        summary = index.summary(lo, hi)
 
     return SliceResult(
         indicator_id=indicator_id,
-        start_date=sliced["Date"].min(),
-        end_date=sliced["Date"].max(),
+        start_date=index.date_at(lo),
+        end_date=index.date_at(hi - 1),
         data=sliced,
         summary=summary,
+        resolution=resolution,
+    )
+
+
+def slice_many(
+    indicator_ids: Iterable[str],
+    *,
+    window: Optional[WindowType] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    anchor: Literal["each", "latest"] = "each",
+) -> PanelSliceResult:
+    # With anchor="each" fixed windows are anchored at each indicator's own
+    # last date, exactly as in slice_indicator, so every SliceResult matches
+    # the single-series call. anchor="latest" anchors the window once, at the
+    # most recent date any indicator has data for, and applies that calendar
+    # range to every column (what cross-indicator statistics need); series
+    # that stop earlier are simply sparse or empty in that range.
+    if window is not None and (start is not None or end is not None):
+        raise ValueError("Use either 'window' OR ('start'/'end'), not both.")
+    if anchor not in ("each", "latest"):
+        raise ValueError(f"Unknown anchor {anchor!r}; expected 'each' or 'latest'.")
+
+    ids = list(dict.fromkeys(indicator_ids))
+    if not ids:
+        raise ValueError("No indicator_ids given.")
+    loaded = [_load_series(i) for i in ids]
+
+    dates = np.unique(np.concatenate([s.index.days for s in loaded]))
+    n_rows, n_cols = len(dates), len(ids)
+    panel = np.full((n_rows, n_cols), np.nan)
+    lo = np.zeros(n_cols, dtype=np.int64)
+    hi = np.zeros(n_cols, dtype=np.int64)
+
+    each = window is not None and anchor == "each"
+    if not each:
+        if window is None:
+            span = _window_span(loaded[0].index, start=start, end=end)
+        else:
+            ends = [s.index.days[-1] for s in loaded if len(s.index)]
+            if not ends:
+                raise ValueError("Sliced data is empty for given parameters.")
+            span = _anchored_span(to_timestamp(max(ends)), window)
+        first_day, last_day = day_bounds(*span)
+        lo[:] = np.searchsorted(dates, first_day, side="left")
+        hi[:] = np.searchsorted(dates, last_day, side="right")
+
+    for j, series in enumerate(loaded):
+        rows = np.searchsorted(dates, series.index.days)
+        panel[rows, j] = series.index.values
+        if each:
+            s_lo, s_hi = _fixed_window_bounds(series.index, window)
+            if s_hi > s_lo:
+                lo[j], hi[j] = rows[s_lo], rows[s_hi - 1] + 1
+
+    # One pass over the 2-D array answers every indicator's summary.
+    row_no = np.arange(n_rows)[:, None]
+    in_window = (row_no >= lo) & (row_no < hi) & ~np.isnan(panel)
+    masked = np.where(in_window, panel, np.nan)
+    counts = in_window.sum(axis=0)
+    first = np.argmax(in_window, axis=0)
+    last = n_rows - 1 - np.argmax(in_window[::-1], axis=0)
+    cols = np.arange(n_cols)
+    with np.errstate(invalid="ignore"):
+        start_vals = masked[first, cols]
+        end_vals = masked[last, cols]
+        mins = np.fmin.reduce(masked, axis=0)
+        maxs = np.fmax.reduce(masked, axis=0)
+        avgs = np.nansum(masked, axis=0) / counts
+
+    results: Dict[str, SliceResult] = {}
+    empty: List[str] = []
+    for j, indicator_id in enumerate(ids):
+        if counts[j] == 0:
+            empty.append(indicator_id)
+            continue
+        take = in_window[:, j]
+        sliced = _with_change(
+            pd.DataFrame({"Date": to_datetimes(dates[take]), "Value": panel[take, j]})
+        )
+        results[indicator_id] = SliceResult(
+            indicator_id=indicator_id,
+            start_date=to_timestamp(dates[first[j]]),
+            end_date=to_timestamp(dates[last[j]]),
+            data=sliced,
+            summary=window_summary(
+                start_vals[j], end_vals[j], mins[j], maxs[j], avgs[j], counts[j]
+            ),
+        )
+
+    if not results:
+        raise ValueError("Sliced data is empty for given parameters.")
+
+    any_rows = in_window.any(axis=1)
+    top = int(np.argmax(any_rows))
+    bottom = n_rows - int(np.argmax(any_rows[::-1]))
+    aligned = pd.DataFrame(masked[top:bottom], columns=ids)
+    aligned.insert(0, "Date", to_datetimes(dates[top:bottom]))
+
+    return PanelSliceResult(
+        start_date=to_timestamp(dates[top]),
+        end_date=to_timestamp(dates[bottom - 1]),
+        data=aligned,
+        results=results,
+        empty=empty,
     )
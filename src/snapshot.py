@@ -0,0 +1,94 @@
+import os
+import pickle
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple, get_args
+from .config import INDICATOR_CONFIG, SLICE_ROW_BUDGET, SNAPSHOT_PATH
+from .slicer import SliceResult, WindowType, data_version, slice_indicator
+
+# Every quick-select window of every indicator, sliced exactly as the app
+# asks for it and pickled into one file by build_processed.py. A quick-window
+# click is then a dict lookup; each entry carries the data version it was
+# built from and is ignored once its indicator has been rebuilt since.
+SNAPSHOT_FORMAT = 1
+QUICK_WINDOWS = get_args(WindowType)
+QUICK_SLICE_OPTIONS = {"max_rows": SLICE_ROW_BUDGET, "yoy": True, "analytics": True}
+
+
+def build_snapshot(indicator_ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    entries: Dict[str, Dict[str, Any]] = {}
+    for indicator_id in indicator_ids if indicator_ids is not None else INDICATOR_CONFIG:
+        try:
+            version = data_version([indicator_id])
+        except FileNotFoundError:
+            continue
+        results = {}
+        for window in QUICK_WINDOWS:
+            try:
+                results[window] = slice_indicator(indicator_id, window=window, **QUICK_SLICE_OPTIONS)
+            except ValueError:
+                continue
+        entries[indicator_id] = {"version": version, "results": results}
+    return {"format": SNAPSHOT_FORMAT, "options": QUICK_SLICE_OPTIONS, "indicators": entries}
+
+
+def update_snapshot(indicator_ids: Iterable[str]) -> Dict[str, Any]:
+    # The current snapshot with just the given indicators re-sliced (or
+    # dropped, once they no longer exist); a full build when there is no
+    # usable snapshot yet.
+    current = load_snapshot()
+    if current is None:
+        return build_snapshot()
+    ids = list(indicator_ids)
+    entries = {
+        i: e for i, e in current["indicators"].items() if i not in ids and i in INDICATOR_CONFIG
+    }
+    entries.update(build_snapshot([i for i in ids if i in INDICATOR_CONFIG])["indicators"])
+    return {**current, "indicators": entries}
+
+
+def write_snapshot(snapshot: Dict[str, Any]) -> None:
+    SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = SNAPSHOT_PATH.with_suffix(SNAPSHOT_PATH.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, SNAPSHOT_PATH)
+
+
+_LOADED: Dict[str, Any] = {"stamp": None, "snapshot": None}
+_LOADED_LOCK = threading.Lock()
+
+
+def load_snapshot() -> Optional[Dict[str, Any]]:
+    # Re-read only when the file changes; None when there is no usable file.
+    try:
+        stat = SNAPSHOT_PATH.stat()
+        stamp: Tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        return None
+
+    with _LOADED_LOCK:
+        if _LOADED["stamp"] != stamp:
+            try:
+                with open(SNAPSHOT_PATH, "rb") as f:
+                    snapshot = pickle.load(f)
+            except Exception:
+                # Unreadable or written by an incompatible version.
+                snapshot = None
+            if snapshot is not None and (
+                snapshot.get("format") != SNAPSHOT_FORMAT
+                or snapshot.get("options") != QUICK_SLICE_OPTIONS
+            ):
+                snapshot = None
+            _LOADED.update(stamp=stamp, snapshot=snapshot)
+        return _LOADED["snapshot"]
+
+
+def quick_slice(indicator_id: str, window: WindowType) -> SliceResult:
+    # The app's quick-window slice: from the snapshot when it is current,
+    # otherwise from the slicer.
+    snapshot = load_snapshot()
+    entry = snapshot["indicators"].get(indicator_id) if snapshot else None
+    if entry is not None and window in entry["results"]:
+        if entry["version"] == data_version([indicator_id]):
+            return entry["results"][window]
+    return slice_indicator(indicator_id, window=window, **QUICK_SLICE_OPTIONS)
@@ -0,0 +1,180 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+import numpy as np
+import pandas as pd
+from .config import PROCESSED_STORE_DIR
+
+# Binary columnar layout for processed series:
+#   <name>.json              small header (rows, column dtypes, file names)
+#   <name>.<version>.<col>.bin   raw little-endian column data, one per column
+# Readers memory-map the column files, so worker processes share the page
+# cache and loads never parse text. The header is replaced last and
+# atomically; column files are versioned so a reader holding an old header
+# never maps a file that was rewritten underneath it.
+#
+# splice_series() serves append-only updates: the next version's column
+# files are the previous version's rows before `tail_start` (copied as raw
+# bytes, nothing is re-encoded) followed by the new tail, and the header
+# records that row and the version it extends ("base_version"), so caches
+# can keep everything before it.
+STORE_FORMAT = 1
+
+_DTYPES = {
+    "Date": "<i8",   # datetime64[ns] stored as int64 nanoseconds
+}
+_DEFAULT_DTYPE = "<f8"
+
+
+def series_name(indicator_id: str, resolution: str = "M") -> str:
+    # The monthly series keeps the bare indicator_id; other levels of the
+    # resolution pyramid are stored as "<indicator_id>@<resolution>".
+    return indicator_id if resolution == "M" else f"{indicator_id}@{resolution}"
+
+
+def header_path(name: str) -> Path:
+    return PROCESSED_STORE_DIR / f"{name}.json"
+
+
+def read_header(name: str) -> Optional[Dict[str, Any]]:
+    path = header_path(name)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _column_array(df: pd.DataFrame, col: str, dtype: str) -> np.ndarray:
+    if col == "Date":
+        values = df[col].to_numpy(dtype="datetime64[ns]").view("i8")
+    else:
+        values = df[col].to_numpy(dtype="float64")
+    return np.ascontiguousarray(values, dtype=dtype)
+
+
+def write_json_atomic(path: Path, payload: Dict[str, Any]) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, default=str)
+    os.replace(tmp, path)
+
+
+def write_series(
+    name: str, df: pd.DataFrame, extra: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    PROCESSED_STORE_DIR.mkdir(parents=True, exist_ok=True)
+
+    previous = read_header(name)
+    version = (previous["version"] + 1) if previous else 1
+
+    columns: Dict[str, str] = {}
+    files: Dict[str, str] = {}
+    for col in df.columns:
+        dtype = _DTYPES.get(col, _DEFAULT_DTYPE)
+        file_name = f"{name}.{version}.{col}.bin"
+        _column_array(df, col, dtype).tofile(PROCESSED_STORE_DIR / file_name)
+        columns[col] = dtype
+        files[col] = file_name
+
+    header: Dict[str, Any] = {
+        "format": STORE_FORMAT,
+        "name": name,
+        "version": version,
+        "rows": int(len(df)),
+        "columns": columns,
+        "files": files,
+    }
+    if extra:
+        header.update(extra)
+    write_json_atomic(header_path(name), header)
+
+    # Old versions are unlinked only after the new header is visible; readers
+    # that already mapped them keep their pages until they drop the mapping.
+    _remove_files(name, keep=set(files.values()))
+
+    return header
+
+
+def splice_series(
+    name: str, tail: pd.DataFrame, tail_start: int, extra: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    # A new version of an existing series with rows [tail_start, rows)
+    # replaced by `tail` (same columns); rows before tail_start are kept.
+    previous = read_header(name)
+    if previous is None:
+        raise FileNotFoundError(f"Processed store not found: {header_path(name)}")
+    if list(tail.columns) != list(previous["columns"]):
+        raise ValueError(f"Columns of {name} changed; rewrite the series instead.")
+    if not 0 <= tail_start <= previous["rows"]:
+        raise ValueError(f"tail_start {tail_start} outside 0..{previous['rows']} for {name}")
+
+    version = previous["version"] + 1
+    files: Dict[str, str] = {}
+    for col, dtype in previous["columns"].items():
+        file_name = f"{name}.{version}.{col}.bin"
+        with open(PROCESSED_STORE_DIR / file_name, "wb") as f:
+            _map_column(previous["files"][col], dtype, tail_start).tofile(f)
+            _column_array(tail, col, dtype).tofile(f)
+        files[col] = file_name
+
+    header = dict(previous)
+    header.update(
+        version=version,
+        base_version=previous["version"],
+        tail_start=int(tail_start),
+        rows=int(tail_start + len(tail)),
+        files=files,
+    )
+    if extra:
+        header.update(extra)
+    write_json_atomic(header_path(name), header)
+    _remove_files(name, keep=set(files.values()))
+    return header
+
+
+def _remove_files(name: str, keep=()) -> None:
+    for path in PROCESSED_STORE_DIR.glob(f"{name}.*.bin"):
+        if path.name not in keep:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def delete_series(name: str) -> None:
+    try:
+        header_path(name).unlink()
+    except FileNotFoundError:
+        return
+    _remove_files(name)
+
+
+def _map_column(file_name: str, dtype: str, rows: int) -> np.ndarray:
+    if rows == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(PROCESSED_STORE_DIR / file_name, dtype=dtype, mode="r", shape=(rows,))
+
+
+def open_columns(name: str, header: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+    # Raw memory-mapped columns, "Date" as int64 nanoseconds.
+    header = header if header is not None else read_header(name)
+    if header is None:
+        raise FileNotFoundError(f"Processed store not found: {header_path(name)}")
+    if header.get("format") != STORE_FORMAT:
+        raise ValueError(f"Unsupported store format for {name}: {header.get('format')}")
+
+    rows = int(header["rows"])
+    return {
+        col: _map_column(header["files"][col], dtype, rows)
+        for col, dtype in header["columns"].items()
+    }
+
+
+def open_series(name: str, header: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    data = open_columns(name, header)
+    if "Date" in data:
+        data["Date"] = data["Date"].view("datetime64[ns]")
+    # copy=False keeps each column backed by its memory map.
+    return pd.DataFrame(data, copy=False)
@@ -0,0 +1,137 @@
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Lightweight per-stage timing for the hot path. Disabled by default (or set
+# MTM_TIMING=1); while disabled, span() hands back one shared no-op context
+# manager, so instrumented code pays a function call and nothing else.
+_enabled = os.environ.get("MTM_TIMING", "0") == "1"
+
+# Upper bounds (ms) of the histogram buckets; the last one catches the rest.
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000, math.inf)
+
+
+class _Stage:
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS_MS)
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self.total += ms
+        self.min = min(self.min, ms)
+        self.max = max(self.max, ms)
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                break
+
+
+_STAGES: Dict[str, _Stage] = {}
+_LOCK = threading.Lock()
+
+
+def record(name: str, ms: float) -> None:
+    with _LOCK:
+        stage = _STAGES.get(name)
+        if stage is None:
+            stage = _STAGES[name] = _Stage()
+        stage.add(ms)
+
+
+class _Span:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        record(self.name, (time.perf_counter() - self.t0) * 1000)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str):
+    return _Span(name) if _enabled else _NOOP
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(flag: bool) -> None:
+    global _enabled
+    _enabled = bool(flag)
+
+
+def reset() -> None:
+    with _LOCK:
+        _STAGES.clear()
+
+
+def _bucket_label(bound: float) -> str:
+    return "inf" if math.isinf(bound) else f"<={bound:g}ms"
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    with _LOCK:
+        stages = {
+            name: (s.count, s.total, s.min, s.max, list(s.buckets))
+            for name, s in _STAGES.items()
+        }
+    out = {}
+    for name, (count, total, lo, hi, buckets) in sorted(stages.items()):
+        out[name] = {
+            "count": count,
+            "total_ms": total,
+            "mean_ms": total / count if count else 0.0,
+            "min_ms": lo if count else 0.0,
+            "max_ms": hi,
+            "histogram": {_bucket_label(b): n for b, n in zip(BUCKETS_MS, buckets) if n},
+        }
+    return out
+
+
+def export_json(path: Optional[str] = None) -> str:
+    payload = json.dumps({"enabled": _enabled, "stages": snapshot()}, indent=2)
+    if path is not None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(payload)
+    return payload
+
+
+def summary_rows() -> List[Dict[str, Any]]:
+    # Flat rows for display in a table.
+    return [
+        {
+            "stage": name,
+            "count": s["count"],
+            "mean_ms": round(s["mean_ms"], 3),
+            "max_ms": round(s["max_ms"], 3),
+            "total_ms": round(s["total_ms"], 1),
+        }
+        for name, s in snapshot().items()
+    ]
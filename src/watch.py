@@ -0,0 +1,113 @@
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src import build_processed
+from src.config import DATA_RAW_DIR, INDICATOR_CONFIG, WATCH_INTERVAL_SECONDS
+from src.derived import raw_indicator_ids
+
+# Polls data_raw/ and runs an incremental build_processed.main() whenever a
+# raw file changes: only indicators whose fingerprint moved are rebuilt
+# (appended when the file only grew), and the build publishes the
+# data-version signal the app workers poll. Plain stat() polling, so it
+# works the same on every OS and on network mounts. A change is built once
+# the file has looked the same for one more poll, so a file still being
+# written is not picked up half-way.
+RawStat = Optional[Tuple[int, int]]
+
+
+def raw_stats() -> Dict[str, RawStat]:
+    # (mtime_ns, size) of each raw file, None when it is missing.
+    stats: Dict[str, RawStat] = {}
+    for indicator_id in raw_indicator_ids():
+        try:
+            st = (DATA_RAW_DIR / INDICATOR_CONFIG[indicator_id]["file"]).stat()
+            stats[indicator_id] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stats[indicator_id] = None
+    return stats
+
+
+def _build(workers: int, append: bool) -> Optional[List[str]]:
+    try:
+        return build_processed.main(workers=workers, append=append)
+    except Exception as e:
+        # Keep watching; the next change (or poll after a fix) retries.
+        print(f"❌ Build failed: {e}")
+        return None
+
+
+def watch(
+    interval: float = WATCH_INTERVAL_SECONDS,
+    workers: int = 1,
+    append: bool = True,
+    max_polls: Optional[int] = None,
+) -> None:
+    # Catch up with whatever changed while nobody was watching first. Until
+    # a build succeeds `built` stays empty, so the next polls retry it.
+    built: Dict[str, RawStat] = {}
+    current = raw_stats()
+    if _build(workers, append) is not None:
+        built = current
+    pending: Optional[Dict[str, RawStat]] = None
+    polls = 0
+    while max_polls is None or polls < max_polls:
+        time.sleep(interval)
+        polls += 1
+        current = raw_stats()
+        if current == built:
+            pending = None
+            continue
+        if current != pending:
+            # Changed since the last poll: wait for it to settle.
+            pending = current
+            continue
+        if built:
+            changed = sorted(i for i in current if current[i] != built.get(i))
+            print(f"👀 Raw files changed: {', '.join(changed)}")
+        else:
+            print("🔁 Retrying the build...")
+        if _build(workers, append) is not None:
+            built = current
+        pending = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Watch data_raw/ and rebuild changed indicators as their files change."
+    )
+    parser.add_argument(
+        "--interval", type=float, default=WATCH_INTERVAL_SECONDS,
+        help=f"Seconds between polls (default {WATCH_INTERVAL_SECONDS}).",
+    )
+    parser.add_argument(
+        "-j", "--workers", type=int, default=1,
+        help="Worker processes for cleaning (0 = one per CPU, default 1 = sequential).",
+    )
+    parser.add_argument(
+        "--no-append", action="store_true",
+        help="Fully rebuild raw files that only had rows appended instead of updating their tail.",
+    )
+    args = parser.parse_args(argv)
+
+    print(f"👀 Watching {DATA_RAW_DIR} every {args.interval:g}s (Ctrl+C to stop)...")
+    try:
+        watch(
+            args.interval,
+            workers=args.workers if args.workers > 0 else (os.cpu_count() or 1),
+            append=not args.no_append,
+        )
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
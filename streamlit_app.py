@@ -6,12 +6,22 @@ sys.path.insert(0, str(ROOT_DIR))
 
 import os
 import streamlit as st
+import numpy as np
 import pandas as pd
-import google.generativeai as genai
 
-from src.metadata import build_metadata
-from src.config import INDICATOR_CONFIG, METADATA_CSV_PATH
-from src.slicer import slice_indicator
+from src.ai import InterpretationCache, make_backend, stream_interpretation
+from src.analytics import analytics_columns
+from src.config import (
+    AI_TIMEOUT_SECONDS,
+    DATA_VERSION_POLL_SECONDS,
+    INDICATOR_CONFIG,
+    METADATA_CSV_PATH,
+    RESOLUTION_LABELS,
+)
+from src.data_signal import check_data_version, read_data_version
+from src.slicer import clear_series_cache, slice_indicator
+from src.snapshot import QUICK_SLICE_OPTIONS, QUICK_WINDOWS, quick_slice
+from src import timing
 
 
 def fmt(n):
@@ -21,11 +31,61 @@ def fmt(n):
         return n
 
 
-GEMINI_API_KEY = st.secrets.get("GEMINI_API_KEY")
-GEMINI_AVAILABLE = bool(GEMINI_API_KEY)
+def change_colors(col: pd.Series) -> np.ndarray:
+    # Column-wise styler: one vectorized pass per change column.
+    return np.select(
+        [col > 0, col < 0],
+        ["color: #0066ff; font-weight:600", "color: #e11d48; font-weight:600"],
+        default="",
+    )
+
+
+def episode_table(table: pd.DataFrame, title: str, extreme_label: str) -> None:
+    st.markdown(f"**{title}**")
+    if table.empty:
+        st.caption("None in this window.")
+        return
+    shown = table.rename(columns={"Extreme": extreme_label, "Extreme Date": f"{extreme_label} Date"})
+    for col in ("Start", "End", f"{extreme_label} Date"):
+        shown[col] = shown[col].dt.strftime("%Y-%m-%d")
+    st.dataframe(
+        shown.style.format({extreme_label: "{:,.2f}", "Mean": "{:,.2f}"}),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+def corr_colors(col: pd.Series) -> list:
+    # Blue for positive, red for negative, stronger shade for larger |corr|.
+    vals = col.to_numpy(dtype="float64")
+    alpha = np.nan_to_num(np.abs(vals)) * 0.6
+    rgb = np.where(vals >= 0, "0, 102, 255", "225, 29, 72")
+    return [f"background-color: rgba({c}, {a:.2f})" for c, a in zip(rgb, alpha)]
+
+
+try:
+    GEMINI_API_KEY = st.secrets.get("GEMINI_API_KEY")
+except Exception:
+    # No secrets.toml at all: run without AI.
+    GEMINI_API_KEY = None
+# "gemini" (default) or "stub" for a local deterministic backend.
+AI_BACKEND = os.environ.get("MTM_AI_BACKEND", "gemini")
 
-if GEMINI_AVAILABLE:
-    genai.configure(api_key=GEMINI_API_KEY)
+
+# Process-wide resources, created once and shared by every session and
+# rerun. Backends import their client library on first use.
+@st.cache_resource
+def get_ai_backend(name: str, api_key):
+    return make_backend(name, api_key)
+
+
+ai_backend = get_ai_backend(AI_BACKEND, GEMINI_API_KEY)
+GEMINI_AVAILABLE = ai_backend is not None
+
+
+@st.cache_resource
+def get_ai_cache() -> InterpretationCache:
+    return InterpretationCache()
 
 
 st.set_page_config(
@@ -97,9 +157,35 @@ st.title("🌐 Macro Time Machine")
 st.caption("Analyze decades of macro data — with AI assistance.")
 
 
+@st.cache_resource(max_entries=2)
+def load_metadata(version: int) -> pd.DataFrame:
+    # `version` is the CSV's mtime, so a rebuild is picked up on the next rerun.
+    return pd.read_csv(METADATA_CSV_PATH)
+
+
+# A new data version published by build_processed.py (or watch.py): the
+# first rerun in this process to see it drops the cached series and
+# metadata, and every session re-runs its last query below.
+data_version, data_moved = check_data_version()
+if data_moved:
+    clear_series_cache()
+    load_metadata.clear()
+
+
+@st.fragment(run_every=DATA_VERSION_POLL_SECONDS)
+def poll_data_version(seen: int) -> None:
+    # Reruns the page once new data is published, without user input.
+    if int(read_data_version().get("version") or 0) != seen:
+        st.rerun()
+
+
+poll_data_version(data_version)
+
 if not METADATA_CSV_PATH.exists():
+    from src.metadata import build_metadata
+
     build_metadata()
-meta_df = pd.read_csv(METADATA_CSV_PATH)
+meta_df = load_metadata(METADATA_CSV_PATH.stat().st_mtime_ns)
 
 st.sidebar.header("🔍 Select Indicator")
 
@@ -113,7 +199,7 @@ indicator_id = filtered_meta.loc[
 ].values[0]
 
 st.sidebar.subheader("⏱️ Time Range")
-time_ranges = ["1Y", "3Y", "5Y", "10Y", "20Y", "30Y"]
+time_ranges = list(QUICK_WINDOWS)
 selected_window = st.sidebar.radio("Quick Select:", time_ranges)
 
 st.sidebar.write("Or custom period:")
@@ -123,6 +209,23 @@ end_year = col2.text_input("End (YYYY-MM)")
 
 load_btn = st.sidebar.button("Load Data 🔄")
 
+# Per-stage timings, only when the app runs with MTM_TIMING=1.
+if timing.enabled():
+    with st.sidebar.expander("⏱ Diagnostics"):
+        rows = timing.summary_rows()
+        if rows:
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No timings recorded yet.")
+        st.download_button(
+            "Export timings (JSON)",
+            timing.export_json(),
+            file_name="mtm_timings.json",
+            mime="application/json",
+        )
+        if st.button("Reset timings"):
+            timing.reset()
+
 
 def build_ai_prompt(indicator_id, indicator_display, summary, df_slice, start_str, end_str):
     s = summary
@@ -156,7 +259,7 @@ def build_ai_prompt(indicator_id, indicator_display, summary, df_slice, start_st
     for _, row in sample.iterrows():
         line = f"{row['Date']},{row['Value']}"
         if "Change %" in df_slice.columns:
-            line += f",{row['Change %']}"
+            line += f",{row['Change %']:.2f}%"
         sample_text_lines.append(line)
 
     sample_block = "\n".join(sample_text_lines)
@@ -202,33 +305,59 @@ Keep it:
     return prompt
 
 
-def call_gemini(prompt: str) -> str:
+def stream_gemini(prompt: str):
+    # Yields the interpretation text accumulated so far as tokens arrive.
+    # Identical (model, prompt) pairs are answered from the on-disk cache, and
+    # a prompt already in flight for another session is joined, not re-sent.
     if not GEMINI_AVAILABLE:
-        return "Gemini API key not configured. Add GEMINI_API_KEY in your .env to enable AI interpretation."
+        yield "Gemini API key not configured. Add GEMINI_API_KEY in your .env to enable AI interpretation."
+        return
 
+    text = ""
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash-lite")
-        resp = model.generate_content(prompt)
-        txt = resp.text or ""
-        return txt.strip()
+        for text in stream_interpretation(prompt, ai_backend, get_ai_cache()):
+            yield text
+    except TimeoutError:
+        note = f"Gemini did not finish within {AI_TIMEOUT_SECONDS}s — try again shortly."
+        yield f"{text}<br><br><i>{note}</i>" if text else note
     except Exception as e:
-        return f"Error from Gemini: {e}"
+        yield f"Error from Gemini: {e}"
+
+
+def ai_card(text: str) -> str:
+    return f"<div class='ai-card'><b>📘 AI Interpretation — Data Grounded Analysis</b><br><br>{text}</div>"
+
+
+def run_query(query):
+    query_id, start, end, window = query
+    # The slicer picks the finest resolution (daily/weekly/monthly/...)
+    # that keeps the table within SLICE_ROW_BUDGET rows.
+    if start and end:
+        return slice_indicator(query_id, start=start, end=end, **QUICK_SLICE_OPTIONS)
+    # Quick windows come precomputed from the build's snapshot.
+    return quick_slice(query_id, window)
 
 
 result = None
 
 if load_btn:
     try:
-        if start_year and end_year:
-            result = slice_indicator(indicator_id, start=start_year, end=end_year)
-        else:
-            result = slice_indicator(indicator_id, window=selected_window)
-
-
+        query = (indicator_id, start_year, end_year, selected_window)
+        result = run_query(query)
         st.session_state["latest_result"] = result
+        st.session_state["latest_query"] = query
+        st.session_state["result_version"] = data_version
         st.session_state["ai_text"] = ""
     except Exception as e:
         st.error(f"⚠ Error: {e}")
+elif "latest_query" in st.session_state and st.session_state["result_version"] != data_version:
+    # Data changed since this result was loaded: refresh it in place.
+    try:
+        st.session_state["latest_result"] = run_query(st.session_state["latest_query"])
+        st.session_state["ai_text"] = ""
+    except Exception as e:
+        st.error(f"⚠ Error: {e}")
+    st.session_state["result_version"] = data_version
 
 
 if "latest_result" in st.session_state and result is None:
@@ -246,8 +375,12 @@ if result is not None:
     st.write(f"**Date Range: {date_start} → {date_end}**")
 
     s = result.summary
+    resolution = result.resolution
+    resolution_label = RESOLUTION_LABELS.get(resolution, "Monthly")
     df_display = result.data.copy()
-    df_display["Date"] = df_display["Date"].dt.strftime("%Y-%m")
+    df_display["Date"] = df_display["Date"].dt.strftime(
+        "%Y-%m-%d" if resolution in ("D", "W") else "%Y-%m"
+    )
 
     special_case = indicator_id in ["us_yield_curve_10y_2y", "vix"]
 
@@ -276,66 +409,141 @@ if result is not None:
         )
 
     elif indicator_id == "us_yield_curve_10y_2y":
-        spread_min = result.data["Value"].min()
-        inverted_months = int((result.data["Value"] < 0).sum())
+        from src.episodes import load_episodes, window_span
+
+        episodes = load_episodes(indicator_id)
+        window = window_span(result.start_date, result.end_date, resolution)
+        inversions = episodes.table("inversion", *window)
 
         st.markdown("#### Yield Curve Structure")
         for label, val in [
             ("Start Spread", fmt(s["start_value"]) + "%"),
             ("End Spread", fmt(s["end_value"]) + "%"),
-            ("Most Inverted", fmt(spread_min) + "%"),
-            ("Months Inverted", f"{inverted_months} months"),
+            ("Most Inverted", fmt(s["min_value"]) + "%"),
+            ("Days Inverted", f"{episodes.days_in_episodes('inversion', *window):,} days"),
+            ("Inversion Episodes", f"{len(inversions)}"),
         ]:
             st.markdown(
                 f"<div class='metric-chip'><b>{label}</b><br>{val}</div>",
                 unsafe_allow_html=True,
             )
+        episode_table(inversions, "Inversion episodes overlapping this window", "Depth")
 
     elif indicator_id == "vix":
+        from src.episodes import load_episodes, window_span
+
+        episodes = load_episodes(indicator_id)
+        window = window_span(result.start_date, result.end_date, resolution)
+        spikes = episodes.table("fear_spike", *window)
+        elevated = episodes.table("elevated", *window)
         vix_values = result.data["Value"]
-        vix_max = vix_values.max()
-        max_date = result.data.loc[vix_values.idxmax(), "Date"].strftime("%Y-%m")
-        vix_avg = vix_values.mean()
-        signal = "Fear Spike" if vix_max > 40 else "Normal"
+        max_date = df_display.loc[vix_values.idxmax(), "Date"]
+        if len(spikes):
+            signal = f"Fear Spike ({len(spikes)} episode{'s' if len(spikes) > 1 else ''})"
+        elif len(elevated):
+            signal = "Elevated"
+        else:
+            signal = "Normal"
 
         st.markdown("#### Volatility Profile (VIX)")
         for label, val in [
-            ("Max Spike", fmt(vix_max)),
-            ("Spike Month", max_date),
-            ("Avg VIX", fmt(vix_avg)),
+            ("Max Spike", fmt(s["max_value"])),
+            ("Spike Date", max_date),
+            ("Avg VIX", fmt(s["avg_value"])),
             ("Signal", signal),
         ]:
             st.markdown(
                 f"<div class='metric-chip'><b>{label}</b><br>{val}</div>",
                 unsafe_allow_html=True,
             )
+        levels = {name: rule["level"] for name, rule in episodes.rules.items()}
+        episode_table(spikes, f"Fear spikes (VIX > {levels['fear_spike']:g})", "Peak")
+        episode_table(elevated, f"Elevated volatility (VIX > {levels['elevated']:g})", "Peak")
+
+    # ===== ROLLING ANALYTICS ===== #
+    # Precomputed at build time; the chips show the values at the window end.
+    last_row = result.data.iloc[-1]
+    vol_col, z_col, dd_col, _, ma_col = analytics_columns()[:5]
+    st.markdown("#### Rolling Analytics (end of window)")
+    for col, label, val, suffix in zip(
+        st.columns(4),
+        [f"Volatility ({vol_col[4:]})", f"Z-score ({z_col[2:]})", "Drawdown", f"vs {ma_col}"],
+        [last_row[vol_col], last_row[z_col], last_row[dd_col], last_row["Value"] - last_row[ma_col]],
+        ["%", "", "%", ""],
+    ):
+        text = "–" if pd.isna(val) else f"{fmt(val)}{suffix}"
+        col.markdown(
+            f"<div class='metric-chip'><b>{label}</b><br>{text}</div>",
+            unsafe_allow_html=True,
+        )
 
     st.markdown("---")
 
     # ===== TABLE ===== #
-    st.subheader("📅 Monthly Data")
-
-    df_display["Value"] = df_display["Value"].apply(fmt)
-
-    # For special cases, drop Change % column
-    if special_case and "Change %" in df_display.columns:
-        df_display = df_display.drop(columns=["Change %"])
-
-    def highlight_change(val):
-        try:
-            v = float(str(val).replace(",", "").replace("%", ""))
-            if v > 0:
-                return "color: #0066ff; font-weight:600"
-            if v < 0:
-                return "color: #e11d48; font-weight:600"
-        except Exception:
-            return ""
-
-    if "Change %" in df_display.columns:
-        styled = df_display.style.map(highlight_change, subset=["Change %"])
+    st.subheader(f"📅 {resolution_label} Data")
+
+    change_cols = [c for c in ("Change %", "YoY %") if c in df_display.columns]
+
+    # For special cases, drop the change columns
+    if special_case and change_cols:
+        df_display = df_display.drop(columns=change_cols)
+        change_cols = []
+
+    # The data stays numeric; formatting happens in the styler at render time.
+    with timing.span("app.style_table"):
+        formats = {c: "{:,.2f}" for c in df_display.columns if c != "Date"}
+        formats.update({c: "{:.2f}%" for c in change_cols + ["Drawdown %"] if c in df_display.columns})
+        styled = df_display.style.format(formats, na_rep="–")
+        if change_cols:
+            styled = styled.apply(change_colors, subset=change_cols, axis=0)
         st.dataframe(styled, use_container_width=True)
+
+    # ===== CORRELATIONS ===== #
+    st.markdown("---")
+    st.subheader("🔗 Cross-Indicator Correlation")
+    from src.correlation import correlation_matrix, max_lag_for
+
+    # Correlate every indicator over the months of the window being viewed.
+    corr_start, corr_end = f"{result.start_date:%Y-%m}", f"{result.end_date:%Y-%m}"
+    lag_limit = min(max_lag_for(corr_start, corr_end), 24)
+    if lag_limit > 0:
+        max_lag = st.slider("Max lead/lag (months)", 0, lag_limit, min(12, lag_limit))
+    else:
+        max_lag = 0
+        st.caption("This window is too short for lagged correlations; showing lag 0 only.")
+
+    try:
+        corr = correlation_matrix(start=corr_start, end=corr_end, max_lag=max_lag)
+    except (ValueError, FileNotFoundError) as e:
+        # FileNotFoundError: a processed file is missing, e.g. mid-rebuild.
+        st.warning(f"⚠ Correlations unavailable: {e}")
     else:
-        st.dataframe(df_display, use_container_width=True)
+        st.caption(
+            f"Month-over-month changes, {corr.start_date:%Y-%m} → {corr.end_date:%Y-%m} "
+            f"({corr.observations} monthly observations). "
+            "At lag k, rows are compared with columns k months later."
+        )
+        if corr.dropped:
+            names = ", ".join(INDICATOR_CONFIG[i]["display"] for i in corr.dropped)
+            st.caption(f"Not enough data in this window: {names}.")
+        lag = (
+            st.select_slider("Lag shown in matrix (months)", options=corr.lags)
+            if len(corr.lags) > 1
+            else 0
+        )
+        st.dataframe(
+            corr.matrix(lag).style.format("{:.2f}", na_rep="–").apply(corr_colors, axis=0),
+            use_container_width=True,
+        )
+        if indicator_id in corr.indicator_ids:
+            st.markdown(f"**Strongest lead/lag vs {indicator_display}** (positive lag: it leads)")
+            st.dataframe(
+                corr.lead_lag(indicator_id).style.format(
+                    {"corr": "{:.2f}", "corr_lag0": "{:.2f}"}, na_rep="–"
+                ),
+                use_container_width=True,
+                hide_index=True,
+            )
 
     # ===== AI INTERPRETATION ===== #
     st.markdown("---")
@@ -344,25 +552,27 @@ if result is not None:
     if not GEMINI_AVAILABLE:
         st.info("Add GEMINI_API_KEY to your .env file to enable AI interpretation.")
     else:
+        card = st.empty()
         if st.button("🔍 Interpret this period with AI"):
             with st.spinner("Analyzing this macro slice with Gemini..."):
-                prompt = build_ai_prompt(
-                    indicator_id,
-                    indicator_display,
-                    s,
-                    result.data.copy(),  # use numeric data
-                    date_start,
-                    date_end,
-                )
-                ai_text = call_gemini(prompt)
-                st.session_state["ai_text"] = ai_text
+                with timing.span("app.build_ai_prompt"):
+                    prompt = build_ai_prompt(
+                        indicator_id,
+                        indicator_display,
+                        s,
+                        result.data.copy(),  # use numeric data
+                        date_start,
+                        date_end,
+                    )
+                ai_text = ""
+                with timing.span("app.call_gemini"):
+                    for ai_text in stream_gemini(prompt):
+                        card.markdown(ai_card(ai_text + " ▌"), unsafe_allow_html=True)
+                st.session_state["ai_text"] = ai_text.strip()
 
         ai_text = st.session_state.get("ai_text", "")
         if ai_text:
-            st.markdown(
-                f"<div class='ai-card'><b>📘 AI Interpretation — Data Grounded Analysis</b><br><br>{ai_text}</div>",
-                unsafe_allow_html=True,
-            )
+            card.markdown(ai_card(ai_text), unsafe_allow_html=True)
 
 else:
     st.info("⬅ Select an indicator and click **Load Data**")
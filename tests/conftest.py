@@ -0,0 +1,27 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+# Set before src.config is imported, so nothing a test runs writes AI
+# answers into the checkout's .cache/ai.
+os.environ["MTM_AI_CACHE_DIR"] = tempfile.mkdtemp(prefix="mtm-ai-cache-")
+
+
+@pytest.fixture
+def scratch_store(tmp_path, monkeypatch):
+    # Series written with store.write_series land in an empty store in
+    # tmp_path, and the slicer reads only from there.
+    from src import slicer, store
+
+    monkeypatch.setattr(store, "PROCESSED_STORE_DIR", tmp_path / "store")
+    monkeypatch.setattr(slicer, "DATA_PROCESSED_DIR", tmp_path)
+    slicer.clear_series_cache()
+    yield tmp_path
+    slicer.clear_series_cache()
@@ -0,0 +1,108 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from src.ai import InterpretationCache, StubBackend, cache_key, interpret, make_backend
+from src.config import AI_CACHE_DIR, AI_CACHE_MAX_ENTRIES, BASE_DIR
+
+
+@pytest.fixture
+def cache(tmp_path) -> InterpretationCache:
+    return InterpretationCache(directory=tmp_path / "ai", max_entries=3, ttl_seconds=3600)
+
+
+def _set_mtime(cache: InterpretationCache, model: str, prompt: str, mtime: float) -> None:
+    os.utime(cache.directory / f"{cache_key(model, prompt)}.json", (mtime, mtime))
+
+
+def test_cache_dir_is_outside_the_checkout():
+    assert Path(AI_CACHE_DIR) != BASE_DIR / ".cache" / "ai"
+    assert InterpretationCache().directory == Path(AI_CACHE_DIR)
+
+
+def test_miss_then_hit(cache):
+    assert cache.get("m", "prompt") is None
+    cache.put("m", "prompt", "answer")
+    assert cache.get("m", "prompt") == "answer"
+    # The model is part of the key.
+    assert cache.get("other", "prompt") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 0, "entries": 1}
+
+
+def test_expired_entries_are_misses_and_removed(cache):
+    cache.put("m", "prompt", "answer")
+    path = cache.directory / f"{cache_key('m', 'prompt')}.json"
+    entry = json.loads(path.read_text())
+    entry["created"] -= cache.ttl_seconds + 1
+    path.write_text(json.dumps(entry))
+
+    assert cache.get("m", "prompt") is None
+    assert not path.exists()
+    assert cache.stats()["misses"] == 1
+
+
+def test_unreadable_entries_are_misses(cache):
+    cache.directory.mkdir(parents=True)
+    (cache.directory / f"{cache_key('m', 'prompt')}.json").write_text("{not json")
+    assert cache.get("m", "prompt") is None
+
+
+def test_lru_eviction_keeps_recently_read_entries(cache):
+    for i, prompt in enumerate(["a", "b", "c"]):
+        cache.put("m", prompt, prompt.upper())
+        _set_mtime(cache, "m", prompt, 1_000_000 + i)
+    # Reading "a" makes it the most recently used, so "b" is the oldest.
+    assert cache.get("m", "a") == "A"
+    cache.put("m", "d", "D")
+
+    assert cache.get("m", "b") is None
+    assert [cache.get("m", p) for p in "acd"] == ["A", "C", "D"]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 3
+
+
+def test_default_cache_holds_at_most_the_configured_entries():
+    cache = InterpretationCache()
+    cache.clear()
+    assert cache.max_entries == AI_CACHE_MAX_ENTRIES
+    for i in range(AI_CACHE_MAX_ENTRIES + 5):
+        cache.put("m", f"prompt {i}", f"answer {i}")
+    assert cache.stats()["entries"] == AI_CACHE_MAX_ENTRIES
+    assert cache.stats()["evictions"] == 5
+    cache.clear()
+
+
+def test_stub_backend_is_deterministic_and_streams_the_same_text():
+    backend = StubBackend()
+    first = backend.generate("prompt one")
+    assert first == StubBackend().generate("prompt one")
+    assert first != backend.generate("prompt two")
+    assert "".join(backend.stream("prompt one")) == first
+    assert backend.calls == 3
+
+
+def test_make_backend():
+    assert isinstance(make_backend("stub"), StubBackend)
+    assert make_backend("gemini", None) is None
+    with pytest.raises(ValueError):
+        make_backend("nope")
+
+
+def test_interpret_calls_the_backend_once_per_prompt(cache):
+    backend = StubBackend()
+    text = interpret("prompt", backend, cache)
+    assert interpret("prompt", backend, cache) == text
+    assert backend.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_backend_errors_are_not_cached(cache):
+    class Failing(StubBackend):
+        def stream(self, prompt):
+            raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        interpret("prompt", Failing(), cache)
+    assert cache.stats()["entries"] == 0
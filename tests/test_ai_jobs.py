@@ -0,0 +1,150 @@
+import threading
+import time
+
+import pytest
+
+from src import ai
+from src.ai import InterpretationCache, StubBackend, start_interpretation, stream_interpretation
+
+
+@pytest.fixture
+def cache(tmp_path) -> InterpretationCache:
+    return InterpretationCache(directory=tmp_path / "ai")
+
+
+def _start_together(n: int, prompt: str, backend, cache=None):
+    barrier = threading.Barrier(n)
+    jobs = [None] * n
+
+    def run(i: int) -> None:
+        barrier.wait()
+        jobs[i] = start_interpretation(prompt, backend, cache)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return jobs
+
+
+def test_concurrent_identical_prompts_share_one_upstream_call(cache):
+    backend = StubBackend(latency=0.3)
+    jobs = _start_together(8, "same prompt", backend, cache)
+
+    assert len({id(job) for job in jobs}) == 1
+    answers = {job.result(timeout=5) for job in jobs}
+    assert answers == {backend._answer("same prompt")}
+    assert backend.calls == 1
+
+    # Once finished, the answer comes from the cache.
+    assert start_interpretation("same prompt", backend, cache).result(timeout=5) in answers
+    assert backend.calls == 1
+
+
+def test_different_prompts_are_not_coalesced():
+    backend = StubBackend(latency=0.1)
+    first = start_interpretation("prompt a", backend)
+    second = start_interpretation("prompt b", backend)
+    assert first is not second
+    assert first.result(timeout=5) != second.result(timeout=5)
+    assert backend.calls == 2
+
+
+def test_every_consumer_sees_every_chunk():
+    backend = StubBackend(token_delay=0.01)
+    job = start_interpretation("chunked prompt", backend)
+    late = list(job.iter_chunks(timeout=5))
+    assert "".join(late) == backend._answer("chunked prompt")
+    assert list(job.iter_chunks(timeout=5)) == late
+
+
+def test_stream_interpretation_honours_ai_timeout_seconds(monkeypatch, cache):
+    monkeypatch.setattr(ai, "AI_TIMEOUT_SECONDS", 0.2)
+    backend = StubBackend(token_delay=0.05)  # about a second for the whole answer
+    first = start_interpretation("slow prompt", backend, cache)
+    partial = []
+    t0 = time.monotonic()
+    with pytest.raises(TimeoutError):
+        for text in stream_interpretation("slow prompt", backend, cache):
+            partial.append(text)
+    elapsed = time.monotonic() - t0
+
+    assert 0.2 <= elapsed < 0.6
+    assert partial and partial[-1] != backend._answer("slow prompt")
+    # The timed-out job is no longer shared, but the upstream call keeps
+    # running and its answer is still cached.
+    assert first.key not in ai._INFLIGHT
+    assert first.result(timeout=5) == backend._answer("slow prompt")
+    assert cache.get(backend.model, "slow prompt") == backend._answer("slow prompt")
+    assert backend.calls == 1
+
+
+def test_stream_interpretation_finishes_within_the_timeout(monkeypatch):
+    monkeypatch.setattr(ai, "AI_TIMEOUT_SECONDS", 5)
+    backend = StubBackend()
+    texts = list(stream_interpretation("fast prompt", backend))
+    assert texts[-1] == backend._answer("fast prompt")
+    # Each yield is the answer so far.
+    assert all(b.startswith(a) for a, b in zip(texts, texts[1:]))
+
+
+def test_upstream_errors_reach_every_consumer():
+    class Failing(StubBackend):
+        def stream(self, prompt):
+            time.sleep(0.1)
+            raise RuntimeError("upstream down")
+
+    jobs = _start_together(4, "failing prompt", Failing())
+    assert len({id(job) for job in jobs}) == 1
+    for job in jobs:
+        with pytest.raises(RuntimeError, match="upstream down"):
+            job.result(timeout=5)
+
+
+class _Hung(StubBackend):
+    # An upstream that never answers until released.
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+
+    def stream(self, prompt):
+        self.calls += 1
+        self.release.wait()
+        yield "late answer"
+
+
+@pytest.fixture
+def hung():
+    backend = _Hung()
+    yield backend
+    backend.release.set()
+
+
+def test_retry_after_timeout_starts_a_fresh_upstream_call(monkeypatch, hung):
+    monkeypatch.setattr(ai, "AI_TIMEOUT_SECONDS", 0.1)
+    for attempt in range(1, 4):
+        with pytest.raises(TimeoutError):
+            list(stream_interpretation("hung prompt", hung))
+        assert hung.calls == attempt
+        assert not ai._INFLIGHT
+    # Hung calls never keep the interpreter alive.
+    workers = [t for t in threading.enumerate() if t.name == "ai"]
+    assert len(workers) >= 3 and all(t.daemon for t in workers)
+
+
+def test_busy_workers_fail_new_requests_instead_of_queueing(monkeypatch, hung):
+    monkeypatch.setattr(ai, "AI_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(ai, "_SLOTS", threading.BoundedSemaphore(1))
+    stuck = start_interpretation("hung prompt", hung)
+    t0 = time.monotonic()
+    with pytest.raises(RuntimeError, match="Too many AI requests"):
+        start_interpretation("other prompt", StubBackend()).result(timeout=5)
+    assert time.monotonic() - t0 < 1
+    assert not stuck.done
+
+    hung.release.set()
+    assert stuck.result(timeout=5) == "late answer"
+    assert StubBackend().generate("other prompt") == start_interpretation(
+        "other prompt", StubBackend()
+    ).result(timeout=5)
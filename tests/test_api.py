@@ -0,0 +1,132 @@
+import gzip
+import http.client
+import io
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import api, store
+from src.config import API_GZIP_MIN_BYTES
+from src.slicer import slice_indicator
+
+DATES = pd.date_range("1990-01-31", "2019-12-31", freq="M")
+
+
+def _write_vix(offset: float = 0.0) -> None:
+    values = 20.0 + 5.0 * np.sin(np.arange(len(DATES)) / 7.0) + offset
+    store.write_series("vix", pd.DataFrame({"Date": DATES, "Value": values}))
+
+
+@pytest.fixture
+def server(scratch_store, monkeypatch):
+    _write_vix()
+    meta_path = scratch_store / "indicators_meta.csv"
+    pd.DataFrame({"indicator_id": ["vix"], "rows": [len(DATES)]}).to_csv(meta_path, index=False)
+    monkeypatch.setattr(api, "METADATA_CSV_PATH", meta_path)
+    monkeypatch.setattr(api, "_METADATA", {})
+
+    httpd = api.make_server(port=0, workers=2, quiet=True)
+    thread = threading.Thread(
+        target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(httpd, path: str, **headers):
+    conn = http.client.HTTPConnection(*httpd.server_address, timeout=10)
+    try:
+        conn.request("GET", path, headers=headers)
+        resp = conn.getresponse()
+        return resp.status, dict(resp.getheaders()), resp.read()
+    finally:
+        conn.close()
+
+
+def test_slice_matches_the_slicer(server):
+    status, headers, body = get(server, "/indicators/vix/slice?window=10Y&yoy=1")
+    assert status == 200
+    assert headers["Content-Type"].startswith("application/json")
+    payload = json.loads(body)
+    expected = slice_indicator("vix", window="10Y", yoy=True)
+    assert payload["start_date"] == f"{expected.start_date:%Y-%m-%d}"
+    assert payload["columns"] == list(expected.data.columns)
+    assert len(payload["rows"]) == len(expected.data)
+    assert payload["rows"][-1][1] == pytest.approx(expected.data["Value"].iloc[-1])
+    assert payload["summary"]["end_value"] == pytest.approx(expected.summary["end_value"])
+
+    status, headers, body = get(server, "/indicators/vix/slice?window=10Y&format=csv")
+    assert status == 200 and headers["Content-Type"].startswith("text/csv")
+    assert len(pd.read_csv(io.BytesIO(body))) == len(expected.data)
+
+
+def test_etag_answers_304_until_the_indicator_is_rebuilt(server):
+    path = "/indicators/vix/summary?start=2000-01&end=2009-12"
+    status, headers, _ = get(server, path)
+    etag = headers["ETag"]
+    assert status == 200 and etag
+
+    status, headers, body = get(server, path, **{"If-None-Match": etag})
+    assert (status, body) == (304, b"")
+    assert headers["ETag"] == etag
+    # Other parameters are other resources.
+    assert get(server, path.replace("2009", "2010"))[1]["ETag"] != etag
+
+    _write_vix(offset=1.0)
+    status, headers, _ = get(server, path, **{"If-None-Match": etag})
+    assert status == 200
+    assert headers["ETag"] != etag
+
+
+def test_metadata_etag_follows_the_csv(server):
+    status, headers, body = get(server, "/metadata")
+    assert status == 200
+    assert json.loads(body) == [{"indicator_id": "vix", "rows": len(DATES)}]
+    etag = headers["ETag"]
+    assert get(server, "/metadata", **{"If-None-Match": etag})[0] == 304
+
+    pd.DataFrame({"indicator_id": ["vix"], "rows": [1]}).to_csv(api.METADATA_CSV_PATH, index=False)
+    status, headers, body = get(server, "/metadata", **{"If-None-Match": etag})
+    assert status == 200 and json.loads(body)[0]["rows"] == 1
+
+
+def test_large_responses_are_gzipped_for_clients_that_accept_it(server):
+    path = "/indicators/vix/slice?window=30Y"
+    _, plain_headers, plain = get(server, path)
+    assert len(plain) >= API_GZIP_MIN_BYTES
+    assert "Content-Encoding" not in plain_headers
+
+    _, headers, body = get(server, path, **{"Accept-Encoding": "gzip, deflate"})
+    assert headers["Content-Encoding"] == "gzip"
+    assert int(headers["Content-Length"]) == len(body) < len(plain)
+    assert gzip.decompress(body) == plain
+    assert "Accept-Encoding" in headers["Vary"]
+
+    # Small bodies are sent as they are.
+    _, headers, _ = get(server, "/health", **{"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in headers
+
+
+@pytest.mark.parametrize(
+    "path, status, message",
+    [
+        ("/indicators/vix/slice?window=7Y", 400, "Unknown window"),
+        ("/indicators/vix/slice?max_rows=lots", 400, "max_rows"),
+        ("/indicators/vix/slice?window=5Y&start=2000-01", 400, "not both"),
+        ("/indicators/nope/slice", 404, "Unknown indicator"),
+        ("/indicators/dxy/slice", 404, ""),
+        ("/indicators/vix/chart", 404, "Unknown path"),
+        ("/nowhere", 404, "Unknown path"),
+    ],
+)
+def test_errors(server, path, status, message):
+    got, headers, body = get(server, path)
+    assert got == status
+    assert headers["Content-Type"].startswith("application/json")
+    assert message in json.loads(body)["error"]
+    assert "ETag" not in headers
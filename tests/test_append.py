@@ -0,0 +1,171 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.series_index import _BLOCK, SeriesIndex
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+APPENDED_ROWS = 40
+# Rolling analytics are recomputed from a shorter context, so they only
+# match a full rebuild up to floating-point rounding.
+ANALYTICS_RTOL = 1e-7
+
+
+def _build(raw_dir: Path, processed_dir: Path, *args: str) -> str:
+    # A separate interpreter, since config reads the data directories from
+    # the environment at import time.
+    env = dict(
+        os.environ, MTM_DATA_RAW_DIR=str(raw_dir), MTM_DATA_PROCESSED_DIR=str(processed_dir)
+    )
+    out = subprocess.run(
+        [sys.executable, str(ROOT_DIR / "src" / "build_processed.py"), *args],
+        env=env, capture_output=True, text=True,
+    )
+    assert out.returncode == 0, out.stderr
+    return out.stdout
+
+
+def _columns(store_dir: Path, header: dict) -> dict:
+    return {
+        col: np.fromfile(store_dir / header["files"][col], dtype=dtype)[: header["rows"]]
+        for col, dtype in header["columns"].items()
+    }
+
+
+def _without_timestamps(stats: dict) -> dict:
+    return {k: v for k, v in stats.items() if k != "last_updated"}
+
+
+@pytest.fixture(scope="module")
+def builds(tmp_path_factory):
+    # The same raw files built twice: once in full, and once from copies
+    # missing their last rows that are then appended to and built again.
+    tmp = tmp_path_factory.mktemp("append")
+    full_raw, raw = tmp / "raw_full", tmp / "raw"
+    shutil.copytree(ROOT_DIR / "data_raw", full_raw)
+    raw.mkdir()
+    for path in full_raw.glob("*.csv"):
+        lines = path.read_bytes().splitlines(keepends=True)
+        (raw / path.name).write_bytes(b"".join(lines[: max(2, len(lines) - APPENDED_ROWS)]))
+
+    _build(raw, tmp / "appended")
+    for path in full_raw.glob("*.csv"):
+        shutil.copy(path, raw / path.name)
+    log = _build(raw, tmp / "appended")
+    _build(full_raw, tmp / "full")
+    return tmp / "appended", tmp / "full", log
+
+
+def test_every_indicator_was_appended(builds):
+    _, _, log = builds
+    raw_count = len(list((ROOT_DIR / "data_raw").glob("*.csv")))
+    assert log.count("appended)") == raw_count
+
+
+def test_store_levels_match_full_rebuild(builds):
+    appended, full, _ = builds
+    headers = sorted((full / "store").glob("*.json"))
+    assert headers
+    names = sorted(p.name for p in (appended / "store").glob("*.json"))
+    assert names == [p.name for p in headers]
+    for path in headers:
+        expected = json.loads(path.read_text())
+        actual = json.loads((appended / "store" / path.name).read_text())
+        assert actual["rows"] == expected["rows"], path.name
+        # Only the monthly level carries the pyramid listing and the stats.
+        assert actual.get("resolutions") == expected.get("resolutions"), path.name
+        if "stats" in expected:
+            assert _without_timestamps(actual["stats"]) == _without_timestamps(expected["stats"])
+        assert actual["base_version"] == 1 and "tail_start" in actual
+
+        got = _columns(appended / "store", actual)
+        want = _columns(full / "store", expected)
+        assert list(got) == list(want)
+        for col in ("Date", "Value"):
+            np.testing.assert_array_equal(got[col], want[col], err_msg=f"{path.name} {col}")
+        for col in set(want) - {"Date", "Value"}:
+            np.testing.assert_allclose(
+                got[col], want[col], rtol=ANALYTICS_RTOL, atol=1e-12,
+                equal_nan=True, err_msg=f"{path.name} {col}",
+            )
+
+
+def test_only_the_new_version_files_remain(builds):
+    appended, _, _ = builds
+    for path in (appended / "store").glob("*.json"):
+        header = json.loads(path.read_text())
+        files = {p.name for p in (appended / "store").glob(f"{header['name']}.*.bin")}
+        assert files == set(header["files"].values())
+
+
+def test_csv_exports_and_episodes_match_full_rebuild(builds):
+    appended, full, _ = builds
+    for path in full.glob("*.csv"):
+        if path.name == "indicators_meta.csv":
+            continue
+        assert (appended / path.name).read_bytes() == path.read_bytes(), path.name
+    episode_files = sorted((full / "episodes").glob("*.json"))
+    assert episode_files
+    for path in episode_files:
+        assert json.loads((appended / "episodes" / path.name).read_text()) == json.loads(
+            path.read_text()
+        ), path.name
+
+    meta = pd.read_csv(appended / "indicators_meta.csv").drop(columns="last_updated")
+    expected = pd.read_csv(full / "indicators_meta.csv").drop(columns="last_updated")
+    pd.testing.assert_frame_equal(
+        meta.sort_values("indicator_id", ignore_index=True),
+        expected.sort_values("indicator_id", ignore_index=True),
+    )
+
+
+def _assert_same_index(actual: SeriesIndex, expected: SeriesIndex) -> None:
+    np.testing.assert_array_equal(actual.days, expected.days)
+    np.testing.assert_array_equal(actual._prefix_sum, expected._prefix_sum)
+    np.testing.assert_array_equal(actual._prefix_count, expected._prefix_count)
+    assert actual._prefix_count.dtype == expected._prefix_count.dtype
+    for table in ("_min", "_max"):
+        got, want = getattr(actual, table).levels, getattr(expected, table).levels
+        assert len(got) == len(want)
+        for a, b in zip(got, want):
+            np.testing.assert_array_equal(a, b)
+
+
+@pytest.mark.parametrize(
+    "rows, tail_start, new_rows",
+    [
+        (500, 0, 510),
+        (500, 17, 530),                    # inside the first block
+        (500, _BLOCK, 540),                # exactly on a block boundary
+        (500, 5 * _BLOCK + 7, 700),        # inside a later block
+        (500, 499, 600),
+        (500, 500, 501),                   # pure append
+        (500, 480, 490),                   # tail shrinks
+        (10, 5, 70),                       # grows past the first block
+    ],
+)
+def test_spliced_index_matches_fresh_index(rows, tail_start, new_rows):
+    rng = np.random.default_rng(rows + tail_start + new_rows)
+    values = rng.normal(size=max(rows, new_rows))
+    values[rng.random(len(values)) < 0.1] = np.nan
+    days = np.arange(len(values), dtype=np.int32) * 30
+
+    previous = SeriesIndex(days[:rows], values[:rows])
+    # Rows from tail_start on are restated, as a re-aggregated tail is.
+    new_values = values[:new_rows].copy()
+    new_values[tail_start:] += 1.0
+    spliced = SeriesIndex.spliced(previous, days[:new_rows], new_values, tail_start)
+    fresh = SeriesIndex(days[:new_rows], new_values)
+    _assert_same_index(spliced, fresh)
+
+    lo = rng.integers(0, new_rows, size=200)
+    hi = np.minimum(lo + rng.integers(0, new_rows, size=200), new_rows)
+    for key, got in spliced.summaries(lo, hi).items():
+        np.testing.assert_array_equal(got, fresh.summaries(lo, hi)[key], err_msg=key)
@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# build_processed.main() with some INDICATOR_CONFIG entries removed first,
+# as if they had been deleted from config.py.
+_BUILD_WITHOUT = """
+import sys
+sys.path.insert(0, {root!r})
+from src.config import INDICATOR_CONFIG
+for indicator_id in {removed!r}:
+    del INDICATOR_CONFIG[indicator_id]
+from src.build_processed import main
+main()
+"""
+
+
+def _build(processed_dir: Path, removed=()) -> str:
+    env = dict(os.environ, MTM_DATA_PROCESSED_DIR=str(processed_dir))
+    script = _BUILD_WITHOUT.format(root=str(ROOT_DIR), removed=list(removed))
+    out = subprocess.run(
+        [sys.executable, "-c", script], env=env, capture_output=True, text=True
+    )
+    assert out.returncode == 0, out.stderr
+    return out.stdout
+
+
+def test_removed_indicators_lose_their_outputs(tmp_path):
+    _build(tmp_path)
+    assert (tmp_path / "vix.csv").exists()
+    assert list((tmp_path / "store").glob("vix@*.json"))
+    assert (tmp_path / "episodes" / "vix.json").exists()
+    version = json.loads((tmp_path / "data_version.json").read_text())["version"]
+
+    # vix and the derived indicator reading it.
+    log = _build(tmp_path, removed=["vix", "us_hy_spread_vix_ratio"])
+    assert "vix: no longer a raw indicator" in log
+
+    assert not (tmp_path / "vix.csv").exists()
+    assert not [p for p in (tmp_path / "store").iterdir() if p.name.startswith(("vix.", "vix@"))]
+    assert not (tmp_path / "episodes" / "vix.json").exists()
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert "vix" not in manifest["indicators"]
+    assert "us_hy_spread_vix_ratio" not in manifest["derived"]
+    meta = pd.read_csv(tmp_path / "indicators_meta.csv")
+    assert not meta["indicator_id"].isin(["vix", "us_hy_spread_vix_ratio"]).any()
+    # The other indicators are untouched.
+    assert (tmp_path / "us_cpi.csv").exists()
+
+    signal = json.loads((tmp_path / "data_version.json").read_text())
+    assert signal["version"] == version + 1
+    assert "vix" in signal["indicators"]
+
+
+def test_unchanged_rebuild_changes_nothing(tmp_path):
+    _build(tmp_path)
+    meta = (tmp_path / "indicators_meta.csv").read_bytes()
+    signal = (tmp_path / "data_version.json").read_bytes()
+    log = _build(tmp_path)
+    assert "Metadata unchanged" in log
+    assert (tmp_path / "indicators_meta.csv").read_bytes() == meta
+    assert (tmp_path / "data_version.json").read_bytes() == signal
+
+
+# build_metadata() with every way of loading series data disabled.
+_METADATA_ONLY = """
+import sys
+sys.path.insert(0, {root!r})
+from src import metadata, slicer
+
+def no_data(*args, **kwargs):
+    raise AssertionError("series data was read")
+
+slicer._load_series = metadata.slice_indicator = no_data
+meta = metadata.build_metadata()
+print(",".join(sorted(meta.loc[meta["frequency"] == "derived", "indicator_id"])))
+"""
+
+
+def test_metadata_reads_derived_coverage_without_loading_series(tmp_path):
+    _build(tmp_path)
+    before = pd.read_csv(tmp_path / "indicators_meta.csv")
+    (tmp_path / "indicators_meta.csv").unlink()
+
+    env = dict(os.environ, MTM_DATA_PROCESSED_DIR=str(tmp_path))
+    out = subprocess.run(
+        [sys.executable, "-c", _METADATA_ONLY.format(root=str(ROOT_DIR))],
+        env=env, capture_output=True, text=True,
+    )
+    assert out.returncode == 0, out.stderr
+    derived = out.stdout.strip().split(",")
+    assert derived == sorted(before.loc[before["frequency"] == "derived", "indicator_id"])
+    assert "us_real_fed_funds" in derived
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / "indicators_meta.csv"), before)
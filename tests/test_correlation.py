@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import correlation, store
+from src.correlation import clear_correlation_cache, correlation_matrix, max_lag_for
+
+IDS = ["fed_funds", "vix", "dxy"]
+DATES = pd.date_range("2010-01-31", "2019-12-31", freq="M")
+
+
+def _walks(seed: int) -> pd.DataFrame:
+    # fed_funds changes lead dxy's by 3 months; vix has a few missing months.
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(size=(len(DATES), 3))
+    steps[3:, 2] = steps[:-3, 0] + 0.3 * steps[3:, 2]
+    panel = pd.DataFrame(steps.cumsum(axis=0), index=DATES, columns=IDS)
+    panel.iloc[[10, 11, 50, 90], 1] = np.nan
+    return panel
+
+
+def _write(panel: pd.DataFrame) -> None:
+    for indicator_id in panel.columns:
+        values = panel[indicator_id].dropna()
+        store.write_series(
+            indicator_id, pd.DataFrame({"Date": values.index, "Value": values.to_numpy()})
+        )
+
+
+def _expected(panel: pd.DataFrame, start: str, end: str, lag: int):
+    # pandas' pairwise-complete correlation of i at t with j at t + lag.
+    changes = panel.loc[start:end].diff().iloc[1:]
+    ids = list(panel.columns)
+    corr = np.empty((len(ids), len(ids)))
+    counts = np.empty((len(ids), len(ids)), dtype=np.int64)
+    for a, i in enumerate(ids):
+        for b, j in enumerate(ids):
+            pair = pd.DataFrame({"i": changes[i].shift(lag), "j": changes[j]})
+            corr[a, b] = pair.corr().loc["i", "j"]
+            counts[a, b] = int(pair.notna().all(axis=1).sum())
+    return corr, counts
+
+
+@pytest.fixture
+def panel(scratch_store):
+    clear_correlation_cache()
+    panel = _walks(0)
+    _write(panel)
+    yield panel
+    clear_correlation_cache()
+
+
+def test_matches_pandas_corr_at_every_lag(panel):
+    result = correlation_matrix(IDS, start="2012-01", end="2019-12", max_lag=6)
+    assert result.indicator_ids == IDS
+    assert result.start_date == pd.Timestamp("2012-01-31")
+    assert result.end_date == pd.Timestamp("2019-12-31")
+    assert result.observations == 95
+    assert result.lags == list(range(7))
+    for k in result.lags:
+        corr, counts = _expected(panel, "2012-01", "2019-12", k)
+        np.testing.assert_allclose(result.corr[k], corr, rtol=1e-10, atol=1e-12)
+        np.testing.assert_array_equal(result.counts[k], counts)
+
+    np.testing.assert_allclose(
+        result.matrix(0).to_numpy(), panel.loc["2012":].diff().corr().to_numpy(), atol=1e-12
+    )
+    lead = result.lead_lag("fed_funds").set_index("indicator_id")
+    assert lead.loc["dxy", "best_lag"] == 3
+    assert lead.loc["dxy", "corr"] == pytest.approx(result.corr[3, 0, 2])
+
+
+def test_levels_are_correlated_on_request(panel):
+    result = correlation_matrix(IDS, start="2012-01", end="2019-12", on="level")
+    np.testing.assert_allclose(
+        result.matrix(0).to_numpy(), panel.loc["2012":].corr().to_numpy(), atol=1e-12
+    )
+
+
+def test_lags_are_capped_by_the_overlapping_months(panel):
+    assert max_lag_for("2018-01", "2019-12") == 24 - 1 - 12
+    assert max_lag_for("2019-01", "2019-12") == 0
+    result = correlation_matrix(IDS, start="2018-01", end="2019-12", max_lag=20)
+    assert result.lags == list(range(12))
+    assert not np.isnan(result.corr[-1]).all()
+
+
+def test_series_without_data_in_the_span_are_dropped(panel):
+    stale = pd.DataFrame({"Date": DATES[:24], "Value": np.arange(24.0)})
+    store.write_series("in_m3", stale)
+    result = correlation_matrix(IDS + ["in_m3"], window="5Y", max_lag=3)
+    assert result.indicator_ids == IDS
+    assert result.dropped == ["in_m3"]
+    # Anchored at the latest month any of them has, not at in_m3's end.
+    assert result.end_date == DATES[-1]
+    assert result.corr.shape == (4, 3, 3)
+
+
+def test_a_rebuilt_input_misses_the_cache(panel, monkeypatch):
+    calls = []
+    slice_many = correlation.slice_many
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return slice_many(*args, **kwargs)
+
+    monkeypatch.setattr(correlation, "slice_many", counting)
+    first = correlation_matrix(IDS, start="2012-01", end="2019-12", max_lag=2)
+    again = correlation_matrix(IDS, start="2012-01", end="2019-12", max_lag=2)
+    np.testing.assert_array_equal(first.corr, again.corr)
+    # A shorter lag range is answered from the cached lags too.
+    correlation_matrix(IDS, start="2012-01", end="2019-12", max_lag=1)
+    assert len(calls) == 1
+
+    rebuilt = _walks(1)
+    store.write_series(
+        "dxy", pd.DataFrame({"Date": DATES, "Value": rebuilt["dxy"].to_numpy()})
+    )
+    panel = panel.assign(dxy=rebuilt["dxy"])
+    after = correlation_matrix(IDS, start="2012-01", end="2019-12", max_lag=2)
+    assert len(calls) == 2
+    for k in after.lags:
+        np.testing.assert_allclose(after.corr[k], _expected(panel, "2012-01", "2019-12", k)[0])
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import slicer, store
+from src.config import INDICATOR_CONFIG
+from src.derived import (
+    compute_derived,
+    dependency_order,
+    dependents,
+    derived_inputs,
+    is_derived,
+    raw_indicator_ids,
+)
+from src.series import ArraySeries
+
+
+def _series(dates, values) -> ArraySeries:
+    return ArraySeries.from_frame(
+        pd.DataFrame({"Date": pd.to_datetime(dates), "Value": np.asarray(values, dtype="float64")})
+    )
+
+
+def test_chained_inputs_come_first():
+    assert dependency_order(["us_real_fed_funds"]) == ["us_cpi_yoy", "us_real_fed_funds"]
+
+    order = dependency_order()
+    assert set(order) == {i for i in INDICATOR_CONFIG if is_derived(i)}
+    for indicator_id in order:
+        for input_id in derived_inputs(indicator_id):
+            if is_derived(input_id):
+                assert order.index(input_id) < order.index(indicator_id)
+    assert not set(order) & set(raw_indicator_ids())
+
+
+def test_cycles_are_rejected(monkeypatch):
+    monkeypatch.setitem(INDICATOR_CONFIG, "cyc_a", {"derived": {"op": "yoy", "inputs": ["cyc_b"]}})
+    monkeypatch.setitem(
+        INDICATOR_CONFIG, "cyc_b", {"derived": {"op": "add", "inputs": ["vix", "cyc_a"]}}
+    )
+    with pytest.raises(ValueError, match="cycle: cyc_a -> cyc_b -> cyc_a"):
+        dependency_order(["cyc_a"])
+
+
+@pytest.mark.parametrize(
+    "spec, message",
+    [
+        ({"op": "sub", "inputs": ["fed_funds", "no_such_indicator"]}, "unknown input"),
+        ({"op": "pow", "inputs": ["fed_funds", "vix"]}, "Unknown op"),
+        ({"op": "sub", "inputs": ["fed_funds"]}, "takes 2 input"),
+        ({"op": "yoy", "inputs": ["fed_funds", "vix"]}, "takes 1 input"),
+    ],
+)
+def test_bad_specs_are_rejected(monkeypatch, spec, message):
+    monkeypatch.setitem(INDICATOR_CONFIG, "bad", {"derived": spec})
+    with pytest.raises(ValueError, match=message):
+        dependency_order(["bad"])
+
+
+def test_dependents_follow_the_graph():
+    assert dependents(["us_cpi"]) == ["us_cpi_yoy", "us_real_fed_funds"]
+    assert dependents(["fed_funds"]) == ["us_real_fed_funds"]
+    assert dependents(["us_cpi_yoy"]) == ["us_real_fed_funds"]
+    assert dependents(["vix"]) == ["us_hy_spread_vix_ratio"]
+    assert dependents(["in_m3"]) == []
+
+
+def test_binary_ops_align_on_shared_dates_and_drop_non_finite_rows():
+    a = _series(["2020-01-31", "2020-02-29", "2020-03-31", "2020-04-30"], [1.0, 2.0, 3.0, 4.0])
+    b = _series(["2020-02-29", "2020-03-31", "2020-04-30", "2020-05-31"], [4.0, 0.0, 2.0, 9.0])
+    out = compute_derived("us_hy_spread_vix_ratio", [a, b])  # div
+    np.testing.assert_array_equal(out.days, a.days[[1, 3]])
+    np.testing.assert_array_equal(out.values, [0.5, 2.0])
+
+
+def _write(indicator_id: str, values) -> None:
+    dates = pd.date_range("2000-01-31", periods=len(values), freq="M")
+    store.write_series(indicator_id, pd.DataFrame({"Date": dates, "Value": values}))
+
+
+def test_rebuilt_input_invalidates_chained_derived_series(scratch_store):
+    months = 36
+    _write("us_cpi", 100.0 * 1.01 ** np.arange(months))
+    _write("fed_funds", np.full(months, 5.0))
+
+    before = slicer.slice_indicator("us_real_fed_funds").data
+    version = slicer.data_version(["us_real_fed_funds"])
+    # CPI grows 1% a month: YoY is (1.01^12 - 1) %, from the 13th month on.
+    yoy = (1.01 ** 12 - 1) * 100
+    assert len(before) == months - 12
+    np.testing.assert_allclose(before["Value"], 5.0 - yoy)
+
+    _write("fed_funds", np.full(months, 7.0))
+    assert "us_real_fed_funds" in dependents(["fed_funds"])
+    assert slicer.data_version(["us_real_fed_funds"]) != version
+    np.testing.assert_allclose(slicer.slice_indicator("us_real_fed_funds").data["Value"], 7.0 - yoy)
+
+    # Rebuilding the chained input reaches the dependent through us_cpi_yoy.
+    version = slicer.data_version(["us_real_fed_funds"])
+    _write("us_cpi", 100.0 * 1.02 ** np.arange(months))
+    assert slicer.data_version(["us_real_fed_funds"]) != version
+    np.testing.assert_allclose(
+        slicer.slice_indicator("us_real_fed_funds").data["Value"], 7.0 - (1.02 ** 12 - 1) * 100
+    )
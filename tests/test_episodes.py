@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import episodes, store
+from src.config import INDICATOR_CONFIG
+from src.episodes import EpisodeIndex, build_episodes, detect_episodes, load_episodes, window_span
+
+# Above 4: rows 1-2, 4, 6-7 (the NaN at row 5 ends a run) and 9, still
+# ongoing at the last row. Below 2: rows 0 and 8.
+FIXTURE = pd.DataFrame(
+    {
+        "Date": pd.date_range("2020-01-31", periods=10, freq="M"),
+        "Value": [1.0, 5.0, 6.0, 2.0, 7.0, np.nan, 8.0, 9.0, 1.0, 4.5],
+    }
+)
+RULES = [{"name": "high", "above": 4.0}, {"name": "low", "below": 2.0}]
+
+
+def ts(day: str) -> pd.Timestamp:
+    return pd.Timestamp(day)
+
+
+def days(*values: str):
+    return [pd.Timestamp(v) for v in values]
+
+
+@pytest.fixture
+def index() -> EpisodeIndex:
+    # Through JSON, as written by the build and read by the app.
+    return EpisodeIndex(json.loads(json.dumps(build_episodes(FIXTURE, RULES, "M"))))
+
+
+def test_runs_span_whole_periods_with_their_extremes(index):
+    high = index.table("high")
+    assert list(high["Start"]) == days("2020-02-01", "2020-05-01", "2020-07-01", "2020-10-01")
+    assert list(high["End"]) == days("2020-03-31", "2020-05-31", "2020-08-31", "2020-10-31")
+    assert list(high["Days"]) == [60, 31, 62, 31]
+    assert list(high["Observations"]) == [2, 1, 2, 1]
+    assert list(high["Extreme"]) == [6.0, 7.0, 9.0, 4.5]
+    assert list(high["Extreme Date"]) == list(high["End"])
+    assert list(high["Mean"]) == [5.5, 7.0, 8.5, 4.5]
+    assert list(high["Ongoing"]) == [False, False, False, True]
+
+    low = index.table("low")
+    assert list(low["Start"]) == days("2020-01-01", "2020-09-01")
+    assert list(low["Extreme"]) == [1.0, 1.0]
+    assert not low["Ongoing"].any()
+
+
+def test_overlap_queries_include_partially_covered_episodes(index):
+    table = index.table("high", ts("2020-03-15"), ts("2020-07-10"))
+    assert list(table["Start"]) == days("2020-02-01", "2020-05-01", "2020-07-01")
+    # Clipped to the window: 17 days of March, all of May, 10 days of July.
+    assert index.days_in_episodes("high", ts("2020-03-15"), ts("2020-07-10")) == 17 + 31 + 10
+    assert index.days_in_episodes("high") == 60 + 31 + 62 + 31
+
+    # Touching a boundary day counts; the day after an episode does not.
+    assert index.bounds("high", ts("2020-03-31"), ts("2020-05-01")) == (0, 2)
+    assert index.bounds("high", ts("2020-04-01"), ts("2020-04-30")) == (1, 1)
+    assert index.table("high", ts("2020-04-01"), ts("2020-04-30")).empty
+    assert index.days_in_episodes("high", ts("2020-04-01"), ts("2020-04-30")) == 0
+    assert index.bounds("high", ts("2021-01-01")) == (4, 4)
+
+
+def test_window_span_starts_at_the_first_period(index):
+    start, end = window_span(ts("2020-03-31"), ts("2020-07-31"), "M")
+    assert (start, end) == (ts("2020-03-01"), ts("2020-07-31"))
+    assert len(index.table("high", start, end)) == 3
+
+
+def test_weekly_episodes_start_on_the_week_start():
+    df = pd.DataFrame({"Date": pd.to_datetime(["2020-01-05", "2020-01-12"]), "Value": [3.0, 3.0]})
+    found = detect_episodes(df, "above", 1.0, "W")
+    assert pd.Timestamp(found["start"][0]) == ts("2019-12-30")
+    assert pd.Timestamp(found["end"][0]) == ts("2020-01-12")
+
+
+def test_no_runs_and_bad_rules():
+    found = detect_episodes(FIXTURE, "above", 100.0)
+    assert all(len(arr) == 0 for arr in found.values())
+    with pytest.raises(ValueError, match="exactly one"):
+        build_episodes(FIXTURE, [{"name": "both", "above": 1.0, "below": 2.0}], "M")
+
+
+def test_missing_build_output_falls_back_to_the_series(scratch_store, monkeypatch):
+    monkeypatch.setattr(episodes, "EPISODES_DIR", scratch_store / "episodes")
+    monkeypatch.setattr(episodes, "_INDEX_CACHE", {})
+    # Cleaned series carry no NaN rows.
+    series = FIXTURE.dropna().assign(Value=lambda d: d["Value"] * 5).reset_index(drop=True)
+    store.write_series("vix", series)
+
+    index = load_episodes("vix")
+    expected = build_episodes(series, INDICATOR_CONFIG["vix"]["episodes"], "M")
+    for name, rule in expected["rules"].items():
+        np.testing.assert_array_equal(index.rules[name]["start"], rule["episodes"]["start"])
+        np.testing.assert_array_equal(index.rules[name]["end"], rule["episodes"]["end"])
+
+    # Once the build has written the file, that is what is read.
+    rules = [{"name": "elevated", "above": 4.0}]
+    episodes.write_episodes("vix", build_episodes(FIXTURE, rules, "M"))
+    assert set(load_episodes("vix").rules) == {"elevated"}
+    assert load_episodes("in_m3") is None
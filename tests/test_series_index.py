@@ -0,0 +1,75 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from src.series_index import _BLOCK, SeriesIndex, _SparseTable
+
+
+def _expected(reduce, values: np.ndarray, lo: int, hi: int) -> float:
+    # NaN for empty and all-NaN ranges, like the table.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return float(reduce(values[lo:hi])) if hi > lo else np.nan
+
+
+def _ranges(rng, n: int):
+    # Random ranges plus the edge cases around block boundaries.
+    los = list(rng.integers(0, n + 1, size=300))
+    his = [min(n, lo + int(rng.integers(0, n + 1))) for lo in los]
+    edges = [0, 1, _BLOCK - 1, _BLOCK, _BLOCK + 1, 2 * _BLOCK, 3 * _BLOCK - 1, n - 1, n]
+    edges = [e for e in edges if 0 <= e <= n]
+    for lo in edges:
+        for hi in edges:
+            if hi >= lo:
+                los.append(lo)
+                his.append(hi)
+    for lo in range(0, n, _BLOCK):
+        los += [lo, lo, lo + 1]                 # empty, one block, within one block
+        his += [lo, min(n, lo + _BLOCK), min(n, lo + _BLOCK - 1)]
+    return np.array(los, dtype=np.int64), np.array(his, dtype=np.int64)
+
+
+@pytest.mark.parametrize(
+    "n", [0, 1, _BLOCK - 1, _BLOCK, 4 * _BLOCK, 1000, 3 * _BLOCK * _BLOCK + 5]
+)
+@pytest.mark.parametrize("nan_share", [0.0, 0.2, 1.0])
+def test_sparse_table_matches_nanmin_nanmax(n, nan_share):
+    rng = np.random.default_rng(n * 10 + int(nan_share * 10))
+    values = rng.normal(size=n)
+    values[rng.random(n) < nan_share] = np.nan
+    lo, hi = _ranges(rng, n)
+
+    for ufunc, reduce in ((np.fmin, np.nanmin), (np.fmax, np.nanmax)):
+        table = _SparseTable(values, ufunc)
+        expected = np.array([_expected(reduce, values, a, b) for a, b in zip(lo, hi)])
+        np.testing.assert_array_equal(table.query_many(lo, hi), expected)
+        if n:
+            scalar = np.array([table.query(a, b) for a, b in zip(lo, hi)])
+            np.testing.assert_array_equal(scalar, expected)
+
+
+def test_nan_runs_spanning_whole_blocks():
+    values = np.arange(6 * _BLOCK, dtype="float64")
+    values[_BLOCK: 3 * _BLOCK] = np.nan
+    index = SeriesIndex(np.arange(len(values), dtype=np.int32), values)
+    assert np.isnan(index.range_min(_BLOCK, 3 * _BLOCK))
+    assert index.range_min(_BLOCK - 1, 3 * _BLOCK + 1) == _BLOCK - 1
+    assert index.range_max(_BLOCK - 1, 3 * _BLOCK + 1) == 3 * _BLOCK
+    assert index.range_mean(_BLOCK - 1, 3 * _BLOCK + 1) == (_BLOCK - 1 + 3 * _BLOCK) / 2
+
+
+def test_summaries_match_summary():
+    rng = np.random.default_rng(7)
+    values = rng.normal(size=777)
+    values[rng.random(777) < 0.1] = np.nan
+    values[0] = values[-1] = 1.0
+    index = SeriesIndex(np.arange(777, dtype=np.int32) * 7, values)
+    lo = rng.integers(0, 776, size=100)
+    hi = np.minimum(lo + 1 + rng.integers(0, 777, size=100), 777)
+    many = index.summaries(lo, hi)
+    for i, (a, b) in enumerate(zip(lo, hi)):
+        one = index.summary(int(a), int(b))
+        for key, value in one.items():
+            expected = np.nan if value is None else value
+            np.testing.assert_equal(many[key][i], expected, err_msg=key)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import snapshot, store
+from src.slicer import slice_indicator
+from src.snapshot import (
+    QUICK_SLICE_OPTIONS,
+    QUICK_WINDOWS,
+    build_snapshot,
+    load_snapshot,
+    quick_slice,
+    update_snapshot,
+    write_snapshot,
+)
+
+DATES = pd.date_range("1985-01-31", "2019-12-31", freq="M")
+
+
+def _write(indicator_id: str, scale: float) -> None:
+    values = scale * (1.0 + np.arange(len(DATES)) / 100.0 + np.sin(np.arange(len(DATES))))
+    store.write_series(indicator_id, pd.DataFrame({"Date": DATES, "Value": values}))
+
+
+def _assert_same_slice(got, expected) -> None:
+    assert (got.indicator_id, got.resolution) == (expected.indicator_id, expected.resolution)
+    assert (got.start_date, got.end_date) == (expected.start_date, expected.end_date)
+    pd.testing.assert_frame_equal(got.data, expected.data)
+    assert got.summary == pytest.approx(expected.summary, nan_ok=True)
+
+
+@pytest.fixture
+def snapshot_path(scratch_store, monkeypatch):
+    path = scratch_store / "quick_windows.pkl"
+    monkeypatch.setattr(snapshot, "SNAPSHOT_PATH", path)
+    _write("vix", 1.0)
+    _write("dxy", 2.0)
+    write_snapshot(build_snapshot(["vix", "dxy"]))
+    return path
+
+
+def test_quick_windows_come_from_the_snapshot_and_match_the_slicer(snapshot_path):
+    entries = load_snapshot()["indicators"]["vix"]["results"]
+    assert set(entries) == set(QUICK_WINDOWS)
+    for window in QUICK_WINDOWS:
+        got = quick_slice("vix", window)
+        assert got is entries[window]
+        _assert_same_slice(got, slice_indicator("vix", window=window, **QUICK_SLICE_OPTIONS))
+
+
+def test_a_rebuilt_indicator_falls_back_to_the_slicer(snapshot_path):
+    stale = load_snapshot()["indicators"]["vix"]["results"]["5Y"]
+    _write("vix", 3.0)
+    got = quick_slice("vix", "5Y")
+    assert got is not stale
+    _assert_same_slice(got, slice_indicator("vix", window="5Y", **QUICK_SLICE_OPTIONS))
+    assert got.summary["end_value"] != stale.summary["end_value"]
+    # Untouched indicators are still served from the snapshot.
+    assert quick_slice("dxy", "5Y") is load_snapshot()["indicators"]["dxy"]["results"]["5Y"]
+
+    # Re-slicing just the rebuilt indicator brings it back into the snapshot.
+    write_snapshot(update_snapshot(["vix"]))
+    assert quick_slice("vix", "5Y") is load_snapshot()["indicators"]["vix"]["results"]["5Y"]
+
+
+def test_missing_or_incompatible_snapshots_fall_back_to_the_slicer(snapshot_path):
+    snapshot_path.write_bytes(b"not a pickle")
+    assert load_snapshot() is None
+    expected = slice_indicator("vix", window="10Y", **QUICK_SLICE_OPTIONS)
+    _assert_same_slice(quick_slice("vix", "10Y"), expected)
+
+    write_snapshot({**build_snapshot(["vix"]), "options": {"max_rows": 1}})
+    assert load_snapshot() is None
+
+    snapshot_path.unlink()
+    assert load_snapshot() is None
+    _assert_same_slice(quick_slice("vix", "10Y"), expected)
@@ -0,0 +1,29 @@
+from src import watch
+
+
+def _fake_builds(monkeypatch, outcomes):
+    calls = []
+
+    def build(workers, append):
+        calls.append(len(calls))
+        return outcomes[len(calls) - 1]
+
+    monkeypatch.setattr(watch, "_build", build)
+    monkeypatch.setattr(watch.time, "sleep", lambda seconds: None)
+    return calls
+
+
+def test_failed_catch_up_build_is_retried(monkeypatch):
+    monkeypatch.setattr(watch, "raw_stats", lambda: {"a": (1, 10)})
+    calls = _fake_builds(monkeypatch, [None, ["a"]])
+    watch.watch(interval=0, max_polls=4)
+    # Failed at start, retried once the (unchanged) files settled, then idle.
+    assert len(calls) == 2
+
+
+def test_changes_are_built_once_settled(monkeypatch):
+    stats = iter([{"a": (1, 10)}, {"a": (1, 10)}, {"a": (2, 20)}, {"a": (2, 20)}, {"a": (2, 20)}])
+    monkeypatch.setattr(watch, "raw_stats", lambda: next(stats))
+    calls = _fake_builds(monkeypatch, [[], ["a"]])
+    watch.watch(interval=0, max_polls=4)
+    assert len(calls) == 2